@@ -0,0 +1,103 @@
+"""Baseline recording and regression checks shared by the benchmarks.
+
+A benchmark report is a JSON dict with host metadata and
+`results[case]["operations"][operation]` entries that each hold at least
+`seconds` (left out of baselines meant for any machine). A bench supplies its cases and any extra per-operation checks;
+this module handles the command line, the `--output` baseline file, and
+`--compare` against an earlier one.
+"""
+
+import argparse
+import json
+import platform as host
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+BASELINE_VERSION = 1
+DEFAULT_SEED = 20240601
+
+
+def report_header(repeat: int, **versions: str) -> dict:
+    """Host metadata every report starts with; `versions` adds library versions."""
+    return {
+        "version": BASELINE_VERSION,
+        "python": host.python_version(),
+        **versions,
+        "machine": host.machine(),
+        "repeat": repeat,
+    }
+
+
+def paired_operations(baseline: dict, current: dict) -> Iterator[tuple[str, dict, dict]]:
+    """Yield ("case/operation", current result, baseline result) for every
+    operation present in both runs."""
+    for name, case in current["results"].items():
+        base_case = baseline.get("results", {}).get(name)
+        if base_case is None:
+            continue
+        for operation, result in case["operations"].items():
+            base = base_case["operations"].get(operation)
+            if base is not None:
+                yield f"{name}/{operation}", result, base
+
+
+def time_regression(
+    where: str, result: dict, base: dict, tolerance: float, floor_seconds: float,
+) -> Optional[str]:
+    """Describe a slowdown past `tolerance` (relative) and `floor_seconds`, if any.
+
+    Baselines recorded without timings (see `--deterministic` in media_bench)
+    never report one.
+    """
+    if "seconds" not in base:
+        return None
+    if result["seconds"] > max(base["seconds"] * (1 + tolerance), base["seconds"] + floor_seconds):
+        return f"{where}: {result['seconds']:.4f}s vs {base['seconds']:.4f}s"
+    return None
+
+
+def argument_parser(
+    description: str, cases: list[str], repeat: int, time_tolerance: float,
+) -> argparse.ArgumentParser:
+    """Command line every bench shares; benches add their own options to it."""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--cases", help=f"comma-separated subset of: {', '.join(cases)}")
+    parser.add_argument("--repeat", type=int, default=repeat, help="timed runs per operation (median)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--output", type=Path, help="write results as JSON (e.g. a new baseline)")
+    parser.add_argument("--compare", type=Path, help="baseline JSON to check for regressions")
+    parser.add_argument("--time-tolerance", type=float, default=time_tolerance)
+    return parser
+
+
+def selected_cases(
+    parser: argparse.ArgumentParser, args: argparse.Namespace, cases: list[str],
+) -> Optional[list[str]]:
+    """The --cases subset (None for all), rejecting unknown names."""
+    names = args.cases.split(",") if args.cases else None
+    unknown = set(names or ()) - set(cases)
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(sorted(unknown))}")
+    return names
+
+
+def finish(
+    args: argparse.Namespace,
+    report: dict,
+    table: str,
+    compare: Callable[[dict, dict], list[str]],
+) -> int:
+    """Print the table, write --output and check --compare. Returns the exit code."""
+    report["seed"] = args.seed
+    print(table)
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+    if args.compare:
+        regressions = compare(json.loads(args.compare.read_text()), report)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+        print(f"No regressions against {args.compare}.")
+    return 0
@@ -0,0 +1,389 @@
+"""Benchmark the media pipeline on a reproducible generated corpus.
+
+Every (image, operation) pair runs in a fresh child process, so each peak
+RSS reading belongs to that operation alone. For each platform target the
+suite records wall time, peak RSS, encode passes and the output size as a
+fraction of the platform limit. `validate_image` is measured the same way.
+
+    python -m benchmarks.media_bench --output baseline.json
+    python -m benchmarks.media_bench --compare baseline.json
+
+`--compare` exits non-zero when a result regressed past the tolerances.
+Encode counts and limit ratios are deterministic. Wall time and RSS depend
+on the machine, so compare against a baseline recorded on the same one.
+`--deterministic` leaves them out of `--output`; the committed
+benchmarks/media-baseline.json is recorded that way, so CI can run
+`--compare benchmarks/media-baseline.json` on any machine.
+"""
+
+import io
+import multiprocessing
+import random
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Callable, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_project_root = Path(__file__).resolve().parent.parent
+if str(_project_root) not in sys.path:
+    sys.path.insert(0, str(_project_root))
+
+import PIL
+from PIL import Image, ImageDraw, ImageFilter
+
+from benchmarks._baseline import (
+    DEFAULT_SEED,
+    argument_parser,
+    finish,
+    paired_operations,
+    report_header,
+    selected_cases,
+    time_regression,
+)
+from core import animation, media
+from core.size_model import DensityModel
+
+TARGETS = ("bluesky", "twitter", "linkedin")
+
+# Default regression tolerances for --compare.
+TIME_TOLERANCE = 0.25  # relative
+TIME_FLOOR_SECONDS = 0.005  # differences below this are timer noise
+RSS_TOLERANCE = 0.20  # relative
+RSS_FLOOR_KB = 1024
+RATIO_TOLERANCE = 0.05  # absolute drop in output-bytes-to-limit ratio
+
+# Per-operation results that depend on the machine running the bench.
+MACHINE_METRICS = ("seconds", "peak_rss_kb", "rss_growth_kb")
+
+
+# ---------------------------------------------------------------------------
+# Corpus
+# ---------------------------------------------------------------------------
+
+def _noise(rnd: random.Random, size: tuple[int, int], mode: str = "RGB") -> Image.Image:
+    bands = len(mode)
+    return Image.frombytes(mode, size, rnd.randbytes(size[0] * size[1] * bands))
+
+
+def _photo(rnd: random.Random, size: tuple[int, int]) -> Image.Image:
+    """Smooth color gradients under fine grain, roughly like a camera photo."""
+    gradients = [
+        Image.linear_gradient("L").rotate(rnd.randrange(360)).resize(size, Image.BILINEAR)
+        for _ in range(3)
+    ]
+    base = Image.merge("RGB", gradients)
+    return Image.blend(base, _noise(rnd, size), 0.3).filter(ImageFilter.GaussianBlur(0.6))
+
+
+def _screenshot(rnd: random.Random, size: tuple[int, int]) -> Image.Image:
+    """Flat UI panels under rows of anti-aliased glyph-like strokes."""
+    # Drawn at 2x and box-filtered down, like font smoothing.
+    big = (size[0] * 2, size[1] * 2)
+    img = Image.new("RGB", big, (246, 247, 249))
+    draw = ImageDraw.Draw(img)
+    palette = [(rnd.randrange(256), rnd.randrange(256), rnd.randrange(256)) for _ in range(8)]
+    for _ in range(40):
+        x, y = rnd.randrange(big[0]), rnd.randrange(big[1])
+        draw.rectangle(
+            (x, y, x + rnd.randrange(160, 1200), y + rnd.randrange(60, 600)),
+            fill=rnd.choice(palette),
+        )
+    for y in range(12, big[1], 22):
+        x = rnd.randrange(0, 80)
+        while x < big[0] - 80:
+            for _ in range(rnd.randrange(2, 9)):  # one word
+                top = y + 18 - rnd.choice((10, 14, 18))
+                draw.line((x, top, x + rnd.randrange(0, 5), y + 18), fill=(30, 30, 30), width=2)
+                x += rnd.randrange(6, 12)
+            x += rnd.randrange(8, 18)
+    return img.reduce(2)
+
+
+def _encode(img: Image.Image, image_format: str, **params) -> bytes:
+    buf = io.BytesIO()
+    img.save(buf, format=image_format, **params)
+    return buf.getvalue()
+
+
+def _exif_padding(rnd: random.Random, nbytes: int) -> bytes:
+    exif = Image.Exif()
+    exif[0x010E] = rnd.randbytes(nbytes // 2).hex()  # ImageDescription
+    return exif.tobytes()
+
+
+def _photo_jpeg(rnd):
+    return _encode(_photo(rnd, (4000, 3000)), "JPEG", quality=92)
+
+
+def _photo_exif_near_limit(rnd):
+    # Over BlueSky's 1MB only because of its EXIF block: exercises the lossless strip.
+    photo = _photo(rnd, (2300, 1725))
+    return _encode(photo, "JPEG", quality=85, exif=_exif_padding(rnd, 60000))
+
+
+def _screenshot_png(rnd):
+    return _encode(_screenshot(rnd, (3456, 2160)), "PNG")
+
+
+def _rgba_png(rnd):
+    img = _photo(rnd, (2000, 1500)).convert("RGBA")
+    img.putalpha(Image.linear_gradient("L").resize(img.size))
+    return _encode(img, "PNG")
+
+
+def _near_limit_png(rnd):
+    # A photographic PNG a little over BlueSky's limit: needs a real re-encode.
+    return _encode(_photo(rnd, (790, 640)), "PNG")
+
+
+def _still_gif(rnd):
+    return _encode(_photo(rnd, (1600, 1200)).quantize(256), "GIF")
+
+
+def _animated_gif(rnd):
+    frames = []
+    base = _photo(rnd, (480, 360))
+    for i in range(30):
+        frame = Image.blend(base, _noise(rnd, base.size), 0.15)
+        ImageDraw.Draw(frame).ellipse((i * 12, 120, i * 12 + 100, 220), fill=(220, 40, 40))
+        frames.append(frame.quantize(256, method=Image.Quantize.FASTOCTREE))
+    return _encode(frames[0], "GIF", save_all=True, append_images=frames[1:], duration=60, loop=0)
+
+
+CORPUS: dict[str, Callable[[random.Random], bytes]] = {
+    "photo_jpeg": _photo_jpeg,
+    "photo_exif_near_limit": _photo_exif_near_limit,
+    "screenshot_png": _screenshot_png,
+    "rgba_png": _rgba_png,
+    "near_limit_png": _near_limit_png,
+    "still_gif": _still_gif,
+    "animated_gif": _animated_gif,
+}
+
+
+def build_corpus(seed: int = DEFAULT_SEED, names: Optional[list[str]] = None) -> dict[str, bytes]:
+    """Generate the benchmark images; the same seed always gives the same bytes."""
+    corpus = {}
+    for name in names or CORPUS:
+        # Per-image seeds so filtering with --cases doesn't change the others.
+        corpus[name] = CORPUS[name](random.Random(f"{seed}:{name}"))
+    return corpus
+
+
+# ---------------------------------------------------------------------------
+# Measurement (runs in child processes)
+# ---------------------------------------------------------------------------
+
+def _reset_peak_rss():
+    """Lower the peak-RSS mark to the current RSS, where the OS allows it (Linux)."""
+    try:
+        Path("/proc/self/clear_refs").write_text("5")
+    except OSError:
+        pass
+
+
+def _peak_rss_kb() -> Optional[int]:
+    # VmHWM is per process; ru_maxrss survives exec on Linux, so a spawned
+    # child would report its parent's peak.
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak  # bytes on macOS
+
+
+class _EncodeCounter:
+    """Count encode passes by wrapping the pipeline's per-pass encoders."""
+
+    _HOOKS = (
+        (media, "_encode_jpeg"),
+        (media, "_encode_palette_png"),
+        (animation, "_encode_frames"),
+    )
+
+    def __init__(self):
+        self.count = 0
+        self._originals = []
+
+    def __enter__(self):
+        for module, name in self._HOOKS:
+            original = getattr(module, name)
+            self._originals.append((module, name, original))
+            setattr(module, name, self._wrap(original))
+        return self
+
+    def _wrap(self, original):
+        def _counted(*args, **kwargs):
+            self.count += 1
+            return original(*args, **kwargs)
+        return _counted
+
+    def __exit__(self, *exc_info):
+        for module, name, original in self._originals:
+            setattr(module, name, original)
+        return False
+
+
+def _run_one(path: str, target: str, repeat: int) -> dict:
+    """Child process entry point: measure one operation on one corpus image."""
+    data = Path(path).read_bytes()
+    _reset_peak_rss()
+    rss_before = _peak_rss_kb()
+    timings = []
+    encodes = None
+    output_bytes = None
+    for _ in range(repeat):
+        # Every run starts from the same size model, as a fresh process would.
+        media.density_model = DensityModel(priors=media.DENSITY_PRIORS)
+        with _EncodeCounter() as counter:
+            start = time.perf_counter()
+            if target == "validate":
+                media.validate_image(data)
+            else:
+                output = media.resize_for_platform(data, target)
+            timings.append(time.perf_counter() - start)
+        if encodes is None and target != "validate":
+            encodes, output_bytes = counter.count, len(output)
+
+    peak = _peak_rss_kb()
+    result = {
+        "seconds": statistics.median(timings),
+        "peak_rss_kb": peak,
+        # Peak memory above what the process held with the input loaded.
+        "rss_growth_kb": None if peak is None else peak - rss_before,
+    }
+    if target != "validate":
+        limit = media.PLATFORM_IMAGE_LIMITS[target]["max_bytes"]
+        result.update({
+            "encodes": encodes,
+            "output_bytes": output_bytes,
+            "limit_ratio": round(output_bytes / limit, 4),
+            "resized": output != data,
+        })
+    return result
+
+
+def run(corpus: dict[str, bytes], repeat: int = 3, workdir: Optional[Path] = None) -> dict:
+    """Measure every corpus image against validate_image and each platform target."""
+    context = multiprocessing.get_context("spawn")
+    results = {}
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        for name, data in corpus.items():
+            path = Path(tmp) / name
+            path.write_bytes(data)
+            case = {"source_bytes": len(data), "operations": {}}
+            for target in ("validate",) + TARGETS:
+                # One fresh worker per measurement keeps peak RSS readings separate.
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                    case["operations"][target] = executor.submit(
+                        _run_one, str(path), target, repeat,
+                    ).result()
+            results[name] = case
+    return {**report_header(repeat, pillow=PIL.__version__), "results": results}
+
+
+# ---------------------------------------------------------------------------
+# Comparison
+# ---------------------------------------------------------------------------
+
+def compare(
+    baseline: dict,
+    current: dict,
+    time_tolerance: float = TIME_TOLERANCE,
+    rss_tolerance: float = RSS_TOLERANCE,
+    ratio_tolerance: float = RATIO_TOLERANCE,
+) -> list[str]:
+    """List regressions of `current` against `baseline` (empty when none).
+
+    Only cases and operations present in both runs are compared.
+    """
+    regressions = []
+    for where, result, base in paired_operations(baseline, current):
+        slower = time_regression(where, result, base, time_tolerance, TIME_FLOOR_SECONDS)
+        if slower:
+            regressions.append(slower)
+        if (
+            result.get("rss_growth_kb") is not None
+            and base.get("rss_growth_kb") is not None
+            and result["rss_growth_kb"] > base["rss_growth_kb"] * (1 + rss_tolerance) + RSS_FLOOR_KB
+        ):
+            regressions.append(
+                f"{where}: RSS grew {result['rss_growth_kb']} KB vs {base['rss_growth_kb']} KB"
+            )
+        if "encodes" not in result or "encodes" not in base:
+            continue
+        if result["encodes"] > base["encodes"]:
+            regressions.append(f"{where}: {result['encodes']} encodes vs {base['encodes']}")
+        if result["limit_ratio"] > 1.0:
+            regressions.append(f"{where}: output is over the platform limit")
+        elif base["resized"] and result["limit_ratio"] < base["limit_ratio"] - ratio_tolerance:
+            regressions.append(
+                f"{where}: fills {result['limit_ratio']:.1%} of the limit "
+                f"vs {base['limit_ratio']:.1%}"
+            )
+    return regressions
+
+
+def deterministic(report: dict) -> dict:
+    """`report` without MACHINE_METRICS, for a baseline any machine can compare against."""
+    results = {}
+    for name, case in report["results"].items():
+        operations = {
+            operation: {k: v for k, v in result.items() if k not in MACHINE_METRICS}
+            for operation, result in case["operations"].items()
+        }
+        results[name] = {**case, "operations": operations}
+    return {**{k: v for k, v in report.items() if k != "machine"}, "results": results}
+
+
+def _format_table(report: dict) -> str:
+    lines = [
+        f"{'case':<24}{'operation':<10}{'seconds':>9}{'rss MB':>9}{'encodes':>9}{'of limit':>10}",
+    ]
+    for name, case in report["results"].items():
+        for target, result in case["operations"].items():
+            growth = result.get("rss_growth_kb")
+            lines.append(
+                f"{name:<24}{target:<10}{result['seconds']:>9.3f}"
+                f"{'-' if growth is None else f'{growth / 1024:.1f}':>9}"
+                f"{result.get('encodes', '-'):>9}"
+                f"{format(result['limit_ratio'], '.1%') if 'limit_ratio' in result else '-':>10}"
+            )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argument_parser(__doc__.splitlines()[0], list(CORPUS), 3, TIME_TOLERANCE)
+    parser.add_argument("--rss-tolerance", type=float, default=RSS_TOLERANCE)
+    parser.add_argument(
+        "--deterministic", action="store_true",
+        help="leave wall time and RSS out of --output (a baseline for any machine)",
+    )
+    args = parser.parse_args(argv)
+    names = selected_cases(parser, args, list(CORPUS))
+
+    report = run(build_corpus(args.seed, names), repeat=args.repeat)
+    table = _format_table(report)
+    if args.deterministic:
+        report = deterministic(report)
+    return finish(args, report, table, partial(
+        compare, time_tolerance=args.time_tolerance, rss_tolerance=args.rss_tolerance,
+    ))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+"""Benchmark grapheme measurement and thread splitting on generated drafts.
+
+Each corpus is a reproducible draft: English prose, emoji-heavy chatter
+(modifiers, ZWJ sequences and flags mixed with plain emoji), CJK text and
+a five times longer English draft (100,000 characters by default) that
+keeps word-dense packing honest on long inputs. For each one the suite
+times measuring every word token with `grapheme.length`, the way the
+splitter used to, against the same measurements through one
+MeasuredText, then full splits for each platform, planning all three
+platforms at once from a shared tokenization, and a typing session: that
+plan followed by twenty keystrokes at the end of the draft, each planned
+incrementally from the previous one.
+
+    python -m benchmarks.text_bench --output text-baseline.json
+    python -m benchmarks.text_bench --compare text-baseline.json
+
+`--compare` exits non-zero when an operation got slower than the
+tolerance allows. Times depend on the machine, so compare against a
+baseline recorded on the same one.
+"""
+
+import random
+import statistics
+import sys
+import time
+from functools import partial
+from pathlib import Path
+from typing import Callable, Optional
+
+_project_root = Path(__file__).resolve().parent.parent
+if str(_project_root) not in sys.path:
+    sys.path.insert(0, str(_project_root))
+
+import grapheme
+
+from benchmarks._baseline import (
+    DEFAULT_SEED,
+    argument_parser,
+    finish,
+    paired_operations,
+    report_header,
+    selected_cases,
+    time_regression,
+)
+from core.measured_text import MeasuredText
+from core.splitter import BLUESKY, LINKEDIN, TWITTER, _word_bounds, split_for_platform
+from core.thread_plan import IncrementalPlanner, plan_threads
+
+DEFAULT_CHARS = 20_000
+
+# Default regression tolerance for --compare.
+TIME_TOLERANCE = 0.25  # relative
+TIME_FLOOR_SECONDS = 0.002  # differences below this are timer noise
+
+
+# ---------------------------------------------------------------------------
+# Corpus
+# ---------------------------------------------------------------------------
+
+_WORDS = (
+    "the a thread post draft about release notes we shipped today and it "
+    "includes faster previews better image handling fixes for long posts "
+    "thanks to everyone who reported issues more details below"
+).split()
+_PLAIN_EMOJI = ["🎉", "🚀", "😀", "🔥", "✨", "📷"]
+_JOINED_EMOJI = ["👍🏽", "👋🏻", "👨‍👩‍👧", "🏳️‍🌈", "❤️", "🇺🇸", "🇯🇵", "🧑🏾‍💻"]
+_CJK_PUNCTUATION = ["。", "、", "！", "？"]
+
+
+def _sentence(rnd: random.Random, words: list[str]) -> str:
+    return " ".join(words).capitalize() + rnd.choice([".", ".", "!", "?"]) + rnd.choice([" ", " ", "\n"])
+
+
+def _english(rnd: random.Random) -> str:
+    return _sentence(rnd, rnd.choices(_WORDS, k=rnd.randrange(6, 20)))
+
+
+def _emoji(rnd: random.Random) -> str:
+    words = rnd.choices(_WORDS, k=rnd.randrange(4, 12))
+    for _ in range(rnd.randrange(2, 5)):
+        pool = _JOINED_EMOJI if rnd.random() < 0.5 else _PLAIN_EMOJI
+        words.insert(rnd.randrange(len(words) + 1), rnd.choice(pool))
+    return _sentence(rnd, words)
+
+
+def _cjk(rnd: random.Random) -> str:
+    clause = "".join(chr(rnd.randrange(0x4E00, 0x9FFF)) for _ in range(rnd.randrange(8, 30)))
+    kana = "".join(chr(rnd.randrange(0x3041, 0x3097)) for _ in range(rnd.randrange(0, 6)))
+    return clause + kana + rnd.choice(_CJK_PUNCTUATION) + rnd.choice(["", "", " ", "\n"])
+
+
+# Sentence generator and length as a multiple of --chars.
+CORPUS: dict[str, tuple[Callable[[random.Random], str], int]] = {
+    "english": (_english, 1),
+    "emoji": (_emoji, 1),
+    "cjk": (_cjk, 1),
+    "long_english": (_english, 5),
+}
+
+
+def build_corpus(
+    seed: int = DEFAULT_SEED,
+    names: Optional[list[str]] = None,
+    chars: int = DEFAULT_CHARS,
+) -> dict[str, str]:
+    """Generate each named draft (all by default), about `chars` code points long.
+
+    Drafts with a larger scale in CORPUS are that many times longer.
+    """
+    corpus = {}
+    for name in names or CORPUS:
+        sentence, scale = CORPUS[name]
+        rnd = random.Random(f"{seed}:{name}")
+        sentences = []
+        length = 0
+        while length < chars * scale:
+            sentences.append(sentence(rnd))
+            length += len(sentences[-1])
+        corpus[name] = "".join(sentences)
+    return corpus
+
+
+# ---------------------------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------------------------
+
+def _grapheme_per_segment(text: str) -> int:
+    bounds = _word_bounds(text)
+    return sum(grapheme.length(text[start:end]) for start, end in zip(bounds, bounds[1:]))
+
+
+def _measured_per_segment(text: str) -> int:
+    measured = MeasuredText(text)
+    bounds = _word_bounds(text)
+    return sum(measured.length(start, end) for start, end in zip(bounds, bounds[1:]))
+
+
+_PLATFORMS = {"twitter": TWITTER, "bluesky": BLUESKY, "linkedin": LINKEDIN}
+KEYSTROKES = 20
+
+
+def _typing_session(text: str) -> None:
+    planner = IncrementalPlanner()
+    planner.plan(text, _PLATFORMS)
+    for _ in range(KEYSTROKES):
+        planner.apply_edit(len(planner.text), len(planner.text), "x", _PLATFORMS)
+
+
+OPERATIONS: dict[str, Callable[[str], object]] = {
+    "grapheme_segments": _grapheme_per_segment,
+    "measured_segments": _measured_per_segment,
+    "split_bluesky": lambda text: split_for_platform(text, BLUESKY),
+    "split_twitter": lambda text: split_for_platform(text, TWITTER),
+    "split_linkedin": lambda text: split_for_platform(text, LINKEDIN),
+    "plan_all_platforms": lambda text: plan_threads(text, _PLATFORMS),
+    "typing_session": _typing_session,
+}
+
+
+def _time(operation: Callable[[str], object], text: str, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        operation(text)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def run(corpus: dict[str, str], repeat: int = 5) -> dict:
+    """Time every operation on every corpus draft (median of `repeat` runs)."""
+    results = {}
+    for name, text in corpus.items():
+        operations = {op: {"seconds": _time(fn, text, repeat)} for op, fn in OPERATIONS.items()}
+        results[name] = {
+            "chars": len(text),
+            "graphemes": grapheme.length(text),
+            "operations": operations,
+        }
+    return {**report_header(repeat), "results": results}
+
+
+# ---------------------------------------------------------------------------
+# Comparison
+# ---------------------------------------------------------------------------
+
+def compare(baseline: dict, current: dict, time_tolerance: float = TIME_TOLERANCE) -> list[str]:
+    """List operations of `current` slower than in `baseline` (empty when none)."""
+    regressions = (
+        time_regression(where, result, base, time_tolerance, TIME_FLOOR_SECONDS)
+        for where, result, base in paired_operations(baseline, current)
+    )
+    return [line for line in regressions if line]
+
+
+def _format_table(report: dict) -> str:
+    lines = [f"{'case':<14}{'chars':>8}{'operation':>20}{'seconds':>10}{'speedup':>9}"]
+    for name, case in report["results"].items():
+        operations = case["operations"]
+        reference = operations["grapheme_segments"]["seconds"]
+        for op, result in operations.items():
+            speedup = f"{reference / result['seconds']:.1f}x" if op == "measured_segments" else ""
+            lines.append(f"{name:<14}{case['chars']:>8}{op:>20}{result['seconds']:>10.4f}{speedup:>9}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argument_parser(__doc__.splitlines()[0], list(CORPUS), 5, TIME_TOLERANCE)
+    parser.add_argument("--chars", type=int, default=DEFAULT_CHARS, help="approximate draft length")
+    args = parser.parse_args(argv)
+    names = selected_cases(parser, args, list(CORPUS))
+
+    report = run(build_corpus(args.seed, names, args.chars), repeat=args.repeat)
+    return finish(args, report, _format_table(report), partial(
+        compare, time_tolerance=args.time_tolerance,
+    ))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,323 @@
+"""Size-bounded re-encoding of animated GIFs, one frame at a time."""
+
+import functools
+import io
+import math
+import struct
+import time
+from dataclasses import dataclass, replace
+from typing import Callable, Iterator, Optional
+
+from PIL import Image, ImageChops
+
+# CPU seconds (of the calling thread) one animated image may spend across all
+# of its platform targets before the caller falls back to a still.
+ANIMATION_CPU_BUDGET_SECONDS = 10.0
+MAX_ANIMATION_ENCODES = 5
+# Frame subsampling keeps every `stride`-th frame, up to MAX_FRAME_STRIDE,
+# and never leaves fewer than MIN_ANIMATION_FRAMES frames.
+MAX_FRAME_STRIDE = 4
+MIN_ANIMATION_FRAMES = 2
+# Per-frame palette sizes, largest first.
+ANIMATION_COLORS = (256, 128, 64)
+MIN_ANIMATION_DIMENSION = 16
+# Pixels less opaque than this become the frame's transparent index.
+ALPHA_THRESHOLD = 128
+# Browsers play delays under 20ms at 100ms; merged frames must add up the same way.
+MIN_FRAME_DELAY_MS = 20
+DEFAULT_FRAME_DELAY_MS = 100
+
+_DISPOSE_NONE = 1  # leave the frame in place; the next frame draws over it
+_DISPOSE_BACKGROUND = 2  # clear the frame's area before the next one
+
+
+class _BudgetExceeded(Exception):
+    pass
+
+
+@dataclass
+class AnimationPlan:
+    """How much an animation is reduced: dimensions, frames kept and colors."""
+
+    scale: float
+    stride: int
+    colors: int
+
+
+@dataclass
+class AnimationResult:
+    data: bytes
+    plan: AnimationPlan
+    encodes: int
+
+
+def _max_stride(frames: int) -> int:
+    return max(1, min(MAX_FRAME_STRIDE, frames // MIN_ANIMATION_FRAMES))
+
+
+def plan_animation(source_bytes: int, frames: int, max_bytes: int, target_fill: float) -> AnimationPlan:
+    """First guess at the scale, frame stride and palette size that fit max_bytes.
+
+    Output size is modelled as proportional to kept frames times scaled
+    pixels. The reduction is split between dropping frames and scaling
+    down, and the palette shrinks once the remaining scale gets steep.
+    """
+    target = max_bytes * (1 + target_fill) / 2
+    ratio = min(1.0, target / source_bytes)
+    stride = max(1, min(_max_stride(frames), int(1 / math.sqrt(ratio))))
+    ratio = min(1.0, ratio * frames / math.ceil(frames / stride))
+    if ratio >= 0.5:
+        colors = ANIMATION_COLORS[0]
+    elif ratio >= 0.25:
+        colors = ANIMATION_COLORS[1]
+    else:
+        colors = ANIMATION_COLORS[2]
+    return AnimationPlan(scale=math.sqrt(ratio), stride=stride, colors=colors)
+
+
+def _frame_delay(img: Image.Image) -> int:
+    duration = img.info.get("duration") or 0
+    return duration if duration >= MIN_FRAME_DELAY_MS else DEFAULT_FRAME_DELAY_MS
+
+
+def _changed_box(frame: Image.Image, previous: Image.Image) -> Optional[tuple[int, int, int, int]]:
+    """Bounding box of the pixels that differ in any band, alpha included."""
+    diff = ImageChops.difference(frame, previous)
+    # Collapse the bands first: getbbox() on RGBA looks at alpha alone.
+    return functools.reduce(ImageChops.lighter, diff.split()).getbbox()
+
+
+def _frames(
+    img: Image.Image,
+    frames: int,
+    stride: int,
+    prepare: Callable[[Image.Image], Image.Image],
+) -> Iterator[tuple[Image.Image, int]]:
+    """Yield every `stride`-th frame, prepared, with the delay of the frames it stands for.
+
+    Only the frame being decoded and the one waiting for its delay are held
+    in memory. Consecutive kept frames that come out identical are merged.
+    """
+    pending = None
+    delay = 0
+    for index in range(frames):
+        img.seek(index)
+        if index % stride == 0:
+            frame = prepare(img)
+            if pending is None or _changed_box(frame, pending) is not None:
+                if pending is not None:
+                    yield pending, delay
+                pending, delay = frame, 0
+        delay += _frame_delay(img)
+    if pending is not None:
+        yield pending, delay
+
+
+def _quantize(region: Image.Image, colors: int) -> tuple[Image.Image, Optional[int]]:
+    """Reduce a frame region to `colors`, reserving one index for clear pixels."""
+    if region.mode == "RGBA":
+        clear = region.getchannel("A").point(lambda a: 255 if a < ALPHA_THRESHOLD else 0)
+        if clear.getbbox() is not None:
+            quantized = region.convert("RGB").quantize(colors - 1, method=Image.Quantize.FASTOCTREE)
+            palette = quantized.getpalette()
+            quantized.putpalette(palette + [0] * (colors * 3 - len(palette)))
+            quantized.paste(colors - 1, mask=clear)
+            return quantized, colors - 1
+        region = region.convert("RGB")
+    return region.quantize(colors, method=Image.Quantize.FASTOCTREE), None
+
+
+def _sub_blocks_end(gif: bytes, pos: int) -> int:
+    while gif[pos]:
+        pos += gif[pos] + 1
+    return pos + 1
+
+
+def _frame_blocks(
+    frame: Image.Image,
+    offset: tuple[int, int],
+    delay_ms: int,
+    disposal: int,
+    transparency: Optional[int],
+) -> bytes:
+    """Encode one palette frame as GIF blocks with its own local color table.
+
+    Pillow encodes the frame as a single-image GIF; its global palette is
+    moved into a local table and the control block is rewritten with this
+    frame's position, delay and disposal.
+    """
+    buf = io.BytesIO()
+    frame.save(buf, format="GIF", **({} if transparency is None else {"transparency": transparency}))
+    gif = buf.getvalue()
+
+    screen_flags = gif[10]
+    pos = 13
+    table = b""
+    if screen_flags & 0x80:
+        table_end = pos + (3 << ((screen_flags & 0x07) + 1))
+        table, pos = gif[pos:table_end], table_end
+    transparent_index = None
+    while gif[pos] == 0x21:  # extensions ahead of the image
+        if gif[pos + 1] == 0xF9 and gif[pos + 3] & 0x01:
+            transparent_index = gif[pos + 6]  # Pillow may have remapped it
+        pos = _sub_blocks_end(gif, pos + 2)
+
+    width, height, image_flags = struct.unpack("<HHB", gif[pos + 5:pos + 10])
+    data_start = pos + 10
+    if image_flags & 0x80:
+        data_start += 3 << ((image_flags & 0x07) + 1)
+        table = gif[pos + 10:data_start]
+    elif table:
+        image_flags = 0x80 | (image_flags & 0x40) | (screen_flags & 0x07)
+    data_end = _sub_blocks_end(gif, data_start + 1)  # LZW code size, then sub-blocks
+
+    control = b"!\xf9\x04" + struct.pack(
+        "<BHBB",
+        (disposal << 2) | (transparent_index is not None),
+        min(0xFFFF, round(delay_ms / 10)),
+        transparent_index or 0,
+        0,
+    )
+    descriptor = b"," + struct.pack("<HHHHB", offset[0], offset[1], width, height, image_flags)
+    return control + descriptor + table + gif[data_start:data_end]
+
+
+def _encode_frames(
+    open_source: Callable[[], Image.Image],
+    frames: int,
+    plan: AnimationPlan,
+    max_bytes: int,
+    deadline: float,
+) -> tuple[Optional[bytes], int]:
+    """Stream one re-encode of the animation under `plan`.
+
+    Opaque animations store only the rectangle that changed since the
+    previous kept frame; animations with transparency store whole frames
+    that clear before the next one. Encoding stops as soon as the output
+    passes max_bytes.
+
+    Returns:
+        (GIF bytes, size) if it fits, else (None, projected full size).
+
+    Raises:
+        _BudgetExceeded: When the thread's CPU time passes `deadline`.
+    """
+    with open_source() as img:
+        size = (
+            max(1, round(img.width * plan.scale)),
+            max(1, round(img.height * plan.scale)),
+        )
+        transparent = img.mode in ("RGBA", "LA", "PA") or "transparency" in img.info
+        mode = "RGBA" if transparent else "RGB"
+
+        def _prepare(frame: Image.Image) -> Image.Image:
+            frame = frame.convert(mode)
+            return frame if frame.size == size else frame.resize(size, Image.LANCZOS)
+
+        out = io.BytesIO()
+        out.write(b"GIF89a" + struct.pack("<HHBBB", size[0], size[1], 0, 0, 0))
+        loop = img.info.get("loop")
+        if loop is not None:
+            out.write(b"!\xff\x0bNETSCAPE2.0\x03\x01" + struct.pack("<H", loop) + b"\x00")
+
+        kept = math.ceil(frames / plan.stride)
+        emitted = 0
+        previous = None
+        for frame, delay in _frames(img, frames, plan.stride, _prepare):
+            if time.thread_time() > deadline:
+                raise _BudgetExceeded()
+            box = (0, 0) + size
+            if not transparent and previous is not None:
+                box = _changed_box(frame, previous) or (0, 0, 1, 1)
+            quantized, transparency = _quantize(frame.crop(box), plan.colors)
+            out.write(_frame_blocks(
+                quantized,
+                box[:2],
+                delay,
+                _DISPOSE_BACKGROUND if transparent else _DISPOSE_NONE,
+                transparency,
+            ))
+            previous = frame
+            emitted += 1
+            if out.tell() + 1 > max_bytes:
+                return None, int(out.tell() * max(kept, emitted) / emitted)
+        out.write(b";")
+    return out.getvalue(), out.tell()
+
+
+def encode_animation(
+    open_source: Callable[[], Image.Image],
+    frames: int,
+    source_bytes: int,
+    max_bytes: int,
+    target_fill: float,
+    deadline: float,
+) -> Optional[AnimationResult]:
+    """Re-encode an animated GIF just under max_bytes, keeping it animated.
+
+    Starts from `plan_animation` and then refines the scale from each pass's
+    actual size, bracketed like `core.media.encode_to_target`. When even the
+    smallest scale overshoots, more frames are dropped and then colors.
+    Each pass decodes the source one frame at a time.
+
+    Args:
+        open_source: Returns a freshly opened (not yet loaded) source image.
+        frames: Number of frames in the source.
+        source_bytes: Size of the source file.
+        max_bytes: Hard output size limit.
+        target_fill: Aim for output of at least this fraction of max_bytes.
+        deadline: `time.thread_time()` value after which to give up.
+
+    Returns:
+        The largest fitting AnimationResult found, or None if nothing fit
+        before the encode or CPU budget ran out.
+    """
+    with open_source() as img:
+        width, height = img.size
+    min_scale = min(1.0, max(MIN_ANIMATION_DIMENSION / width, MIN_ANIMATION_DIMENSION / height))
+    target = max_bytes * (1 + target_fill) / 2
+    floor = max_bytes * target_fill
+
+    plan = plan_animation(source_bytes, frames, max_bytes, target_fill)
+    plan.scale = max(min_scale, plan.scale)
+    best = None
+    fit_scale = None  # largest scale known to fit at this stride and palette
+    over_scale = None  # smallest scale known to overshoot
+    encodes = 0
+    while encodes < MAX_ANIMATION_ENCODES:
+        try:
+            data, size = _encode_frames(open_source, frames, plan, max_bytes, deadline)
+        except _BudgetExceeded:
+            break
+        encodes += 1
+        if data is not None:
+            if best is None or size > len(best.data):
+                best = AnimationResult(data, replace(plan), encodes)
+            if size >= floor or plan.scale >= 1.0:
+                break
+            fit_scale = plan.scale if fit_scale is None else max(fit_scale, plan.scale)
+        else:
+            over_scale = plan.scale if over_scale is None else min(over_scale, plan.scale)
+            if plan.scale <= min_scale:
+                # Scaling is exhausted; drop more frames, then colors.
+                if plan.stride < _max_stride(frames):
+                    plan = replace(plan, stride=plan.stride + 1)
+                elif plan.colors > ANIMATION_COLORS[-1]:
+                    plan = replace(plan, colors=ANIMATION_COLORS[ANIMATION_COLORS.index(plan.colors) + 1])
+                else:
+                    break
+                fit_scale = over_scale = None
+                continue
+
+        lo = fit_scale if fit_scale is not None else min_scale
+        hi = over_scale if over_scale is not None else 1.0
+        if hi / lo < 1.01:
+            break
+        scale = min(1.0, max(min_scale, plan.scale * math.sqrt(target / size)))
+        if not lo < scale < hi:
+            scale = math.sqrt(lo * hi)
+        plan = replace(plan, scale=scale)
+
+    if best is not None:
+        best.encodes = encodes
+    return best
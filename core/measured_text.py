@@ -0,0 +1,208 @@
+"""Draft text with its grapheme cluster boundaries indexed once."""
+
+import json
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from importlib import resources
+from itertools import islice
+
+import grapheme
+
+# Grapheme_Cluster_Break classes that can join a code point to its
+# neighbour. Text without them (and without CR LF) has one grapheme per
+# code point: ASCII, CJK, most Latin, and emoji that carry no modifier,
+# variation selector, ZWJ or flag.
+_JOINING_CLASSES = ("Prepend", "Extend", "Regional_Indicator", "SpacingMark", "L", "V", "T", "ZWJ")
+# Classes that attach to the code point before them and to nothing after.
+_MARK_CLASSES = ("Extend", "SpacingMark")
+_FLAG_CLASSES = ("Regional_Indicator",)
+_CONTROL_CLASSES = ("CR", "LF", "Control")
+
+
+def _class_pattern(data: dict, names: tuple[str, ...]) -> str:
+    """Regex matching one code point in any of the named classes.
+
+    Astral ranges are kept out of the BMP set, which re compiles to a
+    bitmap, and are only tried on astral code points.
+    """
+    ranges = []
+    for name in names:
+        ranges.extend((c, c) for c in data[name]["single_chars"])
+        ranges.extend((low, high) for low, high in data[name]["ranges"])
+
+    def _members(selected):
+        return "".join(
+            re.escape(chr(low)) if low == high else f"{re.escape(chr(low))}-{re.escape(chr(high))}"
+            for low, high in sorted(selected)
+        )
+
+    bmp = [r for r in ranges if r[1] <= 0xFFFF]
+    astral = [r for r in ranges if r[1] > 0xFFFF]
+    alternatives = [f"[{_members(bmp)}]"] if bmp else []
+    if astral:
+        alternatives.append(f"(?=[\U00010000-\U0010FFFF])[{_members(astral)}]")
+    return f"(?:{'|'.join(alternatives)})"
+
+
+def _load_patterns() -> tuple[re.Pattern, re.Pattern, re.Pattern, re.Pattern]:
+    """Build the code point class patterns from grapheme's own property tables."""
+    table = resources.files(grapheme).joinpath("data", "grapheme_break_property.json")
+    data = json.loads(table.read_text(encoding="utf-8"))
+    return (
+        re.compile(f"(?:{_class_pattern(data, _JOINING_CLASSES)}|\r\n)+"),
+        re.compile(f"{_class_pattern(data, _MARK_CLASSES)}+"),
+        re.compile(f"{_class_pattern(data, _FLAG_CLASSES)}+"),
+        re.compile(_class_pattern(data, _CONTROL_CLASSES)),
+    )
+
+
+_JOINING_RE, _MARKS_RE, _FLAGS_RE, _CONTROL_RE = _load_patterns()
+
+
+def _is_fixed_boundary(text: str, offset: int) -> bool:
+    """Whether offset is a cluster boundary whatever text surrounds the code points on either side.
+
+    True at either end and between two code points that cannot join.
+    """
+    return (
+        offset <= 0
+        or offset >= len(text)
+        or not (_JOINING_RE.match(text, offset - 1) or _JOINING_RE.match(text, offset))
+    )
+
+
+class MeasuredText:
+    """Text that is segmented into grapheme clusters at most once.
+
+    Instead of every boundary, the index keeps the offsets that fall inside
+    a cluster ("joins") in a compact integer array; a span's grapheme
+    length is its code point length minus the joins inside it, and trim
+    points are found by bisecting the joins. The index is built on the
+    first grapheme query, so character-counted platforms never pay for it.
+
+    Building it is a cheap scan: ASCII text without CR LF has no joins at
+    all, and otherwise only windows around code points that can join a
+    neighbour (combining marks, ZWJ, modifiers, flags, Hangul jamo, CR LF)
+    go through full UAX #29 segmentation.
+
+    Spans are measured as if segmented on their own, like a thread part is
+    once posted. A span that starts inside a cluster (a word token that
+    begins with a combining mark, say) can segment differently from the
+    full text, so only such spans are segmented again.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self._joins = None
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+    @property
+    def joins(self) -> array:
+        """Sorted offsets that fall inside a grapheme cluster."""
+        if self._joins is None:
+            self._joins = array("I")
+            if not self.text.isascii() or "\r\n" in self.text:
+                self._index_joins()
+        return self._joins
+
+    def edited(self, start: int, end: int, replacement: str) -> "MeasuredText":
+        """This text with text[start:end] replaced, reusing the join index.
+
+        Cluster boundaries between two code points that cannot join are
+        fixed by those two alone, so only the stretch between the nearest
+        such boundaries around the edit is indexed again; joins before it
+        are kept and joins after it are moved by the change in length.
+        """
+        text = self.text[:start] + replacement + self.text[end:]
+        edited = MeasuredText(text)
+        if self._joins is None:
+            return edited
+        new_end = start + len(replacement)
+        low = max(0, start - 1)
+        while not _is_fixed_boundary(text, low):
+            low -= 1
+        high = new_end + 1 if new_end < len(text) else new_end
+        while not _is_fixed_boundary(text, high):
+            high += 1
+        delta = new_end - end
+        joins = self._joins
+        edited._joins = joins[:bisect_left(joins, low)]
+        edited._index_joins(low, high)
+        edited._joins.extend(join + delta for join in joins[bisect_left(joins, high - delta):])
+        return edited
+
+    def _index_joins(self, low: int = 0, high: int = None):
+        text = self.text
+        high = len(text) if high is None else high
+        window_start = window_end = None
+        for match in _JOINING_RE.finditer(text, low, high):
+            start, end = match.span()
+            # One neighbour on each side of a run decides how it joins; runs
+            # whose windows touch are segmented together.
+            if window_end is not None and start - 1 <= window_end:
+                window_end = min(high, end + 1)
+                continue
+            if window_end is not None:
+                self._segment_window(window_start, window_end)
+                window_start = window_end = None
+            if _MARKS_RE.fullmatch(text, start, end):
+                # Marks join whatever precedes them unless it is a control
+                # character, and nothing joins them, so skip segmentation.
+                if start == 0 or _CONTROL_RE.match(text, start - 1):
+                    start += 1
+                self._joins.extend(range(start, end))
+            elif _FLAGS_RE.fullmatch(text, start, end):
+                # Regional indicators pair up into flags from the left.
+                self._joins.extend(range(start + 1, end, 2))
+            else:
+                window_start, window_end = max(low, start - 1), min(high, end + 1)
+        if window_end is not None:
+            self._segment_window(window_start, window_end)
+
+    def _segment_window(self, start: int, end: int):
+        offset = start
+        for cluster_length in grapheme.grapheme_lengths(self.text[start:end]):
+            self._joins.extend(range(offset + 1, offset + cluster_length))
+            offset += cluster_length
+
+    def length(self, start: int = 0, end: int = None, use_graphemes: bool = True) -> int:
+        """Length of text[start:end] in graphemes, or code points if not use_graphemes."""
+        end = len(self.text) if end is None else end
+        if start >= end:
+            return 0
+        joins = self.joins if use_graphemes else None
+        if not joins:
+            return end - start
+        first = bisect_right(joins, start)
+        if first and joins[first - 1] == start:
+            # Starts inside a cluster; see the class docstring.
+            return grapheme.length(self.text[start:end])
+        # A span cut short inside a cluster keeps that cluster's head as one
+        # grapheme, so a join at `end` itself is not subtracted.
+        return end - start - (bisect_left(joins, end, first) - first)
+
+    def trim_point(self, start: int, end: int, count: int, use_graphemes: bool = True) -> int:
+        """Offset at which text[start:end] holds its first `count` graphemes.
+
+        Returns `end` when the span is no longer than `count`.
+        """
+        if count <= 0:
+            return start
+        if not use_graphemes:
+            return min(end, start + count)
+        joins = self.joins
+        first = bisect_right(joins, start)
+        if first and joins[first - 1] == start:
+            return start + sum(islice(grapheme.grapheme_lengths(self.text[start:end]), count))
+        # Skip over the joins passed on the way; the first fixed point is the
+        # boundary after `count` clusters.
+        offset = start + count
+        while offset < end:
+            target = start + count + bisect_right(joins, offset, first) - first
+            if target == offset:
+                return offset
+            offset = target
+        return end
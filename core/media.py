@@ -1,8 +1,19 @@
 """Image validation and resizing for cross-platform posting."""
 
 import io
+import math
+import mmap
+import time
+from dataclasses import dataclass
+from functools import partial
+from typing import Optional
 
-from PIL import Image
+from PIL import Image, ImageOps
+
+from core.animation import ANIMATION_CPU_BUDGET_SECONDS, encode_animation, plan_animation
+from core.media_cache import VariantCache, source_digest
+from core.metadata import ORIENTATION_TAG, StrippedImage
+from core.size_model import DensityModel
 
 
 PLATFORM_IMAGE_LIMITS = {
@@ -12,66 +23,714 @@ PLATFORM_IMAGE_LIMITS = {
 }
 
 
-def validate_image(data: bytes) -> bool:
+# Encoder tuning: aim for output in [TARGET_FILL * max_bytes, max_bytes].
+TARGET_FILL = 0.85
+MAX_ENCODES = 8
+DEFAULT_JPEG_QUALITY = 85
+MIN_JPEG_QUALITY = 60
+# Typical JPEG output density for photos at DEFAULT_JPEG_QUALITY, used to
+# predict the first scale when the source gives no better hint.
+DEFAULT_JPEG_BYTES_PER_PIXEL = 0.35
+MIN_DIMENSION = 10
+
+# Images above this many pixels are rejected from the header alone, before
+# any pixel buffer is allocated (decompression-bomb guard).
+MAX_IMAGE_PIXELS = 100_000_000
+# Non-JPEG sources with at most this many distinct colors (screenshots, line
+# art, diagrams) are encoded as palette PNG instead of JPEG. Anti-aliased text
+# pushes real screenshots past 256 colors, but photos have far more.
+FLAT_MAX_COLORS = 4096
+PALETTE_COLORS = 256
+# Reduced decodes keep this much headroom over the predicted output size so
+# the encoder can still scale up if the first prediction was pessimistic.
+DRAFT_MARGIN = 1.5
+
+
+# Leading magic bytes of the accepted formats, checked before Pillow is involved.
+_IMAGE_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "PNG"),
+    (b"\xff\xd8\xff", "JPEG"),
+    (b"GIF87a", "GIF"),
+    (b"GIF89a", "GIF"),
+)
+
+# (MIME type, file extension) per accepted format.
+IMAGE_FORMAT_TYPES = {
+    "PNG": ("image/png", "png"),
+    "JPEG": ("image/jpeg", "jpg"),
+    "GIF": ("image/gif", "gif"),
+}
+
+
+@dataclass(frozen=True)
+class ImageDescriptor:
+    """What one header parse learned about an image."""
+
+    format: str
+    width: int
+    height: int
+    mode: str
+    byte_size: int
+    frames: int = 1
+
+    @property
+    def pixels(self) -> int:
+        return self.width * self.height
+
+    @property
+    def animated(self) -> bool:
+        """Animated GIFs are re-encoded as GIFs; other formats use their first frame."""
+        return self.format == "GIF" and self.frames > 1
+
+    @property
+    def mime_type(self) -> str:
+        return IMAGE_FORMAT_TYPES[self.format][0]
+
+
+@dataclass
+class SizeEstimate:
+    """Predicted outcome of preparing one image for one platform."""
+
+    action: str  # "keep" (already fits) or "resize"
+    format: str
+    scale: float
+    quality: Optional[int]
+    bytes: int
+
+
+@dataclass
+class EncodeResult:
+    data: bytes
+    scale: float
+    quality: Optional[int]  # None for PNG
+    encodes: int
+    format: str = "JPEG"
+
+
+# PNG/GIF modes that almost always mean flat content; used to guess the
+# output format from the header alone when estimating.
+FLAT_SOURCE_MODES = ("1", "P", "PA")
+
+# Learned output density per (source format, output format). JPEG re-encodes
+# and palette PNGs scale the source's own density; PNG/GIF photos going to
+# JPEG start from an absolute prior.
+DENSITY_PRIORS = {
+    ("PNG", "JPEG"): DEFAULT_JPEG_BYTES_PER_PIXEL,
+    ("GIF", "JPEG"): DEFAULT_JPEG_BYTES_PER_PIXEL,
+}
+density_model = DensityModel(priors=DENSITY_PRIORS)
+
+# Uploads at least this large are memory-mapped rather than read into memory.
+MMAP_MIN_BYTES = 1024 * 1024
+
+
+class _BufferReader(io.RawIOBase):
+    """Seekable, zero-copy file object over a buffer such as an mmap."""
+
+    def __init__(self, data):
+        self._view = memoryview(data)
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        count = max(0, min(len(buffer), len(self._view) - self._pos))
+        buffer[:count] = self._view[self._pos:self._pos + count]
+        self._pos += count
+        return count
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: len(self._view)}[whence]
+        self._pos = max(0, base + offset)
+        return self._pos
+
+    def tell(self) -> int:
+        return self._pos
+
+    def close(self):
+        self._view.release()
+        super().close()
+
+
+def _reader(data) -> io.IOBase:
+    # BytesIO shares a bytes object's memory, but would copy any other buffer.
+    return io.BytesIO(data) if isinstance(data, bytes) else _BufferReader(data)
+
+
+def _as_bytes(data) -> bytes:
+    return data if isinstance(data, bytes) else bytes(data)
+
+
+def upload_buffer(stream):
+    """Return an uploaded file's contents without holding large files in memory.
+
+    Small uploads are read as bytes. Larger ones, which Werkzeug has already
+    spooled to a temporary file, are memory-mapped read-only, so the pages
+    are backed by that file rather than by the process heap. Everything in
+    this module, and `core.metadata`, accepts either.
+
+    Args:
+        stream: The upload's file object, e.g. `FileStorage.stream`.
+
+    Returns:
+        bytes or a read-only mmap.
+    """
+    stream.seek(0, io.SEEK_END)
+    size = stream.tell()
+    stream.seek(0)
+    if size < MMAP_MIN_BYTES:
+        return stream.read()
+    try:
+        stream.flush()
+        # The mapping stays valid after the request closes the temp file.
+        return mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+    except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+        return stream.read()
+
+
+def sniff_format(data) -> Optional[str]:
+    """Return "PNG", "JPEG" or "GIF" from leading magic bytes, or None."""
+    head = bytes(data[:8])
+    for signature, image_format in _IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return image_format
+    return None
+
+
+def _open_image(data: bytes, max_pixels: Optional[int] = None) -> tuple[Image.Image, ImageDescriptor]:
+    """Sniff and lazily open an image, enforcing the pixel ceiling from its header.
+
+    Raises:
+        ValueError: If the data is not a PNG, JPEG or GIF within the ceiling.
+    """
+    image_format = sniff_format(data) if data else None
+    if image_format is None:
+        raise ValueError("Not a PNG, JPEG or GIF image.")
+    try:
+        img = Image.open(_reader(data), formats=[image_format])
+    except Exception as e:
+        raise ValueError(f"Invalid {image_format} image: {e}") from e
+    descriptor = ImageDescriptor(
+        format=img.format,
+        width=img.width,
+        height=img.height,
+        mode=img.mode,
+        byte_size=len(data),
+        # Counting GIF frames walks the block structure without decoding pixels.
+        frames=getattr(img, "n_frames", 1),
+    )
+    limit = max_pixels or MAX_IMAGE_PIXELS
+    if descriptor.pixels > limit:
+        raise ValueError(f"Image has {descriptor.pixels} pixels; the limit is {limit}.")
+    return img, descriptor
+
+
+def describe_image(data: bytes, max_pixels: Optional[int] = None) -> ImageDescriptor:
+    """Validate an image and describe it from a single parse.
+
+    Magic bytes are checked first so other input never reaches Pillow. The
+    pixel ceiling is enforced from the header, before any pixel data is read.
+
+    Args:
+        data: Raw image bytes or a buffer from upload_buffer().
+        max_pixels: Pixel ceiling; defaults to MAX_IMAGE_PIXELS.
+
+    Returns:
+        ImageDescriptor with the format, dimensions, mode and byte size.
+
+    Raises:
+        ValueError: If the data is not a valid PNG, JPEG or GIF within the ceiling.
+    """
+    img, descriptor = _open_image(data, max_pixels)
+    try:
+        img.verify()
+    except Exception as e:
+        raise ValueError(f"Invalid {descriptor.format} image: {e}") from e
+    return descriptor
+
+
+def _open_gif(data) -> Image.Image:
+    return Image.open(_reader(data), formats=["GIF"])
+
+
+def validate_image(data: bytes, max_pixels: Optional[int] = None) -> bool:
     """Check if data is a valid image (PNG, JPEG, or GIF).
 
     Args:
         data: Raw image bytes.
+        max_pixels: Pixel ceiling; defaults to MAX_IMAGE_PIXELS.
 
     Returns:
         True if valid image, False otherwise.
     """
-    if not data:
-        return False
     try:
-        img = Image.open(io.BytesIO(data))
-        img.verify()
-        return img.format in ("PNG", "JPEG", "GIF")
-    except Exception:
+        describe_image(data, max_pixels=max_pixels)
+    except ValueError:
         return False
+    return True
 
 
-def resize_for_platform(data: bytes, platform: str) -> bytes:
-    """Resize an image to fit a platform's size constraints.
+def _predict_scale(pixels: int, max_bytes: int, bytes_per_pixel: float, min_scale: float = 0.0) -> float:
+    """Scale at which `pixels` at `bytes_per_pixel` lands mid target band."""
+    target = max_bytes * (1 + TARGET_FILL) / 2
+    return min(1.0, max(min_scale, math.sqrt(target / (bytes_per_pixel * pixels))))
+
+
+def _has_alpha(img: Image.Image) -> bool:
+    return img.mode in ("RGBA", "LA", "PA") or (img.mode == "P" and "transparency" in img.info)
+
+
+def _apply_orientation(img: Image.Image) -> Image.Image:
+    """Rotate/flip pixels upright per EXIF Orientation; re-encodes carry no EXIF."""
+    if img.getexif().get(ORIENTATION_TAG, 1) in (1, None):
+        return img
+    return ImageOps.exif_transpose(img)
+
+
+def _density_base(descriptor: ImageDescriptor, output_format: str) -> float:
+    if descriptor.format == "JPEG" or output_format == "PNG":
+        return descriptor.byte_size / descriptor.pixels
+    return 1.0
 
-    Progressively reduces dimensions until the file size is under the limit.
+
+def _density_hint(descriptor: ImageDescriptor, output_format: str, model: DensityModel) -> float:
+    """Predicted bytes per output pixel for re-encoding `descriptor` as `output_format`."""
+    return model.predict((descriptor.format, output_format), _density_base(descriptor, output_format))
+
+
+def estimate_variants(
+    descriptor: ImageDescriptor,
+    platforms: list[str],
+    model: Optional[DensityModel] = None,
+) -> dict[str, SizeEstimate]:
+    """Predict each platform's output size, scale and quality from the header alone.
+
+    Nothing is decoded: the output format is guessed from the source format
+    and mode, and the scale comes from the same learned density the encoder
+    starts from (for animated GIFs, the same plan `encode_animation` starts
+    from), so this costs microseconds per platform.
 
     Args:
-        data: Raw image bytes.
-        platform: Platform name (twitter, bluesky, linkedin, substack).
+        descriptor: The image's ImageDescriptor.
+        platforms: Platform names; unknown platforms keep the original.
+        model: Density model; defaults to the process-wide `density_model`.
 
     Returns:
-        Image bytes, possibly resized.
+        Dict mapping each platform name to a SizeEstimate.
     """
-    limits = PLATFORM_IMAGE_LIMITS.get(platform)
-    if not limits:
-        return data
+    model = model or density_model
+    if descriptor.animated:
+        output_format = "GIF"
+    elif descriptor.format == "JPEG" or descriptor.mode not in FLAT_SOURCE_MODES:
+        output_format = "JPEG"
+    else:
+        output_format = "PNG"
+
+    estimates = {}
+    for platform in platforms:
+        limits = PLATFORM_IMAGE_LIMITS.get(platform)
+        if not limits or descriptor.byte_size <= limits["max_bytes"]:
+            estimates[platform] = SizeEstimate("keep", descriptor.format, 1.0, None, descriptor.byte_size)
+            continue
+        max_bytes = limits["max_bytes"]
+        if output_format == "GIF":
+            plan = plan_animation(descriptor.byte_size, descriptor.frames, max_bytes, TARGET_FILL)
+            estimates[platform] = SizeEstimate(
+                action="resize",
+                format="GIF",
+                scale=round(plan.scale, 3),
+                quality=None,
+                bytes=int(max_bytes * (1 + TARGET_FILL) / 2),
+            )
+            continue
+        density = _density_hint(descriptor, output_format, model)
+        scale = _predict_scale(descriptor.pixels, max_bytes, density)
+        estimates[platform] = SizeEstimate(
+            action="resize",
+            format=output_format,
+            scale=round(scale, 3),
+            quality=DEFAULT_JPEG_QUALITY if output_format == "JPEG" else None,
+            bytes=min(max_bytes, int(density * descriptor.pixels * scale * scale)),
+        )
+    return estimates
+
+
+def _decode_for_target(
+    data: bytes,
+    max_bytes: int,
+    descriptor: Optional[ImageDescriptor] = None,
+    max_pixels: Optional[int] = None,
+    image: Optional[Image.Image] = None,
+    model: Optional[DensityModel] = None,
+) -> tuple[Image.Image, float, str]:
+    """Decode an image and pick its output format for max_bytes.
 
-    max_bytes = limits["max_bytes"]
+    JPEG sources are treated as photos. They use draft mode so libjpeg's DCT
+    scaling decodes straight to 1/2, 1/4 or 1/8 size. Other sources are fully
+    decoded (PNG and GIF have no reduced decode) and classified by color
+    count: flat images with at most FLAT_MAX_COLORS colors keep their alpha
+    and go to palette PNG. The rest are photos, shrunk with a cheap
+    `reduce()` before the encoder's high-quality LANCZOS resample.
 
-    if len(data) <= max_bytes:
-        return data
+    Without a descriptor the image is sniffed and checked against max_pixels
+    by the same parse that decodes it; `image` passes in an already opened,
+    not yet loaded image for `descriptor`. EXIF orientation is applied.
+    The decode size comes from the density `model` (see estimate_variants).
 
-    img = Image.open(io.BytesIO(data))
-    # Convert to RGB if necessary (e.g., RGBA PNGs)
-    if img.mode in ("RGBA", "P"):
+    Returns:
+        (decoded image, predicted output bytes-per-pixel, "JPEG" or "PNG").
+        JPEG output is always RGB or L.
+
+    Raises:
+        ValueError: If the image is not valid or exceeds the pixel ceiling.
+    """
+    if descriptor is None:
+        img, descriptor = _open_image(data, max_pixels)
+    elif image is not None:
+        img = image
+    else:
+        img = Image.open(_reader(data), formats=[descriptor.format])
+
+    model = model or density_model
+    if descriptor.format != "JPEG":
+        img = _apply_orientation(img)
+        if img.mode not in ("RGB", "L"):
+            img = img.convert("RGBA" if _has_alpha(img) else "RGB")
+        if img.getcolors(FLAT_MAX_COLORS) is not None:
+            return img, _density_hint(descriptor, "PNG", model), "PNG"
+
+    density = _density_hint(descriptor, "JPEG", model)
+    scale = _predict_scale(descriptor.pixels, max_bytes, density)
+    needed = min(1.0, scale * DRAFT_MARGIN)
+
+    full_width = img.width
+    if needed < 1.0 and img.format == "JPEG" and img.mode in ("RGB", "L"):
+        img.draft(img.mode, (math.ceil(img.width * needed), math.ceil(img.height * needed)))
+    # Whatever draft mode did not already shrink, reduce by an integer factor.
+    factor = int(img.width / (full_width * needed))
+
+    if descriptor.format == "JPEG":
+        img = _apply_orientation(img)
+    # JPEG can't store alpha or palettes (e.g., RGBA PNGs).
+    if img.mode not in ("RGB", "L"):
         img = img.convert("RGB")
 
-    # Progressively scale down until under the size limit
-    scale = 0.9
-    for _ in range(20):
-        new_w = int(img.width * scale)
-        new_h = int(img.height * scale)
-        if new_w < 10 or new_h < 10:
-            break
-        resized = img.resize((new_w, new_h), Image.LANCZOS)
-        buf = io.BytesIO()
-        resized.save(buf, format="JPEG", quality=85)
-        if buf.tell() <= max_bytes:
-            return buf.getvalue()
-        scale *= 0.9
-
-    # Last resort: return whatever we got
+    if factor >= 2:
+        img = img.reduce(factor)
+    return img, density, "JPEG"
+
+
+def _scaled_size(img: Image.Image, scale: float) -> tuple[int, int]:
+    return max(1, int(img.width * scale)), max(1, int(img.height * scale))
+
+
+def _encode_jpeg(img: Image.Image, scale: float, quality: int) -> bytes:
+    size = _scaled_size(img, scale)
+    resized = img if size == img.size else img.resize(size, Image.LANCZOS)
+    buf = io.BytesIO()
+    resized.save(buf, format="JPEG", quality=quality, optimize=True)
+    return buf.getvalue()
+
+
+def _encode_palette_png(img: Image.Image, scale: float, palette: Optional[Image.Image]) -> bytes:
+    """Encode as 8-bit PNG, mapping resampled RGB pixels back onto `palette`."""
+    size = _scaled_size(img, scale)
+    resized = img if size == img.size else img.resize(size, Image.LANCZOS)
+    if palette is not None:
+        resized = resized.quantize(palette=palette, dither=Image.Dither.NONE)
+    elif resized.mode == "RGBA":
+        # Pillow can only remap RGB onto a fixed palette; quantize alpha images per scale.
+        resized = resized.quantize(PALETTE_COLORS, method=Image.Quantize.FASTOCTREE)
+        # Octree buckets average alpha; snap near-opaque/near-clear entries back.
+        entries = resized.getpalette("RGBA")
+        entries[3::4] = [0 if a <= 8 else 255 if a >= 247 else a for a in entries[3::4]]
+        resized.putpalette(entries, "RGBA")
     buf = io.BytesIO()
-    resized.save(buf, format="JPEG", quality=70)
+    resized.save(buf, format="PNG")
     return buf.getvalue()
+
+
+def encode_to_target(
+    img: Image.Image,
+    max_bytes: int,
+    bytes_per_pixel: Optional[float] = None,
+    output_format: str = "JPEG",
+) -> EncodeResult:
+    """Encode a decoded image just under max_bytes in a few passes.
+
+    The first scale is predicted from bytes-per-pixel; each encode then refines
+    that density estimate and the next scale is bracketed between the largest
+    scale known to fit and the smallest known to overshoot (bisecting when the
+    prediction falls outside the bracket). If a JPEG's best fit still
+    undershoots the target band, quality is bisected at the overshooting
+    scale instead.
+
+    Args:
+        img: Decoded image; RGB or L for JPEG, RGB, RGBA or L for PNG.
+        max_bytes: Hard output size limit.
+        bytes_per_pixel: Optional density hint, e.g. from a JPEG source.
+        output_format: "JPEG", or "PNG" for a palette PNG of flat content.
+
+    Returns:
+        EncodeResult with the bytes, the scale and quality used, and the
+        number of encode passes spent.
+    """
+    pixels = img.width * img.height
+    floor = max_bytes * TARGET_FILL
+    min_scale = min(1.0, max(MIN_DIMENSION / img.width, MIN_DIMENSION / img.height))
+
+    def _predict(density: float) -> float:
+        return _predict_scale(pixels, max_bytes, density, min_scale)
+
+    if output_format == "PNG":
+        quality = None
+        # Fix the palette once at full size so every scale maps onto the same colors.
+        palette = None if img.mode != "RGB" else img.quantize(
+            PALETTE_COLORS, method=Image.Quantize.FASTOCTREE,
+        )
+
+        def _encode(scale: float, quality: Optional[int]) -> bytes:
+            return _encode_palette_png(img, scale, palette)
+    else:
+        quality = DEFAULT_JPEG_QUALITY
+        _encode = partial(_encode_jpeg, img)
+
+    encodes = 0
+    best = None  # largest output that fits
+    smallest = None  # fallback if nothing fits
+    fit_scale = None  # largest scale known to fit
+    over_scale = None  # smallest scale known to overshoot
+    scale = _predict(bytes_per_pixel or DEFAULT_JPEG_BYTES_PER_PIXEL)
+
+    while encodes < MAX_ENCODES:
+        data = _encode(scale, quality)
+        encodes += 1
+        size = len(data)
+        if size <= max_bytes:
+            if best is None or size > len(best.data):
+                best = EncodeResult(data, scale, quality, encodes, output_format)
+            if size >= floor or scale >= 1.0:
+                break
+            fit_scale = scale if fit_scale is None else max(fit_scale, scale)
+        else:
+            if smallest is None or size < len(smallest.data):
+                smallest = EncodeResult(data, scale, quality, encodes, output_format)
+            over_scale = scale if over_scale is None else min(over_scale, scale)
+            if scale <= min_scale:
+                break
+
+        lo = fit_scale if fit_scale is not None else min_scale
+        hi = over_scale if over_scale is not None else 1.0
+        if hi / lo < 1.01:
+            break
+        width, height = _scaled_size(img, scale)
+        scale = _predict(size / (width * height))
+        if not lo < scale < hi:
+            scale = math.sqrt(lo * hi)
+
+    # The next scale up overshoots but the best fit is well under the band:
+    # keep the larger scale and trade a little quality instead.
+    if output_format == "JPEG" and over_scale is not None and (best is None or len(best.data) < floor):
+        q_lo, q_hi = MIN_JPEG_QUALITY, quality
+        while encodes < MAX_ENCODES and q_hi - q_lo > 1:
+            q = (q_lo + q_hi) // 2
+            data = _encode_jpeg(img, over_scale, q)
+            encodes += 1
+            if len(data) <= max_bytes:
+                if best is None or len(data) > len(best.data):
+                    best = EncodeResult(data, over_scale, q, encodes)
+                if len(data) >= floor:
+                    break
+                q_lo = q
+            else:
+                q_hi = q
+
+    result = best or smallest
+    result.encodes = encodes
+    return result
+
+
+def _encode_variant(
+    img: Image.Image,
+    max_bytes: int,
+    descriptor: ImageDescriptor,
+    output_format: str,
+    model: DensityModel,
+) -> EncodeResult:
+    """Encode with the chosen format, falling back to JPEG if a palette PNG can't fit.
+
+    Each encode's final density is fed back into `model`.
+    """
+    def _encode(img: Image.Image, output_format: str) -> EncodeResult:
+        key = (descriptor.format, output_format)
+        base = _density_base(descriptor, output_format)
+        result = encode_to_target(img, max_bytes, model.predict(key, base), output_format)
+        width, height = _scaled_size(img, result.scale)
+        model.observe(key, base, len(result.data) / (width * height))
+        return result
+
+    if output_format == "PNG":
+        result = _encode(img, "PNG")
+        if len(result.data) <= max_bytes:
+            return result
+        img = img.convert("RGB") if img.mode not in ("RGB", "L") else img
+    return _encode(img, "JPEG")
+
+
+def resize_for_platforms(
+    data: bytes,
+    platforms: list[str],
+    max_pixels: Optional[int] = None,
+    cache: Optional[VariantCache] = None,
+    descriptor: Optional[ImageDescriptor] = None,
+    model: Optional[DensityModel] = None,
+) -> dict[str, bytes]:
+    """Produce every platform's variant of an image, sharing decodes where possible.
+
+    Images that already fit a platform's limit are passed through untouched.
+    Over-limit targets are processed strictest limit first (BlueSky's 1MB).
+    Each first tries a lossless metadata strip (see `core.metadata`), then
+    the same without the ICC profile, and only then decodes and resizes.
+    Flat content (screenshots, line art) becomes a palette PNG and photos
+    become optimized JPEGs; see `_decode_for_target`. A stricter target's
+    output is reused for a looser target only if it already lands in that
+    target's fill band (or is full size at full quality); otherwise the
+    decoded image is encoded again, and decoded again only if the first
+    decode was shrunk for the stricter target. Animated GIFs
+    stay animated and are streamed frame by frame (see `core.animation`);
+    if that can't fit within ANIMATION_CPU_BUDGET_SECONDS of CPU time, the
+    first frame is used like a still. With a cache,
+    variants already produced for the same source bytes skip the decode and
+    encode entirely. Only variants encoded for their own target are cached.
+
+    Args:
+        data: Raw image bytes or a buffer from upload_buffer().
+        platforms: Platform names; unknown platforms get the original bytes.
+        max_pixels: Pixel ceiling; defaults to MAX_IMAGE_PIXELS.
+        cache: Optional content-addressed variant cache.
+        descriptor: ImageDescriptor from an earlier describe_image() call;
+            otherwise the decode itself sniffs and checks the header.
+        model: Density model the encoder starts from and learns into;
+            defaults to the process-wide `density_model`.
+
+    Returns:
+        Dict mapping each platform name to its image bytes.
+
+    Raises:
+        ValueError: If the image is invalid, its pixel data is truncated or
+            corrupt, or it exceeds the pixel ceiling.
+    """
+    variants = {}
+    targets = []
+    source = None
+    for platform in platforms:
+        limits = PLATFORM_IMAGE_LIMITS.get(platform)
+        if not limits or len(data) <= limits["max_bytes"]:
+            # Variants are always bytes, even for an mmap'd upload.
+            source = source if source is not None else _as_bytes(data)
+            variants[platform] = source
+        else:
+            targets.append((limits["max_bytes"], platform))
+
+    digest = source_digest(data) if cache is not None and targets else None
+    opened = None
+    stripped = None
+    decoded = None
+    previous = None
+    # Whether a looser budget could do better than `previous`.
+    previous_capped = False
+    animation_deadline = None
+    try:
+        for max_bytes, platform in sorted(targets):
+            cache_key = VariantCache.key(digest, platform) if digest else None
+            cached = cache.get(cache_key) if cache_key else None
+            if cached is not None:
+                previous = variants[platform] = cached
+                previous_capped = True
+                continue
+
+            if descriptor is None:
+                opened, descriptor = _open_image(data, max_pixels)
+            if stripped is None:
+                # Lossless first: metadata alone often explains a small overshoot.
+                # Sizes are known before anything is copied out of the source.
+                stripped = [
+                    StrippedImage(data, descriptor.format),
+                    StrippedImage(data, descriptor.format, keep_icc=False),
+                ]
+            lossless = next((candidate for candidate in stripped if len(candidate) <= max_bytes), None)
+            reused = False
+            if lossless is not None:
+                previous = lossless.tobytes()
+                previous_capped = False
+            elif (
+                previous is None
+                or len(previous) > max_bytes
+                or (previous_capped and len(previous) < TARGET_FILL * max_bytes)
+            ):
+                previous = None
+                previous_capped = True
+                if descriptor.animated and decoded is None:
+                    if animation_deadline is None:
+                        animation_deadline = time.thread_time() + ANIMATION_CPU_BUDGET_SECONDS
+                    animation = encode_animation(
+                        partial(_open_gif, data),
+                        descriptor.frames,
+                        descriptor.byte_size,
+                        max_bytes,
+                        TARGET_FILL,
+                        animation_deadline,
+                    )
+                    if animation is not None:
+                        previous = animation.data
+                if previous is None:
+                    # Still images, and animations that could not fit within the
+                    # CPU budget, are encoded from the first frame.
+                    # A decode shrunk for a stricter target is too small for this one.
+                    if decoded is None or decoded.width * decoded.height < descriptor.pixels:
+                        decoded, _, output_format = _decode_for_target(
+                            data, max_bytes, descriptor, image=opened, model=model,
+                        )
+                        opened = None
+                    result = _encode_variant(
+                        decoded, max_bytes, descriptor, output_format, model or density_model,
+                    )
+                    previous = result.data
+                    previous_capped = (
+                        result.scale < 1.0
+                        or result.quality not in (None, DEFAULT_JPEG_QUALITY)
+                        or decoded.width * decoded.height < descriptor.pixels
+                    )
+            else:
+                reused = True
+            variants[platform] = previous
+            # A reused stricter variant depends on which other targets were
+            # requested, so only output produced for this target is cached.
+            if cache_key and not reused:
+                cache.put(cache_key, previous)
+
+    except (OSError, EOFError) as e:
+        # The header parsed, but the pixel data is truncated or corrupt.
+        raise ValueError(f"Invalid {descriptor.format} image: {e}") from e
+
+    return variants
+
+
+def resize_for_platform(data: bytes, platform: str) -> bytes:
+    """Resize an image to fit a platform's size constraints.
+
+    Scales (and if needed re-qualities) the image to land just under the limit,
+    as a palette PNG for flat content and a JPEG otherwise.
+
+    Args:
+        data: Raw image bytes.
+        platform: Platform name (twitter, bluesky, linkedin, substack).
+
+    Returns:
+        Image bytes, possibly resized.
+    """
+    return resize_for_platforms(data, [platform])[platform]
@@ -0,0 +1,132 @@
+"""Content-addressed cache of encoded platform image variants."""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+# Bump when encoder output changes so stale variants are never served.
+VARIANT_CACHE_VERSION = 5
+
+
+def source_digest(data: bytes) -> str:
+    """SHA-256 hex digest of the source image bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+
+class VariantCache:
+    """Two-tier LRU cache of resized image variants.
+
+    Keys are the SHA-256 of the source bytes plus the platform target, so
+    retries and re-posts of the same image skip decoding and encoding. The
+    memory tier is bounded by `memory_bytes`; the optional disk tier under
+    `disk_dir` survives restarts and is trimmed oldest-first (by access time
+    recorded in mtime) once it grows past `disk_bytes`.
+    """
+
+    def __init__(
+        self,
+        memory_bytes: int = 64 * 1024 * 1024,
+        disk_dir: Optional[Path] = None,
+        disk_bytes: int = 512 * 1024 * 1024,
+    ):
+        self.memory_bytes = memory_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_bytes = disk_bytes
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._memory_used = 0
+        self._disk_used: Optional[int] = None
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+
+    @staticmethod
+    def key(digest: str, platform: str) -> str:
+        return f"{digest}-{platform}-v{VARIANT_CACHE_VERSION}"
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / key[:2] / key
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                return data
+
+        if self.disk_dir is None:
+            return None
+        path = self._disk_path(key)
+        try:
+            data = path.read_bytes()
+            os.utime(path)  # mark as recently used for eviction
+        except OSError:
+            return None
+        self._remember(key, data)
+        return data
+
+    def put(self, key: str, data: bytes):
+        self._remember(key, data)
+        if self.disk_dir is not None:
+            self._write_disk(key, data)
+
+    def _remember(self, key: str, data: bytes):
+        if len(data) > self.memory_bytes:
+            return
+        with self._lock:
+            previous = self._memory.pop(key, None)
+            if previous is not None:
+                self._memory_used -= len(previous)
+            self._memory[key] = data
+            self._memory_used += len(data)
+            while self._memory_used > self.memory_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_used -= len(evicted)
+
+    def _disk_entries(self) -> list[tuple[float, int, Path]]:
+        entries = []
+        for path in self.disk_dir.glob("*/*"):
+            if path.name.endswith(".tmp"):
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _write_disk(self, key: str, data: bytes):
+        path = self._disk_path(key)
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_bytes(data)
+            try:
+                replaced = path.stat().st_size
+            except FileNotFoundError:
+                replaced = 0
+            os.replace(tmp_path, path)
+        except OSError:
+            # The disk tier is best-effort; the memory tier still has the entry.
+            return
+
+        with self._disk_lock:
+            if self._disk_used is None:
+                self._disk_used = sum(size for _, size, _ in self._disk_entries())
+            else:
+                self._disk_used += len(data) - replaced
+            if self._disk_used <= self.disk_bytes:
+                return
+            # Trim to 90% so a full cache doesn't rescan on every write.
+            entries = sorted(self._disk_entries())
+            used = sum(size for _, size, _ in entries)
+            for _, size, old_path in entries:
+                if used <= self.disk_bytes * 0.9:
+                    break
+                try:
+                    old_path.unlink()
+                    used -= size
+                except OSError:
+                    pass
+            self._disk_used = used
@@ -0,0 +1,202 @@
+"""Optional process pool for CPU-bound image resizing."""
+
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from multiprocessing import shared_memory
+from typing import Optional
+
+from core.media import PLATFORM_IMAGE_LIMITS, ImageDescriptor, _as_bytes, resize_for_platforms
+from core.media_cache import VariantCache, source_digest
+
+
+def _write_shared(data: bytes) -> shared_memory.SharedMemory:
+    shm = shared_memory.SharedMemory(create=True, size=max(1, len(data)))
+    shm.buf[:len(data)] = data
+    return shm
+
+
+def _take_shared(name: str, size: int) -> bytes:
+    """Copy a block out of shared memory and free it."""
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        return bytes(shm.buf[:size])
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def _resize_in_worker(
+    source_name: str,
+    source_size: int,
+    platforms: list[str],
+    max_pixels: Optional[int],
+    descriptor: Optional[ImageDescriptor],
+) -> tuple[Optional[str], int, dict[str, Optional[tuple[int, int]]], list[str]]:
+    """Worker entry point: resize the shared source and share the variants back.
+
+    Returns:
+        (output block name or None, output size, platform -> (offset, length)
+        in the output block or None where the platform keeps the source,
+        platforms whose variant may be cached).
+    """
+    shm = shared_memory.SharedMemory(name=source_name)
+    try:
+        data = bytes(shm.buf[:source_size])
+    finally:
+        shm.close()
+
+    # A throwaway cache records which variants resize_for_platforms would
+    # cache, i.e. those encoded for their own target rather than reused.
+    cache = VariantCache()
+    variants = resize_for_platforms(
+        data, platforms, max_pixels=max_pixels, cache=cache, descriptor=descriptor,
+    )
+    digest = source_digest(data)
+    cacheable = [
+        platform for platform in variants
+        if cache.get(VariantCache.key(digest, platform)) is not None
+    ]
+
+    layout = {}
+    chunks = []
+    offsets = {}  # id(variant) -> offset, so reused variants are shared once
+    size = 0
+    for platform, variant in variants.items():
+        if variant is data:
+            layout[platform] = None
+            continue
+        if id(variant) not in offsets:
+            offsets[id(variant)] = size
+            chunks.append(variant)
+            size += len(variant)
+        layout[platform] = (offsets[id(variant)], len(variant))
+    if not chunks:
+        return None, 0, layout, cacheable
+
+    out = _write_shared(b"".join(chunks))
+    name = out.name
+    out.close()  # the parent unlinks it after copying the variants out
+    return name, size, layout, cacheable
+
+
+def _free_output(future: Future):
+    """Unlink the output block of a worker whose caller stopped waiting."""
+    if future.cancelled() or future.exception() is not None:
+        return
+    name = future.result()[0]
+    if name:
+        shm = shared_memory.SharedMemory(name=name)
+        shm.close()
+        shm.unlink()
+
+
+class MediaWorkerPool:
+    """Run `resize_for_platforms` in worker processes.
+
+    Source images and resized variants cross the process boundary through
+    shared memory blocks rather than being pickled. Cached variants are served
+    in-process, and when every worker is busy the request resizes in-process
+    as well instead of queueing behind other posts.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            # Forking a threaded Flask process is unsafe; start workers clean.
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> bool:
+        with self._lock:
+            if self._in_flight >= self.workers:
+                return False
+            self._in_flight += 1
+            return True
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    def _finish(self, source: shared_memory.SharedMemory, future: Optional[Future] = None):
+        """Free the worker slot and the source block once the worker is done with them."""
+        self._release()
+        source.close()
+        source.unlink()
+
+    def resize_for_platforms(
+        self,
+        data: bytes,
+        platforms: list[str],
+        max_pixels: Optional[int] = None,
+        cache: Optional[VariantCache] = None,
+        descriptor: Optional[ImageDescriptor] = None,
+        timeout: Optional[float] = None,
+    ) -> dict[str, bytes]:
+        """Same contract as `core.media.resize_for_platforms`.
+
+        Cached targets are served here; only the missing ones go to a worker,
+        and the worker's cacheable variants are stored back in `cache`.
+
+        Raises:
+            concurrent.futures.TimeoutError: If the worker outlasts `timeout`.
+                It keeps its slot until it finishes, and its output is dropped.
+        """
+        over_limit = [
+            platform for platform in dict.fromkeys(platforms)
+            if platform in PLATFORM_IMAGE_LIMITS
+            and len(data) > PLATFORM_IMAGE_LIMITS[platform]["max_bytes"]
+        ]
+        digest = source_digest(data) if cache is not None and over_limit else None
+        variants = {}
+        if digest is not None:
+            for platform in over_limit:
+                cached = cache.get(VariantCache.key(digest, platform))
+                if cached is not None:
+                    variants[platform] = cached
+        missing = [platform for platform in over_limit if platform not in variants]
+
+        if missing and self._reserve():
+            source = _write_shared(data)
+            try:
+                future = self._executor.submit(
+                    _resize_in_worker, source.name, len(data), missing, max_pixels, descriptor,
+                )
+            except BaseException:
+                self._finish(source)
+                raise
+            future.add_done_callback(partial(self._finish, source))
+            try:
+                name, size, layout, cacheable = future.result(timeout=timeout)
+            except FutureTimeoutError:
+                future.add_done_callback(_free_output)
+                raise
+            except BrokenProcessPool:
+                # A worker died (e.g. OOM-killed); don't fail the post over it.
+                layout = None
+
+            if layout is not None:
+                block = _take_shared(name, size) if name else b""
+                for platform, span in layout.items():
+                    if span is not None:
+                        variants[platform] = block[span[0]:span[0] + span[1]]
+                if digest is not None:
+                    for platform in cacheable:
+                        cache.put(VariantCache.key(digest, platform), variants[platform])
+                missing = []
+
+        if missing:
+            # No free worker (or it died): resize in-process rather than queueing.
+            variants.update(resize_for_platforms(
+                data, missing, max_pixels=max_pixels, cache=cache, descriptor=descriptor,
+            ))
+        source = _as_bytes(data) if len(variants) < len(set(platforms)) else None
+        return {platform: variants.get(platform, source) for platform in platforms}
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,114 @@
+"""Upload-time media ingestion: images are pre-rendered before the post."""
+
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from core.media import PLATFORM_IMAGE_LIMITS, ImageDescriptor, resize_for_platforms
+from core.media_cache import VariantCache
+
+
+@dataclass
+class StoredMedia:
+    handle: str
+    data: bytes
+    descriptor: Optional[ImageDescriptor]
+    created_at: float
+    variants: Future  # resolves to dict[str, bytes] keyed by platform
+
+
+class MediaStore:
+    """Images attached in the composer, keyed by opaque handles.
+
+    `add()` returns a handle immediately and renders every platform's variant
+    on a background worker, so by the time the user posts the decode and
+    resize work is usually already done. Handles expire after `ttl_seconds`,
+    and at most `max_items` images are kept (oldest dropped first). `resize`
+    swaps in another implementation, e.g. a MediaWorkerPool's.
+    """
+
+    def __init__(
+        self,
+        platforms: Optional[list[str]] = None,
+        cache: Optional[VariantCache] = None,
+        max_pixels: Optional[int] = None,
+        ttl_seconds: float = 3600.0,
+        max_items: int = 64,
+        workers: int = 2,
+        clock: Callable[[], float] = time.monotonic,
+        resize: Callable[..., dict[str, bytes]] = resize_for_platforms,
+    ):
+        self.platforms = list(platforms or PLATFORM_IMAGE_LIMITS)
+        self.cache = cache
+        self.max_pixels = max_pixels
+        self.ttl_seconds = ttl_seconds
+        self.max_items = max_items
+        self._clock = clock
+        self._resize = resize
+        self._items: OrderedDict[str, StoredMedia] = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="media")
+
+    def _render(self, data: bytes, descriptor: Optional[ImageDescriptor]) -> dict[str, bytes]:
+        return self._resize(
+            data,
+            self.platforms,
+            max_pixels=self.max_pixels,
+            cache=self.cache,
+            descriptor=descriptor,
+        )
+
+    def _purge(self, now: float):
+        """Drop expired and overflow entries (lock held)."""
+        cutoff = now - self.ttl_seconds
+        while self._items:
+            handle, item = next(iter(self._items.items()))
+            if item.created_at >= cutoff and len(self._items) <= self.max_items:
+                break
+            self._items.pop(handle)
+            item.variants.cancel()
+
+    def add(self, data: bytes, descriptor: Optional[ImageDescriptor] = None) -> str:
+        """Store already-validated image bytes and start pre-rendering them."""
+        handle = secrets.token_urlsafe(16)
+        item = StoredMedia(
+            handle=handle,
+            data=data,
+            descriptor=descriptor,
+            created_at=self._clock(),
+            variants=self._executor.submit(self._render, data, descriptor),
+        )
+        with self._lock:
+            self._items[handle] = item
+            self._purge(item.created_at)
+        return handle
+
+    def get(self, handle: str) -> Optional[StoredMedia]:
+        with self._lock:
+            self._purge(self._clock())
+            return self._items.get(handle)
+
+    def variants(self, handle: str, timeout: Optional[float] = None) -> Optional[dict[str, bytes]]:
+        """Wait for and return a handle's platform variants, or None if unknown.
+
+        Raises:
+            ValueError: If the image could not be rendered (e.g. truncated data).
+            concurrent.futures.TimeoutError: If rendering outlasts `timeout`.
+        """
+        item = self.get(handle)
+        if item is None:
+            return None
+        if item.variants.cancelled():
+            # Evicted mid-flight elsewhere; render inline rather than fail.
+            return self._render(item.data, item.descriptor)
+        return item.variants.result(timeout=timeout)
+
+    def discard(self, handle: str):
+        with self._lock:
+            item = self._items.pop(handle, None)
+        if item is not None:
+            item.variants.cancel()
@@ -0,0 +1,210 @@
+"""Lossless removal of non-essential image metadata."""
+
+import struct
+import zlib
+from typing import Optional
+
+from PIL import Image
+
+ORIENTATION_TAG = 0x0112
+
+_EXIF_PREFIX = b"Exif\x00\x00"
+_ICC_PREFIX = b"ICC_PROFILE\x00"
+_JFIF_PREFIX = b"JFIF\x00"
+
+# JPEG markers
+_SOI = 0xD8
+_EOI = 0xD9
+_SOS = 0xDA
+_APP0 = 0xE0
+_APP1 = 0xE1
+_APP2 = 0xE2
+_APP14 = 0xEE  # Adobe: tells decoders how to interpret the color channels
+_COM = 0xFE
+_STANDALONE = {0x01} | set(range(0xD0, 0xD8))  # TEM and RSTn carry no length
+
+# Ancillary PNG chunks that change how pixels render (transparency, color,
+# animation); everything else ancillary is dropped.
+_PNG_KEEP = {b"tRNS", b"gAMA", b"cHRM", b"sRGB", b"sBIT", b"acTL", b"fcTL", b"fdAT"}
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def _orientation(tiff: bytes) -> int:
+    """Read the Orientation tag from a TIFF-structured EXIF block (1 if absent)."""
+    try:
+        exif = Image.Exif()
+        exif.load(tiff)
+        orientation = int(exif.get(ORIENTATION_TAG, 1))
+    except Exception:
+        return 1
+    return orientation if 1 <= orientation <= 8 else 1
+
+
+def _orientation_exif(orientation: int) -> bytes:
+    """Minimal big-endian TIFF block holding only the Orientation tag."""
+    return (
+        b"MM\x00\x2a\x00\x00\x00\x08"
+        + struct.pack(">HHHIHH", 1, ORIENTATION_TAG, 3, 1, orientation, 0)
+        + b"\x00\x00\x00\x00"
+    )
+
+
+def _jpeg_segment(marker: int, payload: bytes) -> bytes:
+    return bytes((0xFF, marker)) + struct.pack(">H", len(payload) + 2) + payload
+
+
+def _jpeg_scan_end(data: bytes, pos: int) -> int:
+    """Return the offset just past EOI, walking entropy-coded data from `pos`."""
+    while True:
+        pos = data.find(b"\xff", pos)
+        if pos < 0 or pos + 1 >= len(data):
+            return len(data)
+        marker = data[pos + 1]
+        if marker == 0x00 or marker == 0xFF or marker in _STANDALONE:
+            pos += 1 if marker == 0xFF else 2  # byte stuffing, fill or restart
+            continue
+        if marker == _EOI:
+            return pos + 2
+        # Progressive JPEGs interleave DHT/SOS segments with scan data.
+        if pos + 4 > len(data):
+            return len(data)
+        pos += 2 + struct.unpack(">H", data[pos + 2:pos + 4])[0]
+
+
+def _jpeg_pieces(data, keep_icc: bool) -> Optional[list]:
+    pieces = [(0, 2)]
+    pos = 2
+    while pos + 4 <= len(data):
+        if data[pos] != 0xFF:
+            return None  # not where a marker should be; leave the file alone
+        marker = data[pos + 1]
+        if marker == 0xFF:
+            pos += 1
+            continue
+        if marker in _STANDALONE:
+            pieces.append((pos, pos + 2))
+            pos += 2
+            continue
+        if marker == _SOS:
+            # Everything from the first scan to EOI is image data; anything
+            # after EOI (e.g. MPF secondary images) is dropped.
+            pieces.append((pos, _jpeg_scan_end(data, pos + 2)))
+            return pieces
+
+        end = pos + 2 + struct.unpack(">H", data[pos + 2:pos + 4])[0]
+        head = data[pos + 4:pos + 4 + len(_ICC_PREFIX)]
+        if marker == _APP0 and head.startswith(_JFIF_PREFIX) and end - pos >= 18:
+            # Keep the JFIF header, drop its embedded thumbnail.
+            pieces.append(_jpeg_segment(_APP0, data[pos + 4:pos + 16] + b"\x00\x00"))
+        elif marker == _APP1 and head.startswith(_EXIF_PREFIX):
+            orientation = _orientation(data[pos + 4:end])
+            if orientation != 1:
+                pieces.append(_jpeg_segment(_APP1, _EXIF_PREFIX + _orientation_exif(orientation)))
+        elif marker == _APP2 and head.startswith(_ICC_PREFIX):
+            if keep_icc:
+                pieces.append((pos, end))
+        elif marker == _APP14 or not (_APP0 <= marker <= 0xEF or marker == _COM):
+            pieces.append((pos, end))
+        pos = end
+    return None
+
+
+def _png_chunk(chunk_type: bytes, payload: bytes) -> bytes:
+    return (
+        struct.pack(">I", len(payload))
+        + chunk_type
+        + payload
+        + struct.pack(">I", zlib.crc32(chunk_type + payload))
+    )
+
+
+def _png_pieces(data, keep_icc: bool) -> Optional[list]:
+    pieces = [(0, len(_PNG_SIGNATURE))]
+    pos = len(_PNG_SIGNATURE)
+    while pos + 12 <= len(data):
+        length = struct.unpack(">I", data[pos:pos + 4])[0]
+        chunk_type = bytes(data[pos + 4:pos + 8])
+        end = pos + 12 + length
+        if end > len(data):
+            return None
+        critical = chunk_type[:1].isupper()
+        if critical or chunk_type in _PNG_KEEP or (keep_icc and chunk_type == b"iCCP"):
+            pieces.append((pos, end))
+        elif chunk_type == b"eXIf":
+            orientation = _orientation(_EXIF_PREFIX + data[pos + 8:end - 4])
+            if orientation != 1:
+                pieces.append(_png_chunk(b"eXIf", _orientation_exif(orientation)))
+        if chunk_type == b"IEND":
+            return pieces
+        pos = end
+    return None
+
+
+def _piece_length(piece) -> int:
+    # Pieces are new bytes or (start, end) spans of the source.
+    return piece[1] - piece[0] if isinstance(piece, tuple) else len(piece)
+
+
+class StrippedImage:
+    """Plan for a metadata-stripped copy of an image, assembled only on demand.
+
+    `len()` is known as soon as the file has been walked, so callers can
+    check a size limit before paying for a copy of a large (e.g. mmap'd)
+    upload.
+    """
+
+    def __init__(self, data, image_format: str, keep_icc: bool = True):
+        self._data = data
+        pieces = None
+        try:
+            if image_format == "JPEG" and data[:2] == bytes((0xFF, _SOI)):
+                pieces = _jpeg_pieces(data, keep_icc)
+            elif image_format == "PNG" and data[:len(_PNG_SIGNATURE)] == _PNG_SIGNATURE:
+                pieces = _png_pieces(data, keep_icc)
+        except (struct.error, IndexError):
+            pieces = None
+        self._pieces = pieces
+        self._size = len(data) if pieces is None else sum(map(_piece_length, pieces))
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def changed(self) -> bool:
+        """Whether stripping removed anything."""
+        return self._size < len(self._data)
+
+    def tobytes(self) -> bytes:
+        if not self.changed:
+            return self._data if isinstance(self._data, bytes) else bytes(self._data)
+        view = memoryview(self._data)
+        try:
+            return b"".join(
+                view[piece[0]:piece[1]] if isinstance(piece, tuple) else piece
+                for piece in self._pieces
+            )
+        finally:
+            view.release()
+
+
+def strip_metadata(data: bytes, image_format: str, keep_icc: bool = True) -> bytes:
+    """Drop metadata that does not affect how the image renders, without re-encoding.
+
+    JPEG loses EXIF (except a minimal Orientation tag), XMP, thumbnails,
+    comments, MPF/Photoshop blocks and anything after EOI. PNG loses text,
+    time, physical-size and other non-rendering ancillary chunks. ICC profiles
+    are kept unless `keep_icc` is False. Other formats, and files the parser
+    does not understand, are returned unchanged.
+
+    Args:
+        data: Raw image bytes, or any buffer supporting slicing and find()
+            such as an mmap.
+        image_format: "JPEG", "PNG" or another Pillow format name.
+        keep_icc: Whether to keep the embedded color profile.
+
+    Returns:
+        The stripped image bytes (never larger than `data`), or `data`
+        itself when nothing could be removed.
+    """
+    stripped = StrippedImage(data, image_format, keep_icc)
+    return stripped.tobytes() if stripped.changed else data
@@ -0,0 +1,43 @@
+"""Online-learned bytes-per-pixel model for predicting encoded image sizes."""
+
+import math
+import threading
+
+
+class DensityModel:
+    """Learn how many bytes per output pixel each kind of re-encode produces.
+
+    Predictions are `base * factor`, where the caller picks the base (the
+    source's own density for JPEG re-encodes and palette PNGs, 1.0 for
+    absolute densities) and the factor per (source format, output format)
+    is an exponentially weighted average learned from real encodes, kept in
+    log space so one outlier can't swing it far.
+    """
+
+    def __init__(self, priors: dict[tuple[str, str], float], smoothing: float = 0.2):
+        self.smoothing = smoothing
+        self._priors = dict(priors)
+        self._log_factors: dict[tuple[str, str], float] = {}
+        self._lock = threading.Lock()
+
+    def factor(self, key: tuple[str, str]) -> float:
+        with self._lock:
+            log_factor = self._log_factors.get(key)
+        if log_factor is None:
+            return self._priors.get(key, 1.0)
+        return math.exp(log_factor)
+
+    def predict(self, key: tuple[str, str], base: float) -> float:
+        """Predicted output bytes-per-pixel."""
+        return base * self.factor(key)
+
+    def observe(self, key: tuple[str, str], base: float, actual: float):
+        """Fold in the density an encode actually produced."""
+        if base <= 0 or actual <= 0:
+            return
+        observed = math.log(actual / base)
+        with self._lock:
+            current = self._log_factors.get(key)
+            if current is None:
+                current = math.log(self._priors.get(key, 1.0))
+            self._log_factors[key] = current + self.smoothing * (observed - current)
@@ -5,11 +5,16 @@ per-platform character/grapheme limits.
 """
 
 import re
+from bisect import bisect_left, bisect_right
 from dataclasses import dataclass
-from typing import Optional
+from itertools import accumulate
+from typing import Callable, Optional
 
 import grapheme
 
+from core.measured_text import MeasuredText
+from core.text_normalizer import LINKEDIN_INSERTIONS, apply_insertions, insertion_points
+
 
 @dataclass
 class PlatformConfig:
@@ -17,30 +22,95 @@ class PlatformConfig:
     char_limit: Optional[int]
     use_graphemes: bool
     split_mode: str = "sentence_hybrid"
+    images_per_post: int = 4
+    # (marker, inserted) pairs that turn commonly normalized text into this
+    # platform's text; applied by core.thread_plan.plan_threads. Neither may
+    # contain whitespace, so sentence and word boundaries carry over.
+    insertions: tuple[tuple[str, str], ...] = ()
 
 
 TWITTER = PlatformConfig("Twitter", 280, False, "word_dense")
 BLUESKY = PlatformConfig("BlueSky", 300, True, "sentence_hybrid")
-LINKEDIN = PlatformConfig("LinkedIn", 3000, False, "sentence_hybrid")
+LINKEDIN = PlatformConfig("LinkedIn", 3000, False, "sentence_hybrid", 1, LINKEDIN_INSERTIONS)
+
+_SENTENCE_RE = re.compile(r'.+?(?:[.!?](?:\s+|$)|$)', flags=re.S)
+_WORD_RE = re.compile(r"\S+|\s+", flags=re.S)
+
+
+def _segment_bounds(pattern: re.Pattern, text: str) -> list[int]:
+    """Offsets where consecutive matches of `pattern` end, after a leading 0.
+
+    The matches tile the text, so segment i is text[bounds[i]:bounds[i + 1]].
+    Only the match lengths are kept; no segment outlives this call.
+    """
+    return list(accumulate(map(len, pattern.findall(text)), initial=0))
+
 
+def _sentence_bounds(text: str) -> list[int]:
+    """Bounds of sentence-like chunks, preserving whitespace/newlines."""
+    return _segment_bounds(_SENTENCE_RE, text)
 
 
-def _measure(text: str, use_graphemes: bool) -> int:
-    """Measure text length using graphemes or characters."""
-    if use_graphemes:
-        return grapheme.length(text)
-    return len(text)
+def _word_bounds(text: str) -> list[int]:
+    """Bounds of word/whitespace tokens, preserving exact formatting."""
+    return _segment_bounds(_WORD_RE, text)
 
 
-def _split_sentences(text: str) -> list[str]:
-    """Split text into sentence-like chunks while preserving whitespace/newlines."""
-    chunks = re.findall(r'.+?(?:[.!?](?:\s+|$)|$)', text, flags=re.S)
-    return [c for c in chunks if c]
+class Draft:
+    """Text measured and tokenized once, to be split for any number of platforms.
 
+    Sentence and word bounds are computed on first use and shared by every
+    split of the draft. A draft derived with `with_insertions` maps its
+    parent's bounds instead of tokenizing its own text again.
+    """
 
-def _split_words(text: str) -> list[str]:
-    """Split into word/whitespace tokens while preserving exact formatting."""
-    return re.findall(r"\S+|\s+", text, flags=re.S)
+    def __init__(self, text: str):
+        self.measured = MeasuredText(text)
+        self._bounds: dict[Callable, list[int]] = {}
+        self._derived: dict[tuple, "Draft"] = {}
+        # (parent draft, insertion offsets in it, text inserted before each offset)
+        self._parent: Optional[tuple["Draft", list[int], list[int]]] = None
+
+    @property
+    def text(self) -> str:
+        return self.measured.text
+
+    def _mapped_bounds(self, tokenize: Callable[[str], list[int]]) -> list[int]:
+        if tokenize not in self._bounds:
+            if self._parent is None:
+                self._bounds[tokenize] = tokenize(self.text)
+            else:
+                parent, offsets, shifts = self._parent
+                # Inserted text joins the token before it.
+                self._bounds[tokenize] = [
+                    bound + shifts[bisect_right(offsets, bound)]
+                    for bound in parent._mapped_bounds(tokenize)
+                ]
+        return self._bounds[tokenize]
+
+    @property
+    def sentence_bounds(self) -> list[int]:
+        return self._mapped_bounds(_sentence_bounds)
+
+    @property
+    def word_bounds(self) -> list[int]:
+        return self._mapped_bounds(_word_bounds)
+
+    def with_insertions(self, insertions: tuple[tuple[str, str], ...]) -> "Draft":
+        """This draft with `insertions` applied (see PlatformConfig.insertions).
+
+        Returns the draft itself when nothing is inserted.
+        """
+        if insertions not in self._derived:
+            points = insertion_points(self.text, insertions)
+            if not points:
+                self._derived[insertions] = self
+            else:
+                draft = Draft(apply_insertions(self.text, points))
+                shifts = list(accumulate((len(inserted) for _, inserted in points), initial=0))
+                draft._parent = (self, [offset for offset, _ in points], shifts)
+                self._derived[insertions] = draft
+        return self._derived[insertions]
 
 
 def split_for_platform(text: str, config: PlatformConfig) -> list[str]:
@@ -53,124 +123,440 @@ def split_for_platform(text: str, config: PlatformConfig) -> list[str]:
     Returns:
         List of text parts. Single-element list if no splitting needed.
     """
-    # No limit means no splitting
-    if config.char_limit is None:
-        return [text]
+    parts, _ = split_draft(Draft(text), config)
+    return parts
 
-    # If text fits within limit, return as-is
-    if _measure(text, config.use_graphemes) <= config.char_limit:
-        return [text]
+
+def split_draft(draft: Draft, config: PlatformConfig) -> tuple[list[str], list[int]]:
+    """Split a draft into thread parts for a given platform.
+
+    Same as `split_for_platform`, for callers that split one draft for
+    several platforms. `config.insertions` is not applied here.
+
+    Returns:
+        (parts, lengths): the parts and each part's length as the platform
+        counts it, indicator included.
+    """
+    measured = draft.measured
+    text = measured.text
+    length = measured.length(0, len(text), config.use_graphemes)
+
+    # No limit means no splitting; if text fits within limit, return as-is
+    if config.char_limit is None or length <= config.char_limit:
+        return [text], [length]
 
     if config.split_mode == "word_dense":
-        raw_parts = _build_parts_with_dynamic_reserve(_split_words(text), config)
+        spans = _build_parts_with_dynamic_reserve(measured, draft.word_bounds, config)
     else:
-        sentence_parts = _build_parts_with_dynamic_reserve(_split_sentences(text), config)
+        sentence_spans = _build_parts_with_dynamic_reserve(measured, draft.sentence_bounds, config)
         # BlueSky favors sentence boundaries, but if that creates a tiny tail,
         # repack by words for denser posts.
-        if _needs_denser_word_packing(sentence_parts, config):
-            raw_parts = _build_parts_with_dynamic_reserve(_split_words(text), config)
+        if _needs_denser_word_packing(measured, sentence_spans, config):
+            spans = _build_parts_with_dynamic_reserve(measured, draft.word_bounds, config)
         else:
-            raw_parts = sentence_parts
+            spans = sentence_spans
 
-    if len(raw_parts) > 1:
-        return _add_indicators(raw_parts, config)
-    return raw_parts
+    if len(spans) > 1:
+        return _add_indicators(measured, spans, config)
+    start, end = spans[0]
+    return [text[start:end]], [measured.length(start, end, config.use_graphemes)]
 
 
-def _build_parts_from_segments(
-    segments: list[str],
-    config: PlatformConfig,
-    indicator_reserve: int = 0,
-) -> list[str]:
-    """Build parts from segments (sentences or words), respecting limits.
+@dataclass
+class _Segments:
+    """One tokenization of an IncrementalSplit's text and its packings by reserve."""
+
+    bounds: list[int]
+    offsets: list[int]
+    packings: dict[int, list[int]]
+
 
-    Reserves space for thread indicators like (1/10).
+class IncrementalSplit:
+    """A platform's split of a draft that is edited a little at a time.
+
+    Meant for live previews, where each update is one keystroke's worth of
+    change to a long draft. An edit keeps the segments that end before it
+    with their measured lengths: tokenizing resumes just before the edit
+    and stops at the first boundary past it that was a boundary before,
+    after which the old segments are only moved. Each packing is redone
+    from the first part the edit can change, and stops as soon as a part
+    boundary lines up with the previous packing again; parts whose text and
+    indicator did not change are reused as they are.
+
+    `parts` and `lengths` always equal `split_draft` of the current text.
     """
-    if not segments:
-        return [""]
 
-    effective_limit = config.char_limit - indicator_reserve
+    def __init__(self, config: PlatformConfig, text: str = ""):
+        self.config = config
+        self.measured = MeasuredText(text)
+        self._segments: dict[re.Pattern, _Segments] = {}
+        self._spans: list[tuple[int, int]] = []
+        self.parts: list[str] = []
+        self.lengths: list[int] = []
+        self.parts, self.lengths = self._split(None)
+
+    @property
+    def text(self) -> str:
+        return self.measured.text
+
+    def update(self, text: str) -> tuple[list[str], list[int]]:
+        """Split `text`, taking its difference from the current text as one edit."""
+        if text != self.text:
+            start, end, new_end = _edited_range(self.text, text)
+            self.apply_edit(start, end, text[start:new_end])
+        return self.parts, self.lengths
+
+    def apply_edit(self, start: int, end: int, replacement: str) -> tuple[list[str], list[int]]:
+        """Replace text[start:end] with `replacement` and split the result.
+
+        Returns:
+            (parts, lengths) as returned by `split_draft`.
+        """
+        if not 0 <= start <= end <= len(self.text):
+            raise ValueError(f"edit {start}:{end} is outside the text (length {len(self.text)})")
+        self.measured = self.measured.edited(start, end, replacement)
+        self.parts, self.lengths = self._split((start, end, start + len(replacement)))
+        return self.parts, self.lengths
+
+    def _split(self, edit: Optional[tuple[int, int, int]]) -> tuple[list[str], list[int]]:
+        """Mirror of `split_draft` that starts from the previous split where it can."""
+        measured, config = self.measured, self.config
+        text = measured.text
+        previous, self._segments = self._segments, {}
+        length = measured.length(0, len(text), config.use_graphemes)
+        if config.char_limit is None or length <= config.char_limit:
+            self._spans = [(0, len(text))]
+            return [text], [length]
+
+        if config.split_mode == "word_dense":
+            spans = self._pack_spans(_WORD_RE, previous, edit)
+        else:
+            spans = self._pack_spans(_SENTENCE_RE, previous, edit)
+            if _needs_denser_word_packing(measured, spans, config):
+                spans = self._pack_spans(_WORD_RE, previous, edit)
+
+        previous_spans, self._spans = self._spans, spans
+        if len(spans) == 1:
+            start, end = spans[0]
+            return [text[start:end]], [measured.length(start, end, config.use_graphemes)]
+        # With the same part count, parts that lie wholly before or after the
+        # edit keep their text and indicator, and are reused as they are.
+        head = tail = 0
+        if edit is not None and len(previous_spans) == len(spans) == len(self.parts):
+            start, end, new_end = edit
+            head = max(0, bisect_right(spans, (start, len(text))) - 1)
+            if spans[:head] != previous_spans[:head]:
+                head = next(i for i, (new, old) in enumerate(zip(spans, previous_spans)) if new != old)
+            delta = new_end - end
+            first_after = max(head, bisect_left(spans, (new_end, 0)))
+            while tail < len(spans) - first_after and previous_spans[-tail - 1] == (
+                spans[-tail - 1][0] - delta, spans[-tail - 1][1] - delta,
+            ):
+                tail += 1
+        parts = self.parts[:head]
+        lengths = self.lengths[:head]
+        for i in range(head, len(spans) - tail):
+            part, part_length = _indicated_part(measured, *spans[i], f" ({i + 1}/{len(spans)})", config)
+            parts.append(part)
+            lengths.append(part_length)
+        parts.extend(self.parts[len(self.parts) - tail:])
+        lengths.extend(self.lengths[len(self.lengths) - tail:])
+        return parts, lengths
+
+    def _pack_spans(
+        self,
+        pattern: re.Pattern,
+        previous: dict[re.Pattern, _Segments],
+        edit: Optional[tuple[int, int, int]],
+    ) -> list[tuple[int, int]]:
+        measured, config = self.measured, self.config
+        old = previous.get(pattern)
+        resegmented = _resegment(pattern, measured.text, old.bounds, *edit) if old and edit else None
+        if resegmented is None:
+            bounds = _segment_bounds(pattern, measured.text)
+            offsets = _segment_offsets(measured, bounds, config)
+
+            def pack(reserve: int) -> list[int]:
+                return _pack(offsets, config.char_limit - reserve)
+        else:
+            bounds, first, resync, shift = resegmented
+            offsets = _remeasure(measured, bounds, old, first, resync, shift, config)
+
+            def pack(reserve: int) -> list[int]:
+                if reserve not in old.packings:
+                    return _pack(offsets, config.char_limit - reserve)
+                return _repack(
+                    offsets, config.char_limit - reserve, old.packings[reserve], first, resync, shift,
+                )
 
-    parts = []
-    current = ""
-    current_len = 0
+        packings: dict[int, list[int]] = {}
+        ends = _converge_reserve(pack, packings)
+        self._segments[pattern] = _Segments(bounds, offsets, packings)
+        return _spans(bounds, ends)
 
-    segment_lengths = [
-        grapheme.length(segment) if config.use_graphemes else len(segment)
-        for segment in segments
-    ]
 
-    for segment, segment_len in zip(segments, segment_lengths):
-        candidate_len = current_len + segment_len
+def _edited_range(old: str, new: str) -> tuple[int, int, int]:
+    """(start, old_end, new_end) of the single edit that turns `old` into `new`.
 
-        if candidate_len <= effective_limit:
-            current += segment
-            current_len = candidate_len
+    The common prefix and suffix are found by bisection, comparing slices.
+    """
+    low, high = 0, min(len(old), len(new))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if old[:middle] == new[:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    start = low
+    low, high = 0, min(len(old), len(new)) - start
+    while low < high:
+        middle = (low + high + 1) // 2
+        if old[len(old) - middle:] == new[len(new) - middle:]:
+            low = middle
         else:
-            if current:
-                parts.append(current)
-            current = segment
-            current_len = segment_len
+            high = middle - 1
+    return start, len(old) - low, len(new) - low
+
+
+def _resegment(
+    pattern: re.Pattern,
+    text: str,
+    old_bounds: list[int],
+    start: int,
+    end: int,
+    new_end: int,
+) -> Optional[tuple[list[int], int, int, int]]:
+    """Bounds of `pattern` segments in edited text, from the bounds before the edit.
+
+    The edit replaced old text[start:end] with text[start:new_end]. Neither
+    segment pattern looks more than one code point past a match (or at a
+    final newline), so segments ending two code points before the edit are
+    unchanged and matching resumes at the last of them. Once a match ends
+    past the edit where an old segment ended, the remaining text and so
+    the remaining segments are the same as before.
 
-    if current:
-        parts.append(current)
+    Returns:
+        (bounds, first, resync, shift): bounds[:first + 1] are unchanged
+        and bounds[resync:] are old_bounds[resync - shift:] moved by the
+        length change; None when matching never lines up again.
+    """
+    delta = new_end - end
+    first = max(0, bisect_right(old_bounds, start - 2) - 1)
+    bounds = old_bounds[:first + 1]
+    old_index = first
+    for match in pattern.finditer(text, old_bounds[first]):
+        bound = match.end()
+        bounds.append(bound)
+        if bound < new_end:
+            continue
+        old_index = bisect_left(old_bounds, bound - delta, old_index)
+        if old_index < len(old_bounds) and old_bounds[old_index] == bound - delta:
+            resync = len(bounds) - 1
+            bounds.extend([old_bound + delta for old_bound in old_bounds[old_index + 1:]])
+            return bounds, first, resync, resync - old_index
+    return None
+
+
+def _remeasure(
+    measured: MeasuredText,
+    bounds: list[int],
+    old: _Segments,
+    first: int,
+    resync: int,
+    shift: int,
+    config: PlatformConfig,
+) -> list[int]:
+    """`_segment_offsets` of resegmented bounds, measuring only the new segments."""
+    if not config.use_graphemes or not measured.joins or old.offsets is old.bounds:
+        return _segment_offsets(measured, bounds, config)
+    offsets = old.offsets[:first]
+    offsets.extend(accumulate(
+        (measured.length(start, end, config.use_graphemes)
+         for start, end in zip(bounds[first:resync], bounds[first + 1:resync + 1])),
+        initial=old.offsets[first],
+    ))
+    delta = offsets[resync] - old.offsets[resync - shift]
+    offsets.extend([offset + delta for offset in old.offsets[resync - shift + 1:]])
+    return offsets
+
+
+def _segment_offsets(
+    measured: MeasuredText,
+    bounds: list[int],
+    config: PlatformConfig,
+) -> list[int]:
+    """Prefix sums of measured segment lengths: offsets[i] is the length of segments[:i]."""
+    if not config.use_graphemes or not measured.joins:
+        # One unit per code point, so the bounds already are the prefix sums.
+        return bounds
+    return list(accumulate(
+        (measured.length(start, end, config.use_graphemes) for start, end in zip(bounds, bounds[1:])),
+        initial=0,
+    ))
+
+
+def _pack(offsets: list[int], limit: int) -> list[int]:
+    """Greedily pack segments into parts of at most `limit`.
+
+    Returns the segment index each part ends at. Every part takes as many
+    whole segments as fit, found by bisecting the prefix sums, so a pass
+    costs O(parts * log(segments)). A segment longer than `limit` becomes a
+    part on its own.
+    """
+    ends = []
+    start = 0
+    count = len(offsets) - 1
+    while start < count:
+        end = bisect_right(offsets, offsets[start] + limit, lo=start + 1) - 1
+        start = max(end, start + 1)
+        ends.append(start)
+    return ends
+
+
+def _repack(
+    offsets: list[int],
+    limit: int,
+    previous: list[int],
+    first: int,
+    resync: int,
+    shift: int,
+) -> list[int]:
+    """`_pack` of resegmented offsets, starting from their previous packing.
+
+    `previous` packed the segments before the edit with the same limit;
+    `first`, `resync` and `shift` are as returned by `_resegment`. Parts
+    whose end and the segment after it come before `first` are kept, and
+    packing stops at the first part end past `resync` that was also a part
+    end before: every later part is then the same.
+    """
+    keep = bisect_left(previous, first)
+    ends = previous[:keep]
+    start = ends[-1] if ends else 0
+    count = len(offsets) - 1
+    old_index = keep
+    while start < count:
+        end = bisect_right(offsets, offsets[start] + limit, lo=start + 1) - 1
+        start = max(end, start + 1)
+        ends.append(start)
+        if start >= resync:
+            old_index = bisect_left(previous, start - shift, old_index)
+            if old_index < len(previous) and previous[old_index] == start - shift:
+                ends.extend([old_end + shift for old_end in previous[old_index + 1:]])
+                break
+    return ends
+
+
+def _build_parts_with_dynamic_reserve(
+    measured: MeasuredText,
+    bounds: list[int],
+    config: PlatformConfig,
+) -> list[tuple[int, int]]:
+    """Build parts while reserving exact indicator length for final part count.
 
-    return parts
+    Segments are given by their bounds and measured once. The reserve
+    ` (N/N)` only depends on the number of digits in N, so each distinct
+    reserve is packed at most once while the part count converges. No text
+    is copied; callers slice the returned spans.
 
+    Returns:
+        (start, end) offsets of each part in the measured text.
+    """
+    if len(bounds) < 2:
+        return [(0, 0)]
 
-def _build_parts_with_dynamic_reserve(segments: list[str], config: PlatformConfig) -> list[str]:
-    """Build parts while reserving exact indicator length for final part count."""
-    if not segments:
-        return [""]
+    offsets = _segment_offsets(measured, bounds, config)
+    ends = _converge_reserve(lambda reserve: _pack(offsets, config.char_limit - reserve), {})
+    return _spans(bounds, ends)
 
-    # Start with a practical indicator estimate like " (1/2)".
-    total_estimate = 2
-    parts = _build_parts_from_segments(segments, config, indicator_reserve=6)
 
+def _converge_reserve(pack: Callable[[int], list[int]], packings: dict[int, list[int]]) -> list[int]:
+    """Part ends once the reserved indicator width matches the part count.
+
+    `pack` packs the segments with a given reserve; each reserve is packed
+    at most once, and the packings are left in `packings` by reserve.
+    """
+
+    def _ends(reserve: int) -> list[int]:
+        if reserve not in packings:
+            packings[reserve] = pack(reserve)
+        return packings[reserve]
+
+    # Start with a practical indicator estimate like " (1/2)".
+    ends = _ends(6)
     for _ in range(6):
-        if len(parts) <= 1:
+        if len(ends) <= 1:
             # No indicators needed for a single-part post.
-            return _build_parts_from_segments(segments, config, indicator_reserve=0)
+            ends = _ends(0)
+            break
 
-        total_estimate = len(parts)
-        reserve = len(f" ({total_estimate}/{total_estimate})")
-        new_parts = _build_parts_from_segments(segments, config, indicator_reserve=reserve)
+        total_estimate = len(ends)
+        new_ends = _ends(len(f" ({total_estimate}/{total_estimate})"))
+        ends = new_ends
+        if len(new_ends) == total_estimate:
+            break
+    return ends
 
-        if len(new_parts) == total_estimate:
-            return new_parts
-        parts = new_parts
 
-    return parts
+def _spans(bounds: list[int], ends: list[int]) -> list[tuple[int, int]]:
+    starts = [0] + ends[:-1]
+    return [(bounds[start], bounds[end]) for start, end in zip(starts, ends)]
 
 
-def _needs_denser_word_packing(parts: list[str], config: PlatformConfig) -> bool:
+def _needs_denser_word_packing(
+    measured: MeasuredText,
+    spans: list[tuple[int, int]],
+    config: PlatformConfig,
+) -> bool:
     """Detect split patterns with a tiny trailing part that word packing can improve."""
-    if not parts or len(parts) < 2 or config.char_limit is None:
+    if not spans or len(spans) < 2 or config.char_limit is None:
         return False
-    last_fill = _measure(parts[-1], config.use_graphemes) / config.char_limit
-    prev_fill = _measure(parts[-2], config.use_graphemes) / config.char_limit
+    last_fill = measured.length(*spans[-1], config.use_graphemes) / config.char_limit
+    prev_fill = measured.length(*spans[-2], config.use_graphemes) / config.char_limit
     return last_fill < 0.35 and prev_fill > 0.65
 
 
-def _add_indicators(parts: list[str], config: PlatformConfig) -> list[str]:
-    """Add (1/N) thread indicators to each part."""
-    total = len(parts)
-    result = []
-    for i, part in enumerate(parts, 1):
-        indicator = f" ({i}/{total})"
-        base = part.rstrip()
-        # Verify it still fits; if not, trim the part
-        combined = base + indicator
-        if config.char_limit and _measure(combined, config.use_graphemes) > config.char_limit:
-            # Trim part to make room
-            overage = _measure(combined, config.use_graphemes) - config.char_limit
-            if config.use_graphemes:
-                # Trim graphemes from end
-                graphemes_list = list(grapheme.graphemes(base))
-                trimmed = "".join(graphemes_list[:len(graphemes_list) - overage])
-            else:
-                trimmed = base[:len(base) - overage]
-            result.append(trimmed + indicator)
-        else:
-            result.append(combined)
-    return result
+def _add_indicators(
+    measured: MeasuredText,
+    spans: list[tuple[int, int]],
+    config: PlatformConfig,
+) -> tuple[list[str], list[int]]:
+    """Add (1/N) thread indicators to each part, returning parts and their lengths."""
+    parts = []
+    lengths = []
+    for i, (start, end) in enumerate(spans, 1):
+        part, length = _indicated_part(measured, start, end, f" ({i}/{len(spans)})", config)
+        parts.append(part)
+        lengths.append(length)
+    return parts, lengths
+
+
+def _indicated_part(
+    measured: MeasuredText,
+    start: int,
+    end: int,
+    indicator: str,
+    config: PlatformConfig,
+) -> tuple[str, int]:
+    """One part with its indicator, trimmed to fit, and the posted string's length."""
+    text = measured.text
+    base = text[start:end].rstrip()
+    end = start + len(base)
+    length = _indicated_length(base, measured.length(start, end, config.use_graphemes), indicator, config)
+    # Verify it still fits; if not, trim the part
+    if config.char_limit and length > config.char_limit:
+        end = measured.trim_point(start, end, config.char_limit - len(indicator), config.use_graphemes)
+        base = text[start:end]
+        length = _indicated_length(base, measured.length(start, end, config.use_graphemes), indicator, config)
+    return base + indicator, length
+
+
+def _indicated_length(base: str, base_length: int, indicator: str, config: PlatformConfig) -> int:
+    """Length of base + indicator, given base's own length.
+
+    A trailing Prepend code point (U+0600, say) joins the indicator's
+    leading space into one grapheme. Nothing else can join across the
+    seam, so only the last code point needs segmenting again.
+    """
+    if not config.use_graphemes or not base:
+        return base_length + len(indicator)
+    return base_length + grapheme.length(base[-1] + indicator) - 1
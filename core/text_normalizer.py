@@ -1,5 +1,10 @@
 """Text normalization utilities for platform-safe posting."""
 
+import re
+
+# Break *bold* parsing on LinkedIn while preserving visible asterisks.
+LINKEDIN_INSERTIONS = (("*", "\u200b"),)
+
 
 def normalize_common_text(text: str) -> str:
     """Normalize punctuation to plain ASCII-friendly forms."""
@@ -12,8 +17,35 @@ def normalize_common_text(text: str) -> str:
     return text
 
 
+def insertion_points(text: str, insertions: tuple[tuple[str, str], ...]) -> list[tuple[int, str]]:
+    """Offsets just after each marker in text, with the string to insert there.
+
+    Args:
+        text: Text to scan.
+        insertions: (marker, inserted) pairs.
+
+    Returns:
+        (offset, inserted) pairs in offset order.
+    """
+    points = []
+    for marker, inserted in insertions:
+        points.extend((match.end(), inserted) for match in re.finditer(re.escape(marker), text))
+    return sorted(points)
+
+
+def apply_insertions(text: str, points: list[tuple[int, str]]) -> str:
+    """Insert strings at the offsets returned by `insertion_points`."""
+    pieces = []
+    last = 0
+    for offset, inserted in points:
+        pieces.append(text[last:offset])
+        pieces.append(inserted)
+        last = offset
+    pieces.append(text[last:])
+    return "".join(pieces)
+
+
 def normalize_linkedin_text(text: str) -> str:
     """Normalize LinkedIn text and neutralize accidental markdown markers."""
     text = normalize_common_text(text)
-    # Break *bold* parsing while preserving visible asterisks.
-    return text.replace("*", "*\u200b")
+    return apply_insertions(text, insertion_points(text, LINKEDIN_INSERTIONS))
@@ -1,8 +1,14 @@
 """Thread planning helpers for manual subposts and image mapping."""
 
 import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable
 
-from core.splitter import PlatformConfig, split_for_platform
+from core.splitter import Draft, IncrementalSplit, PlatformConfig, split_draft
+from core.text_normalizer import apply_insertions, insertion_points
 
 MANUAL_SEPARATOR_RE = re.compile(r"(?m)^\s*---+\s*$")
 IMAGE_REF_RE = re.compile(r"\[img(\d+)\]", flags=re.I)
@@ -29,11 +35,18 @@ def _extract_refs_and_clean_text(text: str, image_count: int) -> tuple[str, list
         return ""
 
     cleaned = IMAGE_REF_RE.sub(_replace, text)
-    cleaned = re.sub(r"[ \t]{2,}", " ", cleaned)
-    cleaned = re.sub(r"\n{3,}", "\n\n", cleaned)
+    # The substring checks are much cheaper than a pass that finds nothing.
+    if "  " in cleaned or "\t" in cleaned:
+        cleaned = re.sub(r"[ \t]{2,}", " ", cleaned)
+    if "\n\n\n" in cleaned:
+        cleaned = re.sub(r"\n{3,}", "\n\n", cleaned)
     return cleaned.strip(), _unique_in_order(refs)
 
 
+def _is_manual(text: str) -> bool:
+    return "---" in text and MANUAL_SEPARATOR_RE.search(text) is not None
+
+
 def _distribute_refs(image_count: int, part_count: int, per_post_cap: int) -> list[list[int]]:
     if image_count <= 0 or part_count <= 0 or per_post_cap <= 0:
         return [[] for _ in range(max(0, part_count))]
@@ -48,41 +61,212 @@ def _distribute_refs(image_count: int, part_count: int, per_post_cap: int) -> li
     return result
 
 
-def build_thread_plan(
+@dataclass
+class ThreadPlan:
+    parts: list[str]
+    image_refs: list[list[int]]
+    mode: str
+    # Length of each part as the platform counts it (graphemes or chars).
+    lengths: list[int]
+
+
+def _drafts(text: str, image_count: int) -> tuple[list[tuple[Draft, list[int]]], str]:
+    """Clean text into drafts with the image refs bound to each, plus the mode.
+
+    Modes:
+    - manual: line separator `---` defines subposts, `[imgN]` attaches images to that subpost.
+    - auto: one draft; images are distributed across its posts by cap.
+    """
+    if _is_manual(text or ""):
+        segments = [segment for segment in MANUAL_SEPARATOR_RE.split(text or "") if segment.strip()]
+        drafts = []
+        for segment in segments:
+            clean_segment, refs = _extract_refs_and_clean_text(segment, image_count)
+            drafts.append((Draft(clean_segment), refs))
+        return drafts, "manual"
+
+    clean_text, _ = _extract_refs_and_clean_text(text or "", image_count)
+    return [(Draft(clean_text), [])], "auto"
+
+
+def _plan(
+    drafts: list[tuple[Draft, list[int]]],
+    mode: str,
+    config: PlatformConfig,
+    image_count: int,
+    per_post_image_cap: int,
+    insertions: tuple[tuple[str, str], ...] = (),
+) -> ThreadPlan:
+    parts: list[str] = []
+    lengths: list[int] = []
+    image_refs_by_part: list[list[int]] = []
+    for draft, refs in drafts:
+        draft_parts, draft_lengths = split_draft(draft.with_insertions(insertions), config)
+        for i, draft_part in enumerate(draft_parts):
+            parts.append(draft_part)
+            image_refs_by_part.append(refs if i == 0 else [])
+        lengths.extend(draft_lengths)
+
+    if mode == "auto":
+        image_refs_by_part = _distribute_refs(
+            image_count=image_count,
+            part_count=len(parts),
+            per_post_cap=per_post_image_cap,
+        )
+    elif not parts:
+        return ThreadPlan([""], [[]], mode, [0])
+    return ThreadPlan(parts, image_refs_by_part, mode, lengths)
+
+
+def plan_thread(
     text: str,
     config: PlatformConfig,
     image_count: int = 0,
     per_post_image_cap: int = 4,
-) -> tuple[list[str], list[list[int]], str]:
-    """Return parts and image refs for a platform.
+) -> ThreadPlan:
+    """Return parts, their lengths and image refs for a platform.
+
+    `text` is planned as given, already normalized for the platform.
 
     Modes:
     - manual: line separator `---` defines subposts, `[imgN]` attaches images to that subpost.
     - auto: uses splitter and distributes images across posts by cap.
     """
-    if MANUAL_SEPARATOR_RE.search(text or ""):
-        segments = [segment for segment in MANUAL_SEPARATOR_RE.split(text or "") if segment.strip()]
-        parts: list[str] = []
-        image_refs_by_part: list[list[int]] = []
+    drafts, mode = _drafts(text, image_count)
+    return _plan(drafts, mode, config, image_count, per_post_image_cap)
 
-        for segment in segments:
-            clean_segment, refs = _extract_refs_and_clean_text(segment, image_count)
-            segment_parts = split_for_platform(clean_segment, config)
-            if not segment_parts:
-                continue
-            for i, segment_part in enumerate(segment_parts):
-                parts.append(segment_part)
-                image_refs_by_part.append(refs if i == 0 else [])
 
-        if not parts:
-            return [""], [[]], "manual"
-        return parts, image_refs_by_part, "manual"
+def plan_threads(
+    text: str,
+    configs: dict[str, PlatformConfig],
+    image_count: int = 0,
+) -> dict[str, ThreadPlan]:
+    """Plan the same draft for several platforms, tokenizing and measuring it once.
+
+    Args:
+        text: Draft normalized with `normalize_common_text`.
+        configs: Platform configs by key. Each config's `insertions` are
+            applied on top of the shared draft, reusing its tokenization,
+            and `images_per_post` caps images per post.
+        image_count: Number of attached images.
 
-    clean_text, _ = _extract_refs_and_clean_text(text or "", image_count)
-    parts = split_for_platform(clean_text, config)
-    image_refs_by_part = _distribute_refs(
-        image_count=image_count,
-        part_count=len(parts),
-        per_post_cap=per_post_image_cap,
-    )
-    return parts, image_refs_by_part, "auto"
+    Returns:
+        A ThreadPlan per key of `configs`.
+    """
+    drafts, mode = _drafts(text, image_count)
+    return {
+        key: _plan(drafts, mode, config, image_count, config.images_per_post, config.insertions)
+        for key, config in configs.items()
+    }
+
+
+class IncrementalPlanner:
+    """Plans of one composer session's draft, updated edit by edit.
+
+    Each platform keeps an IncrementalSplit, so a keystroke near the end
+    of a long draft re-packs only the last parts. Plans equal those of
+    `plan_threads` on `normalize(text)`; drafts in manual mode are planned
+    from scratch. `text` stays un-normalized so edit offsets refer to the
+    draft as the composer has it.
+    """
+
+    def __init__(self, normalize: Callable[[str], str] = str):
+        self.text = ""
+        self._normalize = normalize
+        self._splits: dict[str, IncrementalSplit] = {}
+        self._lock = threading.Lock()
+
+    def plan(
+        self,
+        text: str,
+        configs: dict[str, PlatformConfig],
+        image_count: int = 0,
+    ) -> dict[str, ThreadPlan]:
+        """Plan `text` as an edit of the previous text; see `plan_threads`."""
+        with self._lock:
+            self.text = text
+            text = self._normalize(text)
+            if _is_manual(text):
+                return plan_threads(text, configs, image_count)
+            clean_text, _ = _extract_refs_and_clean_text(text, image_count)
+            plans = {}
+            for key, config in configs.items():
+                split = self._splits.get(key)
+                if split is None or split.config != config:
+                    split = self._splits[key] = IncrementalSplit(config)
+                if config.insertions:
+                    points = insertion_points(clean_text, config.insertions)
+                    parts, lengths = split.update(apply_insertions(clean_text, points))
+                else:
+                    parts, lengths = split.update(clean_text)
+                plans[key] = ThreadPlan(
+                    list(parts),
+                    _distribute_refs(image_count, len(parts), config.images_per_post),
+                    "auto",
+                    list(lengths),
+                )
+            return plans
+
+    def apply_edit(
+        self,
+        start: int,
+        end: int,
+        replacement: str,
+        configs: dict[str, PlatformConfig],
+        image_count: int = 0,
+    ) -> dict[str, ThreadPlan]:
+        """Replace text[start:end] of the last planned text and plan the result."""
+        if not 0 <= start <= end <= len(self.text):
+            raise ValueError(f"edit {start}:{end} is outside the text (length {len(self.text)})")
+        return self.plan(self.text[:start] + replacement + self.text[end:], configs, image_count)
+
+
+class PlanSessions:
+    """IncrementalPlanners by session id, for previews sent while typing.
+
+    Sessions idle for `idle_seconds` are dropped, and at most
+    `max_sessions` are kept (least recently used dropped first). New
+    planners normalize with `normalize`.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 32,
+        idle_seconds: float = 1800.0,
+        clock: Callable[[], float] = time.monotonic,
+        normalize: Callable[[str], str] = str,
+    ):
+        self.max_sessions = max_sessions
+        self.idle_seconds = idle_seconds
+        self._clock = clock
+        self._normalize = normalize
+        self._sessions: OrderedDict[str, tuple[float, IncrementalPlanner]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> IncrementalPlanner:
+        """The session's planner, created on first use."""
+        with self._lock:
+            now = self._clock()
+            cutoff = now - self.idle_seconds
+            while self._sessions and next(iter(self._sessions.values()))[0] < cutoff:
+                self._sessions.popitem(last=False)
+            _, planner = self._sessions.pop(session_id, (now, None))
+            planner = planner or IncrementalPlanner(self._normalize)
+            self._sessions[session_id] = (now, planner)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+            return planner
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
+def build_thread_plan(
+    text: str,
+    config: PlatformConfig,
+    image_count: int = 0,
+    per_post_image_cap: int = 4,
+) -> tuple[list[str], list[list[int]], str]:
+    """Return parts and image refs for a platform; see `plan_thread`."""
+    plan = plan_thread(text, config, image_count, per_post_image_cap)
+    return plan.parts, plan.image_refs, plan.mode
@@ -1,15 +1,113 @@
 """BlueSky platform module for cross-posting."""
 
+import json
 import os
+import threading
+from pathlib import Path
 from typing import Optional
 
-from atproto import Client, models
+from atproto import Client, Session, SessionEvent, models
+from atproto_client.exceptions import BadRequestError, LoginRequiredError, UnauthorizedError
+
+from platforms.media_ids import MediaIdCache
+from platforms.uploads import UploadPipeline, group_media_by_part
+
+DEFAULT_SESSION_FILE = Path(__file__).parent.parent / ".bluesky_session.json"
+# The PDS garbage-collects blobs no record references after about an hour, so
+# a blob ref is only reused (by the same account) within that window.
+BLOB_REUSE_SECONDS = 50 * 60
+# XRPC errors returned for a session the server no longer accepts.
+AUTH_ERROR_NAMES = ("ExpiredToken", "InvalidToken", "AuthenticationRequired")
+
+
+def _is_auth_error(error: Exception) -> bool:
+    """Whether the server rejected the session rather than the request."""
+    if isinstance(error, (UnauthorizedError, LoginRequiredError)):
+        return True
+    if isinstance(error, BadRequestError) and error.response is not None:
+        return getattr(error.response.content, "error", None) in AUTH_ERROR_NAMES
+    return False
+
+
+class SessionStore:
+    """Exported BlueSky sessions keyed by username, cached in memory and on disk.
+
+    Reusing a session avoids a createSession call per post, which BlueSky
+    rate-limits tightly (30 per 5 minutes, 300 per day, per handle).
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self._path = path
+        self._sessions: dict[str, str] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    @property
+    def path(self) -> Path:
+        if self._path is None:
+            configured = os.environ.get("BLUESKY_SESSION_FILE", "").strip()
+            self._path = Path(configured) if configured else DEFAULT_SESSION_FILE
+        return self._path
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict):
+            self._sessions.update(
+                {k: v for k, v in data.items() if isinstance(k, str) and isinstance(v, str)}
+            )
+
+    def _save(self):
+        """Write sessions atomically; the file holds JWTs so keep it owner-only."""
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        try:
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w") as fh:
+                json.dump(self._sessions, fh)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            # Persistence is best-effort; the in-memory copy still saves logins.
+            pass
+
+    def get(self, username: str) -> Optional[str]:
+        with self._lock:
+            self._load()
+            return self._sessions.get(username)
+
+    def set(self, username: str, session_string: str):
+        with self._lock:
+            self._load()
+            if self._sessions.get(username) == session_string:
+                return
+            self._sessions[username] = session_string
+            self._save()
+
+    def discard(self, username: str):
+        with self._lock:
+            self._load()
+            if self._sessions.pop(username, None) is not None:
+                self._save()
+
+
+_default_session_store = SessionStore()
 
 
 class BlueskyPlatform:
     """Post to BlueSky with thread and image support."""
 
-    def __init__(self, username: Optional[str] = None, password: Optional[str] = None):
+    def __init__(
+        self,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        session_store: Optional[SessionStore] = None,
+        upload_workers: int = 1,
+        media_id_cache: Optional[MediaIdCache] = None,
+    ):
         self.username = username or os.environ.get("BLUESKY_USERNAME")
         self.password = password or os.environ.get("BLUESKY_PASSWORD")
 
@@ -19,25 +117,103 @@ class BlueskyPlatform:
                 "BLUESKY_PASSWORD in .env"
             )
 
+        self.session_store = session_store or _default_session_store
+        self.upload_workers = upload_workers
+        self.media_id_cache = media_id_cache
         self.client = Client()
+        self.client.on_session_change(self._on_session_change)
         self._logged_in = False
+        self._login_lock = threading.Lock()
+
+    def close(self):
+        self.client.request.close()
+
+    def _on_session_change(self, event: SessionEvent, session: Session):
+        """Persist new sessions, including the ones atproto refreshes lazily."""
+        if event in (SessionEvent.CREATE, SessionEvent.REFRESH):
+            self.session_store.set(self.username, session.export())
+
+    def _resume_session(self) -> bool:
+        """Import a cached session instead of logging in. Returns success.
+
+        atproto refreshes an expiring access JWT on the next request; if the
+        server rejects that refresh, post() drops the session and logs in again.
+        """
+        session_string = self.session_store.get(self.username)
+        if not session_string:
+            return False
+        try:
+            self.client.login(session_string=session_string, fetch_bsky_profile=False)
+        except Exception:
+            self.session_store.discard(self.username)
+            return False
+        self._logged_in = True
+        return True
+
+    def _drop_session(self):
+        """Forget a session the server rejected so the next login uses the password."""
+        with self._login_lock:
+            self._logged_in = False
+            self.session_store.discard(self.username)
 
     def _ensure_login(self):
-        if not self._logged_in:
+        with self._login_lock:
+            if self._logged_in or self._resume_session():
+                return
             self.client.login(self.username, self.password)
             self._logged_in = True
 
     def _upload_image(self, image_bytes: bytes) -> Optional[models.AppBskyEmbedImages.Image]:
-        """Upload an image to BlueSky. Returns Image model or None."""
+        """Upload an image to BlueSky. Returns Image model or None.
+
+        A blob this account uploaded recently with the same bytes is reused.
+        """
+        key = blob = None
+        if self.media_id_cache is not None:
+            key = self.media_id_cache.key_for("bluesky", self.username, image_bytes)
+            blob = self.media_id_cache.get(key)
         try:
-            upload = self.client.upload_blob(image_bytes)
+            if blob is None:
+                blob = self.client.upload_blob(image_bytes).blob
+                if key is not None:
+                    self.media_id_cache.put(key, blob, BLOB_REUSE_SECONDS)
             return models.AppBskyEmbedImages.Image(
                 alt="Attached image",
-                image=upload.blob,
+                image=blob,
             )
         except Exception:
             return None
 
+    def _send_thread(self, parts: list[str], media_groups: list[list[bytes]], uris: list[str]):
+        """Send parts as a reply chain, appending each post's URI to `uris`."""
+        parent_ref = None
+        root_ref = None
+
+        with UploadPipeline(self._upload_image, media_groups, self.upload_workers) as uploads:
+            for i, text in enumerate(parts):
+                embed = None
+                uploaded_images = uploads.results(i)
+                if uploaded_images:
+                    embed = models.AppBskyEmbedImages.Main(images=uploaded_images)
+
+                reply = None
+                if parent_ref and root_ref:
+                    reply = models.AppBskyFeedPost.ReplyRef(
+                        parent=parent_ref, root=root_ref
+                    )
+
+                response = self.client.send_post(
+                    text=text, embed=embed, reply_to=reply
+                )
+
+                uris.append(response.uri)
+
+                # Only build refs if there are more parts to thread
+                if i < len(parts) - 1:
+                    parent_ref = models.create_strong_ref(response)
+                    if root_ref is None:
+                        root_ref = parent_ref
+
     @staticmethod
     def _uri_to_web_url(uri: str) -> Optional[str]:
         """Convert at:// URI to public bsky.app URL when possible."""
@@ -69,58 +245,40 @@ class BlueskyPlatform:
             image_bytes: Optional image to attach to the first post.
 
         Returns:
-            Dict with 'success' bool, 'uris' list on success, 'error' string on failure.
+            Dict with 'success' bool, 'uris' list on success, 'error' string on
+            failure, and 'retire_client' True when this client should not be reused.
         """
-        try:
-            self._ensure_login()
-
-            uris = []
-            parent_ref = None
-            root_ref = None
-
-            _ = mode  # reserved for result metadata and debugging
-            images = image_bytes_list if image_bytes_list is not None else (
-                [image_bytes] if image_bytes else []
-            )
-
-            for i, text in enumerate(parts):
-                embed = None
-                part_images = None
-                if images_by_part is not None and i < len(images_by_part):
-                    part_images = images_by_part[i]
-                elif i == 0:
-                    part_images = images
-
-                if part_images:
-                    uploaded_images = []
-                    for image_data in part_images[:4]:
-                        img = self._upload_image(image_data)
-                        if img:
-                            uploaded_images.append(img)
-                    if uploaded_images:
-                        embed = models.AppBskyEmbedImages.Main(images=uploaded_images)
-
-                reply = None
-                if parent_ref and root_ref:
-                    reply = models.AppBskyFeedPost.ReplyRef(
-                        parent=parent_ref, root=root_ref
-                    )
+        _ = mode  # reserved for result metadata and debugging
+        images = image_bytes_list if image_bytes_list is not None else (
+            [image_bytes] if image_bytes else []
+        )
+        media_groups = group_media_by_part(len(parts), images, images_by_part, per_post_cap=4)
 
-                response = self.client.send_post(
-                    text=text, embed=embed, reply_to=reply
-                )
-
-                uris.append(response.uri)
-
-                # Only build refs if there are more parts to thread
-                if i < len(parts) - 1:
-                    parent_ref = models.create_strong_ref(response)
-                    if root_ref is None:
-                        root_ref = parent_ref
+        uris: list[str] = []
+        try:
+            try:
+                self._ensure_login()
+                self._send_thread(parts, media_groups, uris)
+            except Exception as e:
+                # A stored session can be revoked while its JWT still looks
+                # valid; log in with the password and retry once, unless part
+                # of the thread is already up.
+                if uris or not _is_auth_error(e):
+                    raise
+                self._drop_session()
+                self._ensure_login()
+                self._send_thread(parts, media_groups, uris)
 
             urls = [self._uri_to_web_url(uri) for uri in uris]
             urls = [u for u in urls if u]
             return {"success": True, "uris": uris, "urls": urls}
 
         except Exception as e:
-            return {"success": False, "error": str(e)}
+            result = {"success": False, "error": str(e)}
+            if _is_auth_error(e):
+                self._drop_session()
+                result["retire_client"] = True
+            # A cached blob may be what the PDS rejected; upload afresh next time.
+            if self.media_id_cache is not None:
+                self.media_id_cache.forget("bluesky", self.username, media_groups)
+            return result
@@ -13,9 +13,13 @@ from pathlib import Path
 
 import requests
 from core.text_normalizer import normalize_linkedin_text
+from platforms.media_ids import MediaIdCache
 
 # LinkedIn API version in YYYYMM format
 LINKEDIN_API_VERSION = "202601"
+# How long an uploaded image URN is reused for the same bytes and member. The
+# Images API does not document a window, so stay conservative.
+IMAGE_URN_REUSE_SECONDS = 60 * 60
 
 
 class LinkedInPlatform:
@@ -31,6 +35,7 @@ class LinkedInPlatform:
         client_secret: Optional[str] = None,
         access_token: Optional[str] = None,
         refresh_token: Optional[str] = None,
+        media_id_cache: Optional[MediaIdCache] = None,
     ):
         self.client_id = client_id or os.environ.get("LINKEDIN_CLIENT_ID")
         self.client_secret = client_secret or os.environ.get("LINKEDIN_CLIENT_SECRET")
@@ -44,6 +49,16 @@ class LinkedInPlatform:
             )
 
         self._person_id = None
+        self.media_id_cache = media_id_cache
+        # Keep-alive session so pooled instances reuse TLS connections.
+        self.session = requests.Session()
+
+    def is_healthy(self) -> bool:
+        """A pooled instance is only worth keeping once it holds an access token."""
+        return bool(self.access_token)
+
+    def close(self):
+        self.session.close()
 
     def _api_headers(self) -> dict:
         """Return standard headers for LinkedIn REST API calls."""
@@ -59,7 +74,7 @@ class LinkedInPlatform:
         if self._person_id:
             return self._person_id
 
-        resp = requests.get(
+        resp = self.session.get(
             "https://api.linkedin.com/v2/userinfo",
             headers={"Authorization": f"Bearer {self.access_token}"},
             timeout=self.REQUEST_TIMEOUT,
@@ -71,13 +86,20 @@ class LinkedInPlatform:
     def _upload_image(self, image_bytes: bytes) -> Optional[str]:
         """Upload an image to LinkedIn using the Images API.
 
-        Returns image URN (urn:li:image:...) or None.
+        Returns image URN (urn:li:image:...) or None. A URN this member
+        already got for the same bytes is reused for IMAGE_URN_REUSE_SECONDS.
         """
         try:
             person_id = self._get_person_id()
+            key = None
+            if self.media_id_cache is not None:
+                key = self.media_id_cache.key_for("linkedin", person_id, image_bytes)
+                image_urn = self.media_id_cache.get(key)
+                if image_urn is not None:
+                    return image_urn
 
             # Step 1: Initialize upload
-            init_resp = requests.post(
+            init_resp = self.session.post(
                 "https://api.linkedin.com/rest/images?action=initializeUpload",
                 headers=self._api_headers(),
                 json={
@@ -94,7 +116,7 @@ class LinkedInPlatform:
             image_urn = upload_data["image"]
 
             # Step 2: Upload the binary image
-            upload_resp = requests.put(
+            upload_resp = self.session.put(
                 upload_url,
                 headers={"Authorization": f"Bearer {self.access_token}"},
                 data=image_bytes,
@@ -102,11 +124,19 @@ class LinkedInPlatform:
             )
             upload_resp.raise_for_status()
 
+            if key is not None:
+                self.media_id_cache.put(key, image_urn, IMAGE_URN_REUSE_SECONDS)
             return image_urn
 
         except Exception:
             return None
 
+    def _forget_media(self, images: list[bytes]):
+        """Drop cached URNs for `images`, in case a stale one failed the post."""
+        if self.media_id_cache is None or not self._person_id:
+            return
+        self.media_id_cache.forget("linkedin", self._person_id, [images])
+
     def authorize(self) -> bool:
         """Run the OAuth2 authorization flow. Opens browser, captures callback."""
         auth_code = None
@@ -142,7 +172,7 @@ class LinkedInPlatform:
         if not auth_code:
             return False
 
-        resp = requests.post(
+        resp = self.session.post(
             "https://www.linkedin.com/oauth/v2/accessToken",
             data={
                 "grant_type": "authorization_code",
@@ -187,7 +217,7 @@ class LinkedInPlatform:
         if not self.refresh_token:
             return False
 
-        resp = requests.post(
+        resp = self.session.post(
             "https://www.linkedin.com/oauth/v2/accessToken",
             data={
                 "grant_type": "refresh_token",
@@ -215,7 +245,10 @@ class LinkedInPlatform:
         images_by_part: Optional[list[list[bytes]]] = None,
         mode: str = "auto",
     ) -> dict:
-        """Post to LinkedIn using the Posts API. Parts are joined (no thread support)."""
+        """Post to LinkedIn using the Posts API. Parts are joined (no thread support).
+
+        Failures set 'retire_client' when this client should not be reused.
+        """
         full_text = normalize_linkedin_text("\n\n".join(parts))
         _ = mode  # reserved for result metadata and debugging
         images = image_bytes_list if image_bytes_list is not None else (
@@ -252,7 +285,7 @@ class LinkedInPlatform:
                         }
                     }
 
-            resp = requests.post(
+            resp = self.session.post(
                 "https://api.linkedin.com/rest/posts",
                 headers=self._api_headers(),
                 json=payload,
@@ -272,7 +305,16 @@ class LinkedInPlatform:
                     result["urls"] = [post_url]
                 return result
             else:
-                return {"success": False, "error": f"Post failed (status {resp.status_code}): {resp.text}"}
+                self._forget_media(images[:1])
+                result = {"success": False, "error": f"Post failed (status {resp.status_code}): {resp.text}"}
+                if resp.status_code == 401:
+                    # The token was revoked or expired; rebuild from .env next time.
+                    result["retire_client"] = True
+                return result
 
         except Exception as e:
-            return {"success": False, "error": str(e)}
+            self._forget_media(images[:1])
+            result = {"success": False, "error": str(e)}
+            if isinstance(e, requests.ConnectionError):
+                result["retire_client"] = True
+            return result
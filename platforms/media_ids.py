@@ -0,0 +1,77 @@
+"""Cross-post cache of uploaded media IDs keyed by content hash."""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from core.media_cache import source_digest
+from platforms.pool import credential_fingerprint
+
+
+@dataclass
+class _MediaIdEntry:
+    media_id: Any
+    expires_at: float
+
+
+class MediaIdCache:
+    """Remember what uploading a given image returned, per platform account.
+
+    Entries are keyed by platform name, a fingerprint of the account the
+    upload belongs to and the SHA-256 of the uploaded bytes, so posting the
+    same image again (a recurring banner, a retry after a partial failure)
+    reuses the media ID or blob ref instead of re-uploading. Each entry
+    expires after the validity window the platform gives the upload; the
+    least recently used entries are evicted past `max_items`.
+
+    One instance is shared by every platform client and across posts, so
+    repeated media skips the upload entirely.
+    """
+
+    def __init__(self, max_items: int = 1024, clock: Callable[[], float] = time.monotonic):
+        self.max_items = max_items
+        self._clock = clock
+        self._entries: OrderedDict[tuple[str, str, str], _MediaIdEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key_for(platform: str, account: str, data: bytes) -> tuple[str, str, str]:
+        return (platform, credential_fingerprint((account,)), source_digest(data))
+
+    def get(self, key: tuple[str, str, str]) -> Optional[Any]:
+        """Return the cached media ID for `key`, or None if absent or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry.media_id
+
+    def put(self, key: tuple[str, str, str], media_id: Any, ttl_seconds: float):
+        """Cache `media_id` for `ttl_seconds` (non-positive TTLs are not cached)."""
+        if media_id is None or ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[key] = _MediaIdEntry(media_id, self._clock() + ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_items:
+                self._entries.popitem(last=False)
+
+    def discard(self, key: tuple[str, str, str]):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def forget(self, platform: str, account: str, groups: list[list[bytes]]):
+        """Drop every entry for `groups` of media, in case a stale one failed a post."""
+        for group in groups:
+            for data in group:
+                self.discard(self.key_for(platform, account, data))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
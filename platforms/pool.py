@@ -0,0 +1,170 @@
+"""Process-wide pool of platform clients keyed by credential set."""
+
+import hashlib
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator, Optional
+
+
+def credential_fingerprint(credentials: tuple) -> str:
+    """Hash a credential tuple so pool keys never hold secrets in plain text."""
+    joined = "\0".join("" if value is None else str(value) for value in credentials)
+    return hashlib.sha256(joined.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class _PoolEntry:
+    client: Any
+    last_used: float
+
+
+class ClientPool:
+    """Keep platform clients and their keep-alive HTTP sessions warm between requests.
+
+    Entries are keyed by platform name plus a fingerprint of the credentials the
+    client was built from, so rotated credentials get a fresh client. Entries
+    idle for longer than `idle_seconds` are dropped the next time the pool is
+    used, and entries whose `is_healthy()` check fails are rebuilt on the next
+    `get()`. A dropped client that is still leased (see `lease()`) is closed
+    only once its last lease ends, so in-flight posts keep their sessions.
+    """
+
+    def __init__(self, idle_seconds: float = 900.0, clock: Callable[[], float] = time.monotonic):
+        self.idle_seconds = idle_seconds
+        self._clock = clock
+        self._entries: dict[tuple[str, str], _PoolEntry] = {}
+        # Lease counts by id(client), and dropped clients waiting for theirs to end.
+        self._leases: dict[int, int] = {}
+        self._retired: dict[int, Any] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _close(client: Any):
+        close = getattr(client, "close", None)
+        if callable(close):
+            try:
+                close()
+            except Exception:
+                pass
+
+    @staticmethod
+    def _is_healthy(client: Any) -> bool:
+        check = getattr(client, "is_healthy", None)
+        if not callable(check):
+            return True
+        try:
+            return bool(check())
+        except Exception:
+            return False
+
+    def _closable(self, clients: list) -> list:
+        """Of clients just dropped (lock held), those no lease still uses."""
+        closable = []
+        for client in clients:
+            if self._leases.get(id(client)):
+                self._retired[id(client)] = client
+            else:
+                closable.append(client)
+        return closable
+
+    def _pop_idle(self, now: float) -> list:
+        """Remove idle entries (lock held) and return their clients for closing."""
+        cutoff = now - self.idle_seconds
+        stale = [key for key, entry in self._entries.items() if entry.last_used < cutoff]
+        return [self._entries.pop(key).client for key in stale]
+
+    def get(self, name: str, factory: Callable[[], Any], credentials: tuple) -> Any:
+        """Return a pooled client for `name`, building one with `factory` if needed."""
+        key = (name, credential_fingerprint(credentials))
+        now = self._clock()
+
+        with self._lock:
+            to_close = self._pop_idle(now)
+            entry = self._entries.get(key)
+            if entry is not None and not self._is_healthy(entry.client):
+                to_close.append(self._entries.pop(key).client)
+                entry = None
+            if entry is not None:
+                entry.last_used = now
+            to_close = self._closable(to_close)
+        for client in to_close:
+            self._close(client)
+        if entry is not None:
+            return entry.client
+
+        # Build outside the lock so one slow client setup does not stall the others.
+        client = factory()
+        with self._lock:
+            existing = self._entries.get(key)
+            if existing is None:
+                self._entries[key] = _PoolEntry(client=client, last_used=now)
+                return client
+            existing.last_used = now
+        self._close(client)
+        return existing.client
+
+    @contextmanager
+    def lease(self, name: str, factory: Callable[[], Any], credentials: tuple) -> Iterator[Any]:
+        """`get()` a client and keep it open while the block uses it."""
+        client = self.get(name, factory, credentials)
+        with self._lock:
+            self._leases[id(client)] = self._leases.get(id(client), 0) + 1
+        try:
+            yield client
+        finally:
+            to_close = []
+            with self._lock:
+                remaining = self._leases.pop(id(client)) - 1
+                if remaining:
+                    self._leases[id(client)] = remaining
+                elif id(client) in self._retired:
+                    to_close.append(self._retired.pop(id(client)))
+            for retired in to_close:
+                self._close(retired)
+
+    def retire(self, client: Any):
+        """Drop this client instance, e.g. after it failed in a way that may recur.
+
+        Other clients for the same platform are untouched; the client is
+        closed once nothing leases it.
+        """
+        with self._lock:
+            keys = [key for key, entry in self._entries.items() if entry.client is client]
+            for key in keys:
+                self._entries.pop(key)
+            to_close = self._closable([client]) if keys else []
+        for retired in to_close:
+            self._close(retired)
+
+    def discard(self, name: str, credentials: Optional[tuple] = None):
+        """Drop pooled clients for `name` (only the given credential set, if passed)."""
+        fingerprint = credential_fingerprint(credentials) if credentials is not None else None
+        with self._lock:
+            keys = [
+                key for key in self._entries
+                if key[0] == name and (fingerprint is None or key[1] == fingerprint)
+            ]
+            clients = self._closable([self._entries.pop(key).client for key in keys])
+        for client in clients:
+            self._close(client)
+
+    def evict_idle(self):
+        """Drop clients that have been idle for longer than `idle_seconds`."""
+        with self._lock:
+            clients = self._closable(self._pop_idle(self._clock()))
+        for client in clients:
+            self._close(client)
+
+    def close(self):
+        """Close every pooled client."""
+        with self._lock:
+            clients = [entry.client for entry in self._entries.values()]
+            self._entries.clear()
+        for client in clients:
+            self._close(client)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
@@ -1,11 +1,30 @@
 """Twitter/X platform module for cross-posting."""
 
+import io
 import os
-import tempfile
 import time
 from typing import Optional
 
+import requests
 import tweepy
+from tweepy.errors import Unauthorized
+
+from core.media import IMAGE_FORMAT_TYPES, sniff_format
+from platforms.media_ids import MediaIdCache
+from platforms.uploads import UploadPipeline, group_media_by_part
+
+# Media IDs are attachable until `expires_after_secs` (24h when not reported);
+# stop reusing one a little early so a slow post doesn't race the expiry.
+DEFAULT_MEDIA_ID_TTL_SECONDS = 24 * 60 * 60
+MEDIA_ID_EXPIRY_MARGIN_SECONDS = 10 * 60
+
+
+def _media_type(data) -> tuple[str, str]:
+    """Return (MIME type, file extension) sniffed from leading magic bytes."""
+    image_format = sniff_format(data)
+    if image_format is None:
+        return "application/octet-stream", "bin"
+    return IMAGE_FORMAT_TYPES[image_format]
 
 
 class TwitterPlatform:
@@ -17,11 +36,15 @@ class TwitterPlatform:
         api_secret: Optional[str] = None,
         access_token: Optional[str] = None,
         access_token_secret: Optional[str] = None,
+        upload_workers: int = 1,
+        media_id_cache: Optional[MediaIdCache] = None,
     ):
         self.api_key = api_key or os.environ.get("TWITTER_API_KEY")
         self.api_secret = api_secret or os.environ.get("TWITTER_API_SECRET")
         self.access_token = access_token or os.environ.get("TWITTER_ACCESS_TOKEN")
         self.access_token_secret = access_token_secret or os.environ.get("TWITTER_ACCESS_TOKEN_SECRET")
+        self.upload_workers = upload_workers
+        self.media_id_cache = media_id_cache
 
         if not all([self.api_key, self.api_secret, self.access_token, self.access_token_secret]):
             raise ValueError(
@@ -43,6 +66,10 @@ class TwitterPlatform:
         )
         self.api_v1 = tweepy.API(auth)
 
+    def close(self):
+        self.client.session.close()
+        self.api_v1.session.close()
+
     @staticmethod
     def _extract_rate_limit(headers) -> Optional[dict]:
         """Extract Twitter rate-limit metadata from response headers."""
@@ -79,16 +106,33 @@ class TwitterPlatform:
         }
 
     def _upload_image(self, image_bytes: bytes) -> Optional[int]:
-        """Upload an image to Twitter. Returns media_id or None."""
+        """Upload an image to Twitter from memory. Returns media_id or None.
+
+        A media ID this account already got for the same bytes is reused
+        while it is still valid.
+        """
+        key = None
+        if self.media_id_cache is not None:
+            key = self.media_id_cache.key_for("twitter", self.access_token, image_bytes)
+            media_id = self.media_id_cache.get(key)
+            if media_id is not None:
+                return media_id
         try:
-            with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmp:
-                tmp.write(image_bytes)
-                tmp_path = tmp.name
-            media = self.api_v1.media_upload(filename=tmp_path)
-            os.unlink(tmp_path)
-            return media.media_id
+            _, extension = _media_type(image_bytes)
+            # BytesIO over immutable bytes shares the buffer rather than copying it.
+            media = self.api_v1.simple_upload(
+                f"image.{extension}",
+                file=io.BytesIO(image_bytes),
+            )
+            media_id = media.media_id
         except Exception:
             return None
+        if key is not None:
+            expires_after = getattr(media, "expires_after_secs", None)
+            if not isinstance(expires_after, (int, float)):
+                expires_after = DEFAULT_MEDIA_ID_TTL_SECONDS
+            self.media_id_cache.put(key, media_id, expires_after - MEDIA_ID_EXPIRY_MARGIN_SECONDS)
+        return media_id
 
     def post(
         self,
@@ -105,47 +149,36 @@ class TwitterPlatform:
             image_bytes: Optional image to attach to the first tweet.
 
         Returns:
-            Dict with 'success' bool, 'ids' list on success, 'error' string on failure.
+            Dict with 'success' bool, 'ids' list on success, 'error' string on
+            failure, and 'retire_client' True when this client should not be reused.
         """
+        _ = mode  # reserved for result metadata and debugging
+        images = image_bytes_list if image_bytes_list is not None else (
+            [image_bytes] if image_bytes else []
+        )
+        media_groups = group_media_by_part(len(parts), images, images_by_part, per_post_cap=4)
+
         try:
             tweet_ids = []
             previous_id = None
             rate_limit = None
 
-            _ = mode  # reserved for result metadata and debugging
-            images = image_bytes_list if image_bytes_list is not None else (
-                [image_bytes] if image_bytes else []
-            )
+            with UploadPipeline(self._upload_image, media_groups, self.upload_workers) as uploads:
+                for i, text in enumerate(parts):
+                    media_ids = uploads.results(i) or None
+
+                    response = self.client.create_tweet(
+                        text=text,
+                        media_ids=media_ids,
+                        in_reply_to_tweet_id=previous_id,
+                    )
+                    response_rate_limit = self._extract_rate_limit(getattr(response, "headers", None))
+                    if response_rate_limit:
+                        rate_limit = response_rate_limit
 
-            for i, text in enumerate(parts):
-                media_ids = None
-                part_images = None
-                if images_by_part is not None and i < len(images_by_part):
-                    part_images = images_by_part[i]
-                elif i == 0:
-                    part_images = images
-
-                if part_images:
-                    uploaded_ids = []
-                    for image_data in part_images[:4]:
-                        media_id = self._upload_image(image_data)
-                        if media_id:
-                            uploaded_ids.append(media_id)
-                    if uploaded_ids:
-                        media_ids = uploaded_ids
-
-                response = self.client.create_tweet(
-                    text=text,
-                    media_ids=media_ids,
-                    in_reply_to_tweet_id=previous_id,
-                )
-                response_rate_limit = self._extract_rate_limit(getattr(response, "headers", None))
-                if response_rate_limit:
-                    rate_limit = response_rate_limit
-
-                tweet_id = response.data["id"]
-                tweet_ids.append(tweet_id)
-                previous_id = tweet_id
+                    tweet_id = response.data["id"]
+                    tweet_ids.append(tweet_id)
+                    previous_id = tweet_id
 
             urls = [f"https://x.com/i/web/status/{tweet_id}" for tweet_id in tweet_ids]
             return {
@@ -156,7 +189,14 @@ class TwitterPlatform:
             }
 
         except Exception as e:
+            # A cached media ID may be what the API rejected; upload afresh next time.
+            if self.media_id_cache is not None:
+                self.media_id_cache.forget("twitter", self.access_token, media_groups)
             error_rate_limit = self._extract_rate_limit(
                 getattr(getattr(e, "response", None), "headers", None)
             )
-            return {"success": False, "error": str(e), "rate_limit": error_rate_limit}
+            result = {"success": False, "error": str(e), "rate_limit": error_rate_limit}
+            if isinstance(e, (Unauthorized, requests.ConnectionError)):
+                # Rejected credentials or a broken keep-alive session.
+                result["retire_client"] = True
+            return result
@@ -0,0 +1,82 @@
+"""Media upload pipelining shared by the threaded platforms."""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+
+def group_media_by_part(
+    part_count: int,
+    images: list[bytes],
+    images_by_part: Optional[list[list[bytes]]],
+    per_post_cap: int,
+) -> list[list[bytes]]:
+    """Resolve which images each part carries.
+
+    Explicit `images_by_part` wins; otherwise all `images` go on the first part.
+    """
+    groups = []
+    for i in range(part_count):
+        part_images = None
+        if images_by_part is not None and i < len(images_by_part):
+            part_images = images_by_part[i]
+        elif i == 0:
+            part_images = images
+        groups.append(list(part_images[:per_post_cap]) if part_images else [])
+    return groups
+
+
+class UploadPipeline:
+    """Upload every part's media for a thread, optionally ahead of the reply chain.
+
+    With `workers <= 1` uploads run lazily and serially as each part is posted.
+    Otherwise all uploads for the whole thread start concurrently up front and
+    `results(i)` only blocks on media for part `i` that is not ready yet, so
+    reply ordering is preserved while uploads overlap with posting. Platform
+    clients pass their `upload_workers` setting through as `workers`.
+    """
+
+    def __init__(
+        self,
+        upload: Callable[[bytes], Optional[Any]],
+        groups: list[list[bytes]],
+        workers: int = 1,
+    ):
+        self._upload = upload
+        self._groups = groups
+        self._executor = None
+        self._futures = None
+
+        total = sum(len(group) for group in groups)
+        if workers > 1 and total > 1:
+            self._executor = ThreadPoolExecutor(
+                max_workers=min(workers, total),
+                thread_name_prefix="upload",
+            )
+            # Submit in thread order so the earliest parts' media start first.
+            self._futures = [
+                [self._executor.submit(upload, data) for data in group]
+                for group in groups
+            ]
+
+    def results(self, index: int) -> list:
+        """Return uploaded media for part `index` in order, skipping failed uploads."""
+        if index >= len(self._groups):
+            return []
+        if self._futures is None:
+            uploaded = [self._upload(data) for data in self._groups[index]]
+        else:
+            uploaded = [future.result() for future in self._futures[index]]
+        return [item for item in uploaded if item]
+
+    def close(self):
+        """Stop pending uploads, e.g. when the reply chain failed part-way."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
@@ -0,0 +1,37 @@
+"""Generated test images shared across the media tests."""
+
+import io
+import os
+
+from PIL import Image
+
+
+def make_noise_image(width, height, format="PNG") -> bytes:
+    """Create an incompressible test image as bytes."""
+    img = Image.frombytes("RGB", (width, height), os.urandom(width * height * 3))
+    buf = io.BytesIO()
+    img.save(buf, format=format)
+    return buf.getvalue()
+
+
+def make_animated_gif(frames=12, size=(300, 200), transparent=False, duration=50) -> bytes:
+    """Noisy frames with a moving red block; noise keeps the GIF large."""
+    images = []
+    for i in range(frames):
+        img = Image.effect_noise(size, 60).convert("RGB")
+        img.paste((255, 0, 0), (i * 10, 50, i * 10 + 80, 130))
+        if transparent:
+            img = img.convert("RGBA")
+            img.paste((0, 0, 0, 0), (0, 0, 40, 40))
+        images.append(img)
+    buf = io.BytesIO()
+    images[0].save(
+        buf, format="GIF", save_all=True, append_images=images[1:], duration=duration, loop=0,
+    )
+    return buf.getvalue()
+
+
+def make_truncated_jpeg() -> bytes:
+    """A JPEG over BlueSky's limit whose header parses but whose pixel data is cut short."""
+    data = make_noise_image(2000, 2000, format="JPEG")
+    return data[:len(data) // 2]
@@ -0,0 +1,101 @@
+"""Tests for animated GIF re-encoding."""
+
+import io
+import time
+
+from PIL import Image
+
+from core.animation import _frames, encode_animation, plan_animation
+from tests.images import make_animated_gif
+
+
+def _encode(data, max_bytes, deadline=None):
+    frames = Image.open(io.BytesIO(data)).n_frames
+    return encode_animation(
+        lambda: Image.open(io.BytesIO(data)),
+        frames,
+        len(data),
+        max_bytes,
+        0.85,
+        time.thread_time() + 60 if deadline is None else deadline,
+    )
+
+
+def _total_duration(img) -> int:
+    total = 0
+    for index in range(img.n_frames):
+        img.seek(index)
+        total += img.info["duration"]
+    return total
+
+
+class TestPlanAnimation:
+    def test_small_overshoot_only_scales(self):
+        plan = plan_animation(1_200_000, frames=30, max_bytes=1_000_000, target_fill=0.85)
+        assert plan.stride == 1
+        assert plan.colors == 256
+        assert 0.8 < plan.scale < 1.0
+
+    def test_large_overshoot_drops_frames_and_colors(self):
+        plan = plan_animation(40_000_000, frames=30, max_bytes=1_000_000, target_fill=0.85)
+        assert plan.stride > 1
+        assert plan.colors < 256
+
+    def test_keeps_at_least_two_frames(self):
+        plan = plan_animation(40_000_000, frames=3, max_bytes=1_000_000, target_fill=0.85)
+        assert plan.stride == 1
+
+
+class TestEncodeAnimation:
+    def test_fits_and_stays_animated(self):
+        data = make_animated_gif()
+        max_bytes = len(data) // 3
+
+        result = _encode(data, max_bytes)
+
+        assert result is not None
+        assert len(result.data) <= max_bytes
+        out = Image.open(io.BytesIO(result.data))
+        assert out.format == "GIF"
+        assert out.n_frames > 1
+        assert out.info.get("loop") == 0
+        # Dropped frames' delays are folded into the frames that are kept.
+        assert _total_duration(out) == 12 * 50
+
+    def test_moving_block_survives(self):
+        data = make_animated_gif()
+        result = _encode(data, len(data) // 2)
+
+        out = Image.open(io.BytesIO(result.data))
+        out.seek(out.n_frames - 1)
+        last = out.convert("RGB").resize((300, 200))
+        source = Image.open(io.BytesIO(data))
+        source.seek((out.n_frames - 1) * result.plan.stride)
+        block_x = source.tell() * 10 + 40
+        assert last.getpixel((block_x, 90))[0] > 200
+
+    def test_keeps_transparency(self):
+        data = make_animated_gif(transparent=True)
+        result = _encode(data, len(data) // 2)
+
+        out = Image.open(io.BytesIO(result.data))
+        for index in (0, out.n_frames - 1):
+            out.seek(index)
+            assert out.convert("RGBA").getpixel((2, 2))[3] == 0
+
+    def test_subsampled_duplicates_are_merged(self):
+        a, b, c = (Image.new("RGB", (20, 20), color) for color in ("red", "blue", "green"))
+        buf = io.BytesIO()
+        a.save(buf, format="GIF", save_all=True, append_images=[b, a, b, c], duration=100)
+        img = Image.open(io.BytesIO(buf.getvalue()))
+
+        kept = list(_frames(img, 5, 2, lambda frame: frame.convert("RGB")))
+
+        # Frames 0 and 2 are both red: one frame standing for frames 0-3.
+        assert [(frame.getpixel((0, 0)), delay) for frame, delay in kept] == [
+            ((255, 0, 0), 400), ((0, 128, 0), 100),
+        ]
+
+    def test_gives_up_when_cpu_budget_is_spent(self):
+        data = make_animated_gif(frames=6)
+        assert _encode(data, len(data) // 2, deadline=time.thread_time() - 1) is None
@@ -0,0 +1,49 @@
+"""Tests for the benchmarks' shared baseline comparison."""
+
+import json
+
+from benchmarks._baseline import argument_parser, finish, paired_operations, time_regression
+
+
+def _report(seconds, case="emoji", operation="split_bluesky"):
+    return {"results": {case: {"operations": {operation: {"seconds": seconds}}}}}
+
+
+def _slower(baseline, current):
+    regressions = (
+        time_regression(where, result, base, 0.25, 0.002)
+        for where, result, base in paired_operations(baseline, current)
+    )
+    return [line for line in regressions if line]
+
+
+class TestCompare:
+    def test_flags_slower_operation(self):
+        assert _slower(_report(0.010), _report(0.020)) == ["emoji/split_bluesky: 0.0200s vs 0.0100s"]
+
+    def test_ignores_timer_noise(self):
+        assert _slower(_report(0.0005), _report(0.0015)) == []
+
+    def test_skips_cases_and_operations_missing_from_baseline(self):
+        assert _slower({"results": {}}, _report(10)) == []
+        assert _slower(_report(0.01, operation="split_twitter"), _report(10)) == []
+
+
+class TestFinish:
+    def _args(self, *argv):
+        return argument_parser("bench", ["emoji"], 1, 0.25).parse_args(list(argv))
+
+    def test_writes_baseline_and_passes_against_it(self, tmp_path, capsys):
+        path = tmp_path / "baseline.json"
+        assert finish(self._args("--output", str(path)), _report(0.01), "table", _slower) == 0
+        assert json.loads(path.read_text())["seed"] is not None
+
+        assert finish(self._args("--compare", str(path)), _report(0.01), "table", _slower) == 0
+        assert "No regressions" in capsys.readouterr().out
+
+    def test_regression_exits_non_zero(self, tmp_path, capsys):
+        path = tmp_path / "baseline.json"
+        path.write_text(json.dumps(_report(0.01)))
+
+        assert finish(self._args("--compare", str(path)), _report(0.05), "table", _slower) == 1
+        assert "REGRESSION emoji/split_bluesky" in capsys.readouterr().out
@@ -1,8 +1,24 @@
 """Tests for the BlueSky platform module."""
 
+import base64
+import json
+import time
 from unittest.mock import MagicMock, patch, PropertyMock
 import pytest
-from platforms.bluesky import BlueskyPlatform
+from atproto_client.exceptions import BadRequestError, UnauthorizedError
+
+from platforms.bluesky import BlueskyPlatform, SessionStore
+from platforms.media_ids import MediaIdCache
+
+
+def _session_string(expires_in: int) -> str:
+    """Build an exported session string whose access JWT expires in `expires_in` seconds."""
+    def _segment(obj):
+        return base64.urlsafe_b64encode(json.dumps(obj).encode()).decode().rstrip("=")
+
+    exp = int(time.time()) + expires_in
+    access_jwt = f"{_segment({'alg': 'none'})}.{_segment({'exp': exp})}.sig"
+    return ":::".join(["test.bsky.social", "did:plc:xxx", access_jwt, "refresh", "https://bsky.social"])
 
 
 class TestBlueskyPlatform:
@@ -98,3 +114,131 @@ class TestBlueskyPlatform:
 
         assert result["success"] is True
         assert mock_models.AppBskyEmbedImages.Main.call_count == 2
+
+
+    @patch("platforms.bluesky.models")
+    @patch("platforms.bluesky.Client")
+    def test_repeated_media_reuses_cached_blob(self, mock_client_cls, mock_models):
+        mock_client = MagicMock()
+        mock_client.upload_blob.return_value = MagicMock(blob="blob-ref")
+        mock_client_cls.return_value = mock_client
+        cache = MediaIdCache()
+
+        for _ in range(2):
+            platform = BlueskyPlatform(
+                username="test.bsky.social", password="pass", media_id_cache=cache,
+            )
+            platform._upload_image(b"image")
+
+        mock_client.upload_blob.assert_called_once_with(b"image")
+        images = [c.kwargs["image"] for c in mock_models.AppBskyEmbedImages.Image.call_args_list]
+        assert images == ["blob-ref", "blob-ref"]
+
+    @patch("platforms.bluesky.models")
+    @patch("platforms.bluesky.Client")
+    def test_post_pipelined_uploads_keep_part_order(self, mock_client_cls, mock_models):
+        mock_client = MagicMock()
+        mock_client.send_post.side_effect = [
+            MagicMock(uri="at://did:plc:xxx/app.bsky.feed.post/1"),
+            MagicMock(uri="at://did:plc:xxx/app.bsky.feed.post/2"),
+        ]
+        mock_client_cls.return_value = mock_client
+
+        platform = BlueskyPlatform(username="test.bsky.social", password="pass", upload_workers=4)
+
+        def _upload(data):
+            # Later images finish first; embeds must still follow part order.
+            time.sleep(0.05 if data == b"1" else 0)
+            return f"blob-{data.decode()}"
+
+        with patch.object(platform, "_upload_image", side_effect=_upload):
+            result = platform.post(
+                ["First", "Second"],
+                images_by_part=[[b"1", b"2"], [b"3"]],
+                mode="manual",
+            )
+
+        assert result["success"] is True
+        embed_calls = mock_models.AppBskyEmbedImages.Main.call_args_list
+        assert embed_calls[0].kwargs["images"] == ["blob-1", "blob-2"]
+        assert embed_calls[1].kwargs["images"] == ["blob-3"]
+
+
+class TestBlueskySessionReuse:
+    def test_session_store_persists_across_instances(self, tmp_path):
+        path = tmp_path / "sessions.json"
+        SessionStore(path).set("test.bsky.social", "session-a")
+
+        assert SessionStore(path).get("test.bsky.social") == "session-a"
+
+    @patch("platforms.bluesky.Client")
+    def test_cached_session_skips_login(self, mock_client_cls, tmp_path):
+        store = SessionStore(tmp_path / "sessions.json")
+        session_string = _session_string(expires_in=3600)
+        store.set("test.bsky.social", session_string)
+        mock_client = mock_client_cls.return_value
+        mock_client.send_post.return_value = MagicMock(uri="at://did:plc:xxx/app.bsky.feed.post/1")
+
+        platform = BlueskyPlatform(username="test.bsky.social", password="pass", session_store=store)
+        result = platform.post(["Hello."])
+
+        assert result["success"] is True
+        mock_client.login.assert_called_once_with(
+            session_string=session_string, fetch_bsky_profile=False
+        )
+
+    @patch("platforms.bluesky.Client")
+    def test_failed_lazy_refresh_falls_back_to_password_login(self, mock_client_cls, tmp_path):
+        store = SessionStore(tmp_path / "sessions.json")
+        store.set("test.bsky.social", _session_string(expires_in=60))
+        mock_client = mock_client_cls.return_value
+        # atproto refreshes the expiring session inside the request, and the server refuses.
+        expired = BadRequestError(MagicMock(content=MagicMock(error="ExpiredToken")))
+        mock_client.send_post.side_effect = [
+            expired,
+            MagicMock(uri="at://did:plc:xxx/app.bsky.feed.post/1"),
+        ]
+
+        platform = BlueskyPlatform(username="test.bsky.social", password="pass", session_store=store)
+        result = platform.post(["Hello."])
+
+        assert result["success"] is True
+        mock_client.login.assert_called_with("test.bsky.social", "pass")
+        assert store.get("test.bsky.social") is None
+
+    @patch("platforms.bluesky.Client")
+    def test_rejected_session_logs_in_with_password_and_retries(self, mock_client_cls, tmp_path):
+        store = SessionStore(tmp_path / "sessions.json")
+        store.set("test.bsky.social", _session_string(expires_in=3600))
+        mock_client = mock_client_cls.return_value
+        mock_client.send_post.side_effect = [
+            UnauthorizedError(),
+            MagicMock(uri="at://did:plc:xxx/app.bsky.feed.post/1"),
+        ]
+
+        platform = BlueskyPlatform(username="test.bsky.social", password="pass", session_store=store)
+        result = platform.post(["Hello."])
+
+        assert result["success"] is True
+        mock_client.login.assert_called_with("test.bsky.social", "pass")
+        assert mock_client.send_post.call_count == 2
+        assert platform._logged_in is True
+
+    @patch("platforms.bluesky.models")
+    @patch("platforms.bluesky.Client")
+    def test_rejected_session_mid_thread_is_not_retried(self, mock_client_cls, mock_models, tmp_path):
+        store = SessionStore(tmp_path / "sessions.json")
+        store.set("test.bsky.social", _session_string(expires_in=3600))
+        mock_client = mock_client_cls.return_value
+        mock_client.send_post.side_effect = [
+            MagicMock(uri="at://did:plc:xxx/app.bsky.feed.post/1"),
+            UnauthorizedError(),
+        ]
+
+        platform = BlueskyPlatform(username="test.bsky.social", password="pass", session_store=store)
+        result = platform.post(["Part 1.", "Part 2."])
+
+        assert result["success"] is False
+        assert mock_client.send_post.call_count == 2
+        assert platform._logged_in is False
+        assert store.get("test.bsky.social") is None
@@ -21,8 +21,8 @@ class TestLinkedInPlatform:
         mock_post_resp.status_code = 201
         mock_post_resp.headers = {"x-restli-id": "urn:li:share:123456"}
 
-        mock_requests.get.return_value = mock_userinfo_resp
-        mock_requests.post.return_value = mock_post_resp
+        mock_requests.Session.return_value.get.return_value = mock_userinfo_resp
+        mock_requests.Session.return_value.post.return_value = mock_post_resp
 
         platform = LinkedInPlatform(
             client_id="cid", client_secret="csec",
@@ -44,8 +44,8 @@ class TestLinkedInPlatform:
         mock_post_resp.status_code = 201
         mock_post_resp.headers = {}
 
-        mock_requests.get.return_value = mock_userinfo_resp
-        mock_requests.post.return_value = mock_post_resp
+        mock_requests.Session.return_value.get.return_value = mock_userinfo_resp
+        mock_requests.Session.return_value.post.return_value = mock_post_resp
 
         platform = LinkedInPlatform(
             client_id="cid", client_secret="csec",
@@ -54,7 +54,7 @@ class TestLinkedInPlatform:
         result = platform.post(["Part 1.", "Part 2."])
 
         assert result["success"] is True
-        call_args = mock_requests.post.call_args
+        call_args = mock_requests.Session.return_value.post.call_args
         body = call_args.kwargs.get("json") or call_args[1].get("json")
         assert "Part 1." in body["commentary"]
         assert "Part 2." in body["commentary"]
@@ -69,8 +69,8 @@ class TestLinkedInPlatform:
         mock_post_resp.status_code = 201
         mock_post_resp.headers = {}
 
-        mock_requests.get.return_value = mock_userinfo_resp
-        mock_requests.post.return_value = mock_post_resp
+        mock_requests.Session.return_value.get.return_value = mock_userinfo_resp
+        mock_requests.Session.return_value.post.return_value = mock_post_resp
 
         platform = LinkedInPlatform(
             client_id="cid", client_secret="csec",
@@ -79,7 +79,7 @@ class TestLinkedInPlatform:
         result = platform.post(["A — B and i*agent and *bold*"])
 
         assert result["success"] is True
-        call_args = mock_requests.post.call_args
+        call_args = mock_requests.Session.return_value.post.call_args
         body = call_args.kwargs.get("json") or call_args[1].get("json")
         assert "A -- B" in body["commentary"]
         assert "i*\u200bagent" in body["commentary"]
@@ -95,8 +95,8 @@ class TestLinkedInPlatform:
         mock_post_resp.status_code = 403
         mock_post_resp.text = "Forbidden"
 
-        mock_requests.get.return_value = mock_userinfo_resp
-        mock_requests.post.return_value = mock_post_resp
+        mock_requests.Session.return_value.get.return_value = mock_userinfo_resp
+        mock_requests.Session.return_value.post.return_value = mock_post_resp
 
         platform = LinkedInPlatform(
             client_id="cid", client_secret="csec",
@@ -116,8 +116,8 @@ class TestLinkedInPlatform:
         mock_post_resp.status_code = 201
         mock_post_resp.headers = {}
 
-        mock_requests.get.return_value = mock_userinfo_resp
-        mock_requests.post.return_value = mock_post_resp
+        mock_requests.Session.return_value.get.return_value = mock_userinfo_resp
+        mock_requests.Session.return_value.post.return_value = mock_post_resp
 
         platform = LinkedInPlatform(
             client_id="cid", client_secret="csec",
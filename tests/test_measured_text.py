@@ -0,0 +1,90 @@
+"""Tests for the shared grapheme boundary index."""
+
+import grapheme
+
+from core.measured_text import MeasuredText
+
+
+class TestMeasuredText:
+    def test_joins_mark_offsets_inside_clusters(self):
+        measured = MeasuredText("a👍🏽é\r\n")
+        assert list(measured.joins) == [2, 5]
+
+    def test_plain_text_has_no_joins(self):
+        assert len(MeasuredText("Hello, world. " * 50).joins) == 0
+        assert len(MeasuredText("東京タワー 👍 " * 50).joins) == 0
+
+    def test_only_windows_around_joining_code_points_are_segmented(self, monkeypatch):
+        segmented = []
+        grapheme_lengths = grapheme.grapheme_lengths
+
+        def _recording(text):
+            segmented.append(text)
+            return grapheme_lengths(text)
+
+        monkeypatch.setattr(grapheme, "grapheme_lengths", _recording)
+        text = "東京 " * 50 + "👍🏽 🇺🇸🇯🇵 👨‍👩‍👧" + " plain" * 50
+        measured = MeasuredText(text)
+        assert measured.length() == len(text) - 7
+        # Modifiers and flags are indexed without segmentation.
+        assert segmented == ["👨‍👩‍👧"]
+
+    def test_length_counts_graphemes_or_chars(self):
+        text = "hi 👨‍👩‍👧 🇺🇸!"
+        measured = MeasuredText(text)
+        assert measured.length() == grapheme.length(text)
+        assert measured.length(use_graphemes=False) == len(text)
+        assert measured.length(3, 8) == 1
+        assert measured.length(4, 4) == 0
+
+    def test_marks_after_control_characters_stand_alone(self):
+        text = "\u0301a\u0301\n\u0301\u0301"
+        measured = MeasuredText(text)
+        assert list(measured.joins) == [2, 5]
+        assert measured.length() == grapheme.length(text) == 4
+
+    def test_span_cut_inside_cluster_matches_segmenting_it_alone(self):
+        text = "café ́x"
+        measured = MeasuredText(text)
+        for start in range(len(text) + 1):
+            for end in range(start, len(text) + 1):
+                assert measured.length(start, end) == grapheme.length(text[start:end])
+
+    def test_char_queries_do_not_segment(self):
+        measured = MeasuredText("👍🏽" * 10)
+        assert measured.length(0, 6, use_graphemes=False) == 6
+        assert measured.trim_point(0, 20, 3, use_graphemes=False) == 3
+        assert measured._joins is None
+
+    def test_trim_point_keeps_whole_clusters(self):
+        text = "ab👍🏽🇺🇸cd"
+        measured = MeasuredText(text)
+        assert measured.trim_point(0, len(text), 3) == 4
+        assert text[:measured.trim_point(0, len(text), 4)] == "ab👍🏽🇺🇸"
+        assert measured.trim_point(0, len(text), 0) == 0
+        assert measured.trim_point(2, 6, 10) == 6
+
+    def test_trim_point_inside_cluster(self):
+        text = "é́ x"
+        measured = MeasuredText(text)
+        assert measured.trim_point(1, len(text), 1) == 3
+
+    def test_edited_reindexes_only_around_the_edit(self):
+        measured = MeasuredText("ab \U0001F44D\U0001F3FD cd \U0001F1FA\U0001F1F8\U0001F1EF\U0001F1F5 e\u0301")
+        assert list(measured.joins) == [4, 10, 12, 15]
+        edits = [
+            (0, 0, "\U0001F468\u200d"),
+            (7, 9, "\U0001F3FEx"),
+            (10, 10, "\U0001F1EF"),
+            (14, 15, ""),
+            (2, 14, "\r\n"),
+        ]
+        for start, end, replacement in edits:
+            edited = measured.edited(start, end, replacement)
+            assert edited.text == measured.text[:start] + replacement + measured.text[end:]
+            assert list(edited.joins) == list(MeasuredText(edited.text).joins)
+
+    def test_edited_stays_lazy(self):
+        edited = MeasuredText("\U0001F44D\U0001F3FD a").edited(0, 0, "b")
+        assert edited._joins is None
+        assert list(edited.joins) == [2]
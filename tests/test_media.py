@@ -1,9 +1,26 @@
 """Tests for the media handler."""
 
 import io
+import os
+from unittest.mock import patch
 import pytest
 from PIL import Image
-from core.media import validate_image, resize_for_platform, PLATFORM_IMAGE_LIMITS
+from core.media import (
+    _decode_for_target,
+    describe_image,
+    sniff_format,
+    upload_buffer,
+    validate_image,
+    resize_for_platform,
+    resize_for_platforms,
+    encode_to_target,
+    MAX_ENCODES,
+    PLATFORM_IMAGE_LIMITS,
+    TARGET_FILL,
+    estimate_variants,
+)
+from core.size_model import DensityModel
+from tests.images import make_animated_gif, make_noise_image, make_truncated_jpeg
 
 
 def _make_test_image(width=100, height=100, format="PNG") -> bytes:
@@ -29,6 +46,43 @@ class TestValidateImage:
     def test_empty_data(self):
         assert validate_image(b"") is False
 
+    def test_rejects_images_over_pixel_ceiling(self):
+        data = _make_test_image(100, 100)
+        assert validate_image(data, max_pixels=10_000) is True
+        assert validate_image(data, max_pixels=9_999) is False
+
+
+class TestDescribeImage:
+    def test_sniff_format_from_magic_bytes(self):
+        assert sniff_format(_make_test_image(format="PNG")) == "PNG"
+        assert sniff_format(_make_test_image(format="JPEG")) == "JPEG"
+        assert sniff_format(_make_test_image(format="GIF")) == "GIF"
+        assert sniff_format(_make_test_image(format="BMP")) is None
+
+    def test_descriptor_fields(self):
+        data = _make_test_image(120, 80, format="JPEG")
+        descriptor = describe_image(data)
+        assert descriptor.format == "JPEG"
+        assert (descriptor.width, descriptor.height) == (120, 80)
+        assert descriptor.mode == "RGB"
+        assert descriptor.byte_size == len(data)
+        assert descriptor.mime_type == "image/jpeg"
+
+    def test_unsupported_format_never_reaches_pillow(self):
+        data = _make_test_image(format="BMP")
+        with patch("core.media.Image.open") as mock_open:
+            with pytest.raises(ValueError):
+                describe_image(data)
+        mock_open.assert_not_called()
+
+    def test_resize_with_descriptor_skips_header_check(self):
+        data = make_noise_image(800, 800)
+        descriptor = describe_image(data)
+        with patch("core.media.sniff_format", wraps=sniff_format) as mock_sniff:
+            result = resize_for_platforms(data, ["bluesky"], descriptor=descriptor)
+        mock_sniff.assert_not_called()
+        assert len(result["bluesky"]) <= PLATFORM_IMAGE_LIMITS["bluesky"]["max_bytes"]
+
 
 class TestResizeForPlatform:
     def test_small_image_unchanged(self):
@@ -53,3 +107,235 @@ class TestResizeForPlatform:
         data = _make_test_image(100, 100)
         result = resize_for_platform(data, "unknown_platform")
         assert result == data
+
+
+class TestResizeForPlatforms:
+    def test_small_image_shared_by_all_platforms(self):
+        data = _make_test_image(100, 100)
+        result = resize_for_platforms(data, ["twitter", "bluesky", "linkedin"])
+        assert result == {"twitter": data, "bluesky": data, "linkedin": data}
+
+    def test_truncated_pixel_data_raises_value_error(self):
+        data = make_truncated_jpeg()
+        describe_image(data)  # the header alone is valid
+        with pytest.raises(ValueError, match="Invalid JPEG image"):
+            resize_for_platforms(data, ["bluesky"])
+
+    def test_decodes_once_and_encodes_looser_target_separately(self):
+        data = make_noise_image(1400, 1400)
+        assert len(data) > PLATFORM_IMAGE_LIMITS["twitter"]["max_bytes"]
+
+        with patch("core.media.Image.open", wraps=Image.open) as mock_open:
+            result = resize_for_platforms(data, ["twitter", "bluesky", "linkedin"])
+
+        assert mock_open.call_count == 1
+        assert len(result["bluesky"]) <= PLATFORM_IMAGE_LIMITS["bluesky"]["max_bytes"]
+        # The 1MB variant is far under Twitter's band, so Twitter gets its own encode.
+        assert Image.open(io.BytesIO(result["twitter"])).size == (1400, 1400)
+        assert len(result["bluesky"]) < len(result["twitter"]) <= PLATFORM_IMAGE_LIMITS["twitter"]["max_bytes"]
+        assert result["linkedin"] == data
+
+    def test_reuses_stricter_output_within_looser_fill_band(self):
+        data = make_noise_image(1400, 1400)
+        bluesky_max = PLATFORM_IMAGE_LIMITS["bluesky"]["max_bytes"]
+        limits = {"bluesky": {"max_bytes": bluesky_max}, "twitter": {"max_bytes": bluesky_max + 1}}
+
+        with patch.dict("core.media.PLATFORM_IMAGE_LIMITS", limits):
+            with patch("core.media.encode_to_target", wraps=encode_to_target) as mock_encode:
+                result = resize_for_platforms(data, ["twitter", "bluesky"])
+
+        assert mock_encode.call_count == 1
+        assert result["twitter"] is result["bluesky"]
+
+
+def _make_flat_image(width, height, mode="RGB") -> bytes:
+    """Create a high-entropy image with only 16 distinct gray levels."""
+    noise = Image.frombytes("L", (width, height), os.urandom(width * height))
+    levels = noise.point(lambda v: (v % 16) * 16)
+    img = levels.convert(mode)
+    if mode == "RGBA":
+        img.putalpha(levels.point(lambda v: 0 if v == 0 else 255))
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+class TestFormatSelection:
+    def test_flat_image_becomes_palette_png(self):
+        data = _make_flat_image(1300, 1300)
+        max_bytes = PLATFORM_IMAGE_LIMITS["bluesky"]["max_bytes"]
+        assert len(data) > max_bytes
+
+        result = resize_for_platforms(data, ["bluesky"])["bluesky"]
+
+        assert result.startswith(b"\x89PNG")
+        assert len(result) <= max_bytes
+        assert Image.open(io.BytesIO(result)).mode == "P"
+
+    def test_flat_image_keeps_transparency(self):
+        data = _make_flat_image(1300, 1300, mode="RGBA")
+        assert len(data) > PLATFORM_IMAGE_LIMITS["bluesky"]["max_bytes"]
+
+        result = resize_for_platforms(data, ["bluesky"])["bluesky"]
+
+        img = Image.open(io.BytesIO(result))
+        assert img.format == "PNG"
+        assert img.convert("RGBA").getextrema()[3][0] == 0
+
+    def test_photographic_png_becomes_jpeg(self):
+        data = make_noise_image(1400, 1400)
+
+        result = resize_for_platforms(data, ["bluesky"])["bluesky"]
+
+        assert result.startswith(b"\xff\xd8\xff")
+
+
+class TestEncodeToTarget:
+    def test_lands_in_target_band_within_encode_budget(self):
+        img = Image.effect_noise((1500, 1500), 40).convert("RGB")
+        max_bytes = 300 * 1024
+
+        result = encode_to_target(img, max_bytes)
+
+        assert TARGET_FILL * max_bytes <= len(result.data) <= max_bytes
+        assert 1 <= result.encodes <= MAX_ENCODES
+        assert Image.open(io.BytesIO(result.data)).width == int(1500 * result.scale)
+
+    def test_fits_at_full_scale_in_one_encode(self):
+        img = Image.new("RGB", (200, 200), color="red")
+
+        result = encode_to_target(img, 1024 * 1024)
+
+        assert result.scale == 1.0
+        assert result.encodes == 1
+
+
+class TestMetadataStripping:
+    def _jpeg_with_exif(self, width, height, orientation=1, padding=0) -> bytes:
+        img = Image.frombytes("RGB", (width, height), os.urandom(width * height * 3))
+        exif = Image.Exif()
+        exif[0x0112] = orientation
+        exif[0x010E] = "x" * padding  # ImageDescription
+        buf = io.BytesIO()
+        img.save(buf, format="JPEG", quality=80, exif=exif.tobytes())
+        return buf.getvalue()
+
+    def test_slightly_oversized_image_is_stripped_not_resized(self):
+        max_bytes = PLATFORM_IMAGE_LIMITS["bluesky"]["max_bytes"]
+        data = self._jpeg_with_exif(1225, 1225, padding=60000)
+        assert len(data) - 60000 < max_bytes < len(data)
+
+        with patch("core.media._decode_for_target") as mock_decode:
+            result = resize_for_platforms(data, ["bluesky"])["bluesky"]
+
+        mock_decode.assert_not_called()
+        assert len(result) <= max_bytes
+        assert Image.open(io.BytesIO(result)).size == (1225, 1225)
+
+    def test_resized_output_applies_exif_orientation(self):
+        data = self._jpeg_with_exif(2000, 1000, orientation=6)
+        assert len(data) > PLATFORM_IMAGE_LIMITS["bluesky"]["max_bytes"]
+        result = resize_for_platforms(data, ["bluesky"])["bluesky"]
+
+        img = Image.open(io.BytesIO(result))
+        assert img.height > img.width
+        assert img.getexif().get(0x0112) is None
+
+
+class TestEstimateVariants:
+    def test_small_image_is_kept(self):
+        data = _make_test_image()
+        estimate = estimate_variants(describe_image(data), ["bluesky"])["bluesky"]
+        assert estimate.action == "keep"
+        assert estimate.bytes == len(data)
+
+    def test_resize_estimate_tracks_real_encode(self):
+        data = make_noise_image(2400, 1600, format="JPEG")
+        descriptor = describe_image(data)
+        model = DensityModel(priors={})
+        max_bytes = PLATFORM_IMAGE_LIMITS["bluesky"]["max_bytes"]
+
+        estimate = estimate_variants(descriptor, ["bluesky"], model=model)["bluesky"]
+        resize_for_platforms(data, ["bluesky"], descriptor=descriptor, model=model)
+        learned = estimate_variants(descriptor, ["bluesky"], model=model)["bluesky"]
+
+        assert estimate.action == "resize"
+        assert estimate.format == "JPEG"
+        assert 0 < estimate.scale < 1
+        assert TARGET_FILL * max_bytes <= learned.bytes <= max_bytes
+        # The first encode teaches the model this source's true density.
+        assert learned.scale != estimate.scale
+
+
+class TestAnimatedGif:
+    def test_descriptor_counts_frames(self):
+        descriptor = describe_image(make_animated_gif(frames=3))
+        assert descriptor.frames == 3
+        assert descriptor.animated
+        assert not describe_image(_make_test_image(format="GIF")).animated
+
+    def test_resize_keeps_animation(self):
+        data = make_animated_gif(frames=10)
+        max_bytes = len(data) // 2
+        with patch.dict(PLATFORM_IMAGE_LIMITS["bluesky"], {"max_bytes": max_bytes}):
+            estimate = estimate_variants(describe_image(data), ["bluesky"])["bluesky"]
+            result = resize_for_platforms(data, ["bluesky", "twitter"])
+
+        assert estimate.format == "GIF"
+        assert len(result["bluesky"]) <= max_bytes
+        assert result["twitter"] == data
+        out = Image.open(io.BytesIO(result["bluesky"]))
+        assert out.format == "GIF"
+        assert out.n_frames > 1
+
+    def test_spent_cpu_budget_falls_back_to_still(self):
+        data = make_animated_gif(frames=4)
+        max_bytes = len(data) // 2
+        with patch.dict(PLATFORM_IMAGE_LIMITS["bluesky"], {"max_bytes": max_bytes}), \
+                patch("core.media.ANIMATION_CPU_BUDGET_SECONDS", -1):
+            result = resize_for_platforms(data, ["bluesky"])["bluesky"]
+
+        assert len(result) <= max_bytes
+        assert sniff_format(result) in ("JPEG", "PNG")
+
+
+class TestUploadBuffer:
+    def test_small_upload_is_read_into_memory(self):
+        data = _make_test_image()
+        assert upload_buffer(io.BytesIO(data)) == data
+
+    def test_large_file_backed_upload_is_memory_mapped(self, tmp_path):
+        import mmap
+
+        data = make_noise_image(1400, 1400, format="JPEG")
+        with open(tmp_path / "upload", "wb+") as stream:
+            stream.write(data)
+            buffer = upload_buffer(stream)
+        assert isinstance(buffer, mmap.mmap)
+
+        assert describe_image(buffer).byte_size == len(data)
+        result = resize_for_platforms(buffer, ["bluesky", "linkedin"])
+        assert isinstance(result["linkedin"], bytes)
+        assert result["linkedin"] == data
+        assert len(result["bluesky"]) <= PLATFORM_IMAGE_LIMITS["bluesky"]["max_bytes"]
+
+
+class TestReducedDecode:
+    def test_jpeg_decodes_in_draft_mode_near_target_size(self):
+        data = make_noise_image(2400, 1600, format="JPEG")
+
+        img, density, output_format = _decode_for_target(
+            data, max_bytes=100 * 1024, model=DensityModel(priors={}),
+        )
+
+        assert density == pytest.approx(len(data) / (2400 * 1600))
+        assert img.width < 2400 and img.height < 1600
+        assert img.mode == "RGB"
+        assert output_format == "JPEG"
+
+    def test_pixel_ceiling_rejected_before_decode(self):
+        data = _make_test_image(100, 100)
+        with patch("PIL.ImageFile.ImageFile.load") as mock_load:
+            with pytest.raises(ValueError, match="pixels"):
+                resize_for_platforms(data + b"\0" * (2 * 1024 * 1024), ["bluesky"], max_pixels=100)
+        mock_load.assert_not_called()
@@ -0,0 +1,71 @@
+"""Tests for the media benchmark's corpus and regression check."""
+
+import json
+from pathlib import Path
+
+from benchmarks.media_bench import CORPUS, MACHINE_METRICS, build_corpus, compare, deterministic
+from core.media import describe_image
+
+
+def _report(seconds=1.0, rss_growth_kb=50_000, encodes=3, limit_ratio=0.9):
+    return {
+        "results": {
+            "photo_jpeg": {
+                "source_bytes": 5_000_000,
+                "operations": {
+                    "validate": {"seconds": 0.004, "peak_rss_kb": 60_000, "rss_growth_kb": 400},
+                    "bluesky": {
+                        "seconds": seconds,
+                        "peak_rss_kb": 160_000,
+                        "rss_growth_kb": rss_growth_kb,
+                        "encodes": encodes,
+                        "output_bytes": int(limit_ratio * 1024 * 1024),
+                        "limit_ratio": limit_ratio,
+                        "resized": True,
+                    },
+                },
+            },
+        },
+    }
+
+
+class TestCorpus:
+    def test_corpus_is_reproducible(self):
+        first = build_corpus(seed=7, names=["near_limit_png"])
+        second = build_corpus(seed=7, names=["near_limit_png"])
+        assert first == second
+        assert build_corpus(seed=8, names=["near_limit_png"]) != first
+
+    def test_near_limit_image_is_just_over_bluesky_limit(self):
+        data = build_corpus(names=["near_limit_png"])["near_limit_png"]
+        assert 1024 * 1024 < len(data) < 1.2 * 1024 * 1024
+        assert describe_image(data).format == "PNG"
+
+
+class TestCompare:
+    def test_identical_runs_have_no_regressions(self):
+        assert compare(_report(), _report()) == []
+
+    def test_flags_slower_more_encodes_and_worse_fill(self):
+        regressions = compare(_report(), _report(seconds=1.5, encodes=5, limit_ratio=0.7))
+        assert len(regressions) == 3
+        assert all(line.startswith("photo_jpeg/bluesky") for line in regressions)
+
+    def test_flags_memory_growth(self):
+        assert compare(_report(), _report(rss_growth_kb=80_000))
+
+    def test_flags_output_over_limit(self):
+        assert compare(_report(), _report(limit_ratio=1.01))
+
+    def test_deterministic_baseline_checks_encodes_and_fill_only(self):
+        baseline = deterministic(_report())
+        assert compare(baseline, _report(seconds=9.0, rss_growth_kb=900_000)) == []
+        assert len(compare(baseline, _report(encodes=5, limit_ratio=0.7))) == 2
+
+    def test_committed_baseline_covers_every_case(self):
+        path = Path(__file__).resolve().parent.parent / "benchmarks" / "media-baseline.json"
+        baseline = json.loads(path.read_text())
+        assert set(baseline["results"]) == set(CORPUS)
+        for case in baseline["results"].values():
+            for result in case["operations"].values():
+                assert not set(result) & set(MACHINE_METRICS)
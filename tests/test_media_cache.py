@@ -0,0 +1,74 @@
+"""Tests for the resized-variant cache."""
+
+from unittest.mock import patch
+
+from core.media import PLATFORM_IMAGE_LIMITS, resize_for_platforms
+from core.media_cache import VariantCache, source_digest
+from tests.images import make_noise_image
+
+
+class TestVariantCache:
+    def test_memory_tier_evicts_least_recently_used(self):
+        cache = VariantCache(memory_bytes=10)
+        cache.put("a", b"12345")
+        cache.put("b", b"12345")
+        assert cache.get("a") == b"12345"  # refresh "a"
+
+        cache.put("c", b"12345")
+
+        assert cache.get("a") == b"12345"
+        assert cache.get("b") is None
+        assert cache.get("c") == b"12345"
+
+    def test_disk_tier_survives_new_instance(self, tmp_path):
+        VariantCache(disk_dir=tmp_path).put("key", b"variant")
+
+        assert VariantCache(disk_dir=tmp_path).get("key") == b"variant"
+
+    def test_disk_tier_is_size_capped(self, tmp_path):
+        cache = VariantCache(memory_bytes=0, disk_dir=tmp_path, disk_bytes=25)
+        for i in range(5):
+            cache.put(f"k{i}", b"0123456789")
+
+        total = sum(p.stat().st_size for p in tmp_path.glob("*/*"))
+        assert total <= 25
+        assert cache.get("k4") == b"0123456789"
+
+    def test_overwriting_a_disk_entry_does_not_grow_usage(self, tmp_path):
+        cache = VariantCache(memory_bytes=0, disk_dir=tmp_path, disk_bytes=25)
+        cache.put("k0", b"0123456789")
+        with patch.object(cache, "_disk_entries", wraps=cache._disk_entries) as mock_scan:
+            for _ in range(5):
+                cache.put("k1", b"0123456789")
+
+        # Usage stays at 20 bytes, so no trim scan is ever triggered.
+        mock_scan.assert_not_called()
+        assert cache.get("k0") == b"0123456789"
+
+
+class TestResizeWithCache:
+    def test_repost_skips_decode_and_encode(self):
+        data = make_noise_image(700, 700)
+        cache = VariantCache()
+        first = resize_for_platforms(data, ["bluesky"], cache=cache)
+
+        with patch("core.media._decode_for_target") as mock_decode:
+            second = resize_for_platforms(data, ["bluesky"], cache=cache)
+
+        mock_decode.assert_not_called()
+        assert second == first
+        assert cache.get(VariantCache.key(source_digest(data), "bluesky")) == first["bluesky"]
+
+    def test_reused_stricter_variant_is_not_cached(self):
+        data = make_noise_image(1400, 1400)
+        bluesky_max = PLATFORM_IMAGE_LIMITS["bluesky"]["max_bytes"]
+        limits = {"bluesky": {"max_bytes": bluesky_max}, "twitter": {"max_bytes": bluesky_max + 1}}
+        cache = VariantCache()
+
+        with patch.dict("core.media.PLATFORM_IMAGE_LIMITS", limits):
+            result = resize_for_platforms(data, ["twitter", "bluesky"], cache=cache)
+
+        digest = source_digest(data)
+        assert result["twitter"] is result["bluesky"]
+        assert cache.get(VariantCache.key(digest, "bluesky")) == result["bluesky"]
+        assert cache.get(VariantCache.key(digest, "twitter")) is None
@@ -0,0 +1,73 @@
+"""Tests for the cross-post media ID cache."""
+
+from platforms.media_ids import MediaIdCache
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestMediaIdCache:
+    def test_reuses_id_for_same_account_and_bytes(self):
+        cache = MediaIdCache()
+        cache.put(MediaIdCache.key_for("twitter", "acct", b"image"), 42, ttl_seconds=60)
+
+        assert cache.get(MediaIdCache.key_for("twitter", "acct", b"image")) == 42
+        assert cache.get(MediaIdCache.key_for("twitter", "acct", b"other")) is None
+        assert cache.get(MediaIdCache.key_for("twitter", "other-acct", b"image")) is None
+        assert cache.get(MediaIdCache.key_for("bluesky", "acct", b"image")) is None
+
+    def test_key_does_not_hold_account_in_plain_text(self):
+        key = MediaIdCache.key_for("twitter", "secret-token", b"image")
+        assert "secret-token" not in key
+
+    def test_entries_expire_after_ttl(self):
+        clock = _FakeClock()
+        cache = MediaIdCache(clock=clock)
+        key = MediaIdCache.key_for("bluesky", "acct", b"image")
+        cache.put(key, "blob", ttl_seconds=60)
+
+        clock.now = 59
+        assert cache.get(key) == "blob"
+        clock.now = 60
+        assert cache.get(key) is None
+        assert len(cache) == 0
+
+    def test_non_positive_ttl_is_not_cached(self):
+        cache = MediaIdCache()
+        cache.put(MediaIdCache.key_for("twitter", "acct", b"image"), 42, ttl_seconds=0)
+        assert len(cache) == 0
+
+    def test_evicts_least_recently_used(self):
+        cache = MediaIdCache(max_items=2)
+        keys = [MediaIdCache.key_for("twitter", "acct", bytes([i])) for i in range(3)]
+        cache.put(keys[0], 0, ttl_seconds=60)
+        cache.put(keys[1], 1, ttl_seconds=60)
+        cache.get(keys[0])
+        cache.put(keys[2], 2, ttl_seconds=60)
+
+        assert cache.get(keys[0]) == 0
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[2]) == 2
+
+    def test_discard(self):
+        cache = MediaIdCache()
+        key = MediaIdCache.key_for("twitter", "acct", b"image")
+        cache.put(key, 42, ttl_seconds=60)
+        cache.discard(key)
+        assert cache.get(key) is None
+
+    def test_forget_drops_every_image_in_groups(self):
+        cache = MediaIdCache()
+        for i, data in enumerate([b"a", b"b", b"c"]):
+            cache.put(MediaIdCache.key_for("twitter", "acct", data), i, ttl_seconds=60)
+
+        cache.forget("twitter", "acct", [[b"a"], [], [b"b"]])
+
+        assert cache.get(MediaIdCache.key_for("twitter", "acct", b"a")) is None
+        assert cache.get(MediaIdCache.key_for("twitter", "acct", b"b")) is None
+        assert cache.get(MediaIdCache.key_for("twitter", "acct", b"c")) == 2
@@ -0,0 +1,84 @@
+"""Tests for the process-pool image resizing backend."""
+
+import io
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from unittest.mock import patch
+
+import pytest
+from PIL import Image
+
+from core.media import PLATFORM_IMAGE_LIMITS
+from core.media_cache import VariantCache, source_digest
+from core.media_pool import MediaWorkerPool
+from tests.images import make_noise_image
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = MediaWorkerPool(workers=1)
+    yield pool
+    pool.close()
+
+
+class TestMediaWorkerPool:
+    def test_resizes_in_worker(self, pool):
+        data = make_noise_image(1400, 1400)
+        platforms = ["twitter", "bluesky", "linkedin"]
+
+        result = pool.resize_for_platforms(data, platforms)
+
+        assert result["linkedin"] is data
+        assert len(result["bluesky"]) <= PLATFORM_IMAGE_LIMITS["bluesky"]["max_bytes"]
+        assert len(result["bluesky"]) < len(result["twitter"]) <= PLATFORM_IMAGE_LIMITS["twitter"]["max_bytes"]
+        assert Image.open(io.BytesIO(result["bluesky"])).format == "JPEG"
+
+    def test_fills_and_serves_cache_in_process(self, pool):
+        data = make_noise_image(800, 800)
+        cache = VariantCache()
+
+        first = pool.resize_for_platforms(data, ["bluesky"], cache=cache)
+        with patch.object(pool._executor, "submit") as mock_submit:
+            second = pool.resize_for_platforms(data, ["bluesky"], cache=cache)
+
+        mock_submit.assert_not_called()
+        assert second == first
+
+    def test_sends_only_uncached_targets_to_worker(self, pool):
+        data = make_noise_image(1400, 1400)
+        cache = VariantCache()
+        first = pool.resize_for_platforms(data, ["bluesky"], cache=cache)
+
+        with patch.object(pool._executor, "submit", wraps=pool._executor.submit) as mock_submit:
+            result = pool.resize_for_platforms(data, ["twitter", "bluesky", "linkedin"], cache=cache)
+
+        assert mock_submit.call_args.args[3] == ["twitter"]
+        assert result["bluesky"] == first["bluesky"]
+        assert result["linkedin"] == data
+        assert cache.get(VariantCache.key(source_digest(data), "twitter")) == result["twitter"]
+
+    def test_timeout_raises_and_worker_keeps_slot_until_done(self, pool):
+        data = make_noise_image(1400, 1400)
+
+        with pytest.raises(FutureTimeoutError):
+            pool.resize_for_platforms(data, ["bluesky"], timeout=0)
+
+        assert pool._in_flight == 1
+        give_up = time.monotonic() + 30
+        while pool._in_flight and time.monotonic() < give_up:
+            time.sleep(0.05)
+        assert pool._in_flight == 0
+
+    def test_saturated_pool_resizes_in_process(self, pool):
+        data = make_noise_image(800, 800)
+        with patch.object(pool, "_reserve", return_value=False), \
+                patch.object(pool._executor, "submit") as mock_submit:
+            result = pool.resize_for_platforms(data, ["bluesky"])
+
+        mock_submit.assert_not_called()
+        assert len(result["bluesky"]) <= PLATFORM_IMAGE_LIMITS["bluesky"]["max_bytes"]
+
+    def test_worker_errors_propagate(self, pool):
+        data = make_noise_image(800, 800)
+        with pytest.raises(ValueError, match="pixels"):
+            pool.resize_for_platforms(data, ["bluesky"], max_pixels=100)
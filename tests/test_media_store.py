@@ -0,0 +1,64 @@
+"""Tests for pre-rendered uploads kept under media handles."""
+
+import io
+
+import pytest
+from PIL import Image
+
+from core.media_store import MediaStore
+from tests.images import make_truncated_jpeg
+
+
+def _make_jpeg(color="red") -> bytes:
+    buf = io.BytesIO()
+    Image.new("RGB", (20, 20), color=color).save(buf, format="JPEG")
+    return buf.getvalue()
+
+
+class TestMediaStore:
+    def test_add_pre_renders_every_platform(self):
+        store = MediaStore(platforms=["twitter", "bluesky"])
+        handle = store.add(_make_jpeg())
+
+        variants = store.variants(handle, timeout=5)
+
+        assert set(variants) == {"twitter", "bluesky"}
+        assert all(data for data in variants.values())
+
+    def test_unknown_handle_returns_none(self):
+        store = MediaStore()
+        assert store.get("missing") is None
+        assert store.variants("missing") is None
+
+    def test_handles_expire_after_ttl(self):
+        now = [1000.0]
+        store = MediaStore(ttl_seconds=60, clock=lambda: now[0])
+        handle = store.add(_make_jpeg())
+        assert store.get(handle) is not None
+
+        now[0] += 61
+
+        assert store.get(handle) is None
+
+    def test_oldest_handles_dropped_past_max_items(self):
+        store = MediaStore(max_items=2)
+        first = store.add(_make_jpeg("red"))
+        second = store.add(_make_jpeg("green"))
+        third = store.add(_make_jpeg("blue"))
+
+        assert store.get(first) is None
+        assert store.get(second) is not None
+        assert store.get(third) is not None
+
+    def test_discard_removes_handle(self):
+        store = MediaStore()
+        handle = store.add(_make_jpeg())
+        store.discard(handle)
+        assert store.get(handle) is None
+
+    def test_render_failure_raises_value_error(self):
+        store = MediaStore(platforms=["bluesky"])
+        handle = store.add(make_truncated_jpeg())
+
+        with pytest.raises(ValueError):
+            store.variants(handle, timeout=5)
@@ -0,0 +1,91 @@
+"""Tests for lossless metadata stripping."""
+
+import io
+import os
+
+from PIL import Image, ImageCms, PngImagePlugin
+
+from core.metadata import ORIENTATION_TAG, strip_metadata
+
+
+def _make_jpeg_with_metadata(orientation=6, progressive=False) -> bytes:
+    img = Image.frombytes("RGB", (120, 80), os.urandom(120 * 80 * 3))
+    exif = Image.Exif()
+    exif[ORIENTATION_TAG] = orientation
+    exif[0x010F] = "Camera maker " * 200
+    icc = ImageCms.ImageCmsProfile(ImageCms.createProfile("sRGB")).tobytes()
+    buf = io.BytesIO()
+    img.save(
+        buf,
+        format="JPEG",
+        exif=exif.tobytes(),
+        icc_profile=icc,
+        comment=b"c" * 4000,
+        progressive=progressive,
+    )
+    # Phones append secondary (MPF) images after the primary EOI.
+    return buf.getvalue() + b"\xff\xd8" + b"\0" * 5000
+
+
+def _pixels(data: bytes) -> bytes:
+    return Image.open(io.BytesIO(data)).tobytes()
+
+
+class TestStripJpeg:
+    def test_drops_metadata_and_keeps_orientation(self):
+        data = _make_jpeg_with_metadata()
+
+        stripped = strip_metadata(data, "JPEG")
+
+        assert len(stripped) < len(data) - 9000
+        img = Image.open(io.BytesIO(stripped))
+        assert img.getexif().get(ORIENTATION_TAG) == 6
+        assert img.getexif().get(0x010F) is None
+        assert "comment" not in img.info
+        assert img.info.get("icc_profile")
+        assert _pixels(stripped) == _pixels(data)
+
+    def test_progressive_scan_data_is_kept(self):
+        data = _make_jpeg_with_metadata(progressive=True)
+
+        stripped = strip_metadata(data, "JPEG")
+
+        assert _pixels(stripped) == _pixels(data)
+
+    def test_icc_profile_dropped_only_when_asked(self):
+        data = _make_jpeg_with_metadata(orientation=1)
+
+        with_icc = strip_metadata(data, "JPEG")
+        without_icc = strip_metadata(data, "JPEG", keep_icc=False)
+
+        assert len(without_icc) < len(with_icc)
+        img = Image.open(io.BytesIO(without_icc))
+        assert not img.info.get("icc_profile")
+        assert not img.getexif()
+
+    def test_unparseable_input_returned_unchanged(self):
+        data = b"\xff\xd8\x00garbage"
+        assert strip_metadata(data, "JPEG") is data
+
+
+class TestStripPng:
+    def test_drops_text_chunks_and_keeps_transparency(self):
+        img = Image.new("RGBA", (40, 40), (255, 0, 0, 0))
+        info = PngImagePlugin.PngInfo()
+        info.add_text("Comment", "x" * 5000)
+        buf = io.BytesIO()
+        img.save(buf, format="PNG", pnginfo=info)
+        data = buf.getvalue()
+
+        stripped = strip_metadata(data, "PNG")
+
+        assert len(stripped) < len(data) - 4000
+        result = Image.open(io.BytesIO(stripped))
+        assert "Comment" not in result.info
+        assert result.convert("RGBA").tobytes() == img.tobytes()
+
+    def test_other_formats_unchanged(self):
+        buf = io.BytesIO()
+        Image.new("RGB", (10, 10)).save(buf, format="GIF")
+        data = buf.getvalue()
+        assert strip_metadata(data, "GIF") is data
@@ -0,0 +1,79 @@
+"""Tests for the platform client pool."""
+
+from unittest.mock import MagicMock
+
+from platforms.pool import ClientPool
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestClientPool:
+    def test_reuses_client_for_same_credentials(self):
+        pool = ClientPool()
+        factory = MagicMock(side_effect=lambda: MagicMock())
+
+        first = pool.get("twitter", factory, ("key", "secret"))
+        second = pool.get("twitter", factory, ("key", "secret"))
+
+        assert first is second
+        assert factory.call_count == 1
+
+    def test_new_client_for_changed_credentials(self):
+        pool = ClientPool()
+        factory = MagicMock(side_effect=lambda: MagicMock())
+
+        first = pool.get("twitter", factory, ("key", "secret"))
+        second = pool.get("twitter", factory, ("key", "rotated"))
+
+        assert first is not second
+        assert factory.call_count == 2
+
+    def test_idle_clients_are_closed_and_evicted(self):
+        clock = _FakeClock()
+        pool = ClientPool(idle_seconds=60, clock=clock)
+        client = pool.get("bluesky", MagicMock, ("user", "pass"))
+
+        clock.now = 61
+        pool.evict_idle()
+
+        client.close.assert_called_once()
+        assert len(pool) == 0
+
+    def test_unhealthy_client_is_rebuilt(self):
+        pool = ClientPool()
+        stale = MagicMock()
+        stale.is_healthy.return_value = False
+        fresh = MagicMock()
+        factory = MagicMock(side_effect=[stale, fresh])
+
+        pool.get("linkedin", factory, ("id", "secret"))
+        client = pool.get("linkedin", factory, ("id", "secret"))
+
+        assert client is fresh
+        stale.close.assert_called_once()
+
+    def test_retire_waits_for_lease_and_spares_other_clients(self):
+        pool = ClientPool()
+        factory = MagicMock(side_effect=lambda: MagicMock())
+        other = pool.get("bluesky", factory, ("other", "pass"))
+
+        with pool.lease("bluesky", factory, ("user", "pass")) as client:
+            pool.retire(client)
+            client.close.assert_not_called()
+            assert pool.get("bluesky", factory, ("user", "pass")) is not client
+        client.close.assert_called_once()
+        other.close.assert_not_called()
+
+    def test_discard_does_not_close_leased_clients(self):
+        pool = ClientPool()
+        with pool.lease("linkedin", MagicMock, ("id", "secret")) as client:
+            pool.discard("linkedin")
+            client.close.assert_not_called()
+        client.close.assert_called_once()
+        assert len(pool) == 0
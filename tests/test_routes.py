@@ -2,10 +2,15 @@
 
 import io
 import json
+import threading
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from unittest.mock import patch, MagicMock
 
 import pytest
 
+from core.media import describe_image
+from tests.images import make_truncated_jpeg
 from web.app import create_app
 
 
@@ -92,6 +97,46 @@ class TestPreview:
         data = resp.get_json()
         assert data["linkedin"]["parts"] == ["i*\u200bagent and *\u200bbold*\u200b"]
 
+    def test_preview_session_matches_full_preview(self, client):
+        def _preview(text, **extra):
+            resp = client.post(
+                "/api/preview",
+                data=json.dumps({"text": text, "platforms": ["twitter", "bluesky"], **extra}),
+                content_type="application/json",
+            )
+            return resp.get_json()
+
+        text = "Keep typing into this draft. " * 30
+        for typed in ["", " and", " and more"]:
+            assert _preview(text + typed, sessionId="tab-1") == _preview(text + typed)
+
+    def test_preview_session_applies_client_edits(self, client):
+        def _preview(**body):
+            return client.post(
+                "/api/preview",
+                data=json.dumps({"platforms": ["twitter", "bluesky"], **body}),
+                content_type="application/json",
+            )
+
+        text = "Keep typing \u2014 into this draft. " * 30
+        assert _preview(text=text, sessionId="tab-2").status_code == 200
+        for start, end, replacement in [(len(text), len(text), " and\u2014more"), (12, 14, "")]:
+            edit = {"start": start, "end": end, "text": replacement, "base": len(text)}
+            text = text[:start] + replacement + text[end:]
+            resp = _preview(edit=edit, sessionId="tab-2")
+            assert resp.status_code == 200
+            assert resp.get_json() == _preview(text=text).get_json()
+
+    def test_preview_session_rejects_stale_edit(self, client):
+        body = {"platforms": ["twitter"], "sessionId": "tab-3"}
+        resp = client.post(
+            "/api/preview",
+            data=json.dumps({**body, "edit": {"start": 0, "end": 0, "text": "Hi", "base": 40}}),
+            content_type="application/json",
+        )
+        assert resp.status_code == 409
+        assert "full text" in resp.get_json()["error"]
+
     def test_preview_manual_mode_with_image_refs(self, client):
         resp = client.post(
             "/api/preview",
@@ -240,6 +285,20 @@ class TestPost:
         assert "images_by_part" in kwargs
         assert len(kwargs["images_by_part"][0]) == 2
 
+    def test_post_rejects_oversized_upload(self, client):
+        client.application.config["MAX_CONTENT_LENGTH"] = 1024
+        resp = client.post(
+            "/api/post",
+            data={
+                "text": "Hello",
+                "platforms": "twitter",
+                "images": (io.BytesIO(b"\0" * 4096), "big.jpg"),
+            },
+            content_type="multipart/form-data",
+        )
+        assert resp.status_code == 413
+        assert "too large" in resp.get_json()["error"]
+
     def test_post_invalid_image(self, client):
         resp = client.post(
             "/api/post",
@@ -254,6 +313,112 @@ class TestPost:
         data = resp.get_json()
         assert "Invalid image" in data["error"]
 
+    def test_media_upload_returns_handle(self, client):
+        from PIL import Image
+        buf = io.BytesIO()
+        Image.new("RGB", (10, 10), color="red").save(buf, format="JPEG")
+        buf.seek(0)
+
+        resp = client.post(
+            "/api/media",
+            data={"image": (buf, "test.jpg")},
+            content_type="multipart/form-data",
+        )
+        assert resp.status_code == 200
+        data = resp.get_json()
+        assert (data["format"], data["width"], data["height"]) == ("JPEG", 10, 10)
+        handle = data["handle"]
+        store = client.application.extensions["media_store"]
+        assert set(store.variants(handle, timeout=5)) == {"twitter", "bluesky", "linkedin"}
+
+    def test_media_upload_invalid_image(self, client):
+        resp = client.post(
+            "/api/media",
+            data={"image": (io.BytesIO(b"not an image"), "bad.jpg")},
+            content_type="multipart/form-data",
+        )
+        assert resp.status_code == 400
+        assert "Invalid image" in resp.get_json()["error"]
+
+    @patch("web.routes.BlueskyPlatform", autospec=True)
+    def test_post_with_unrenderable_upload_is_rejected(self, MockBluesky, client):
+        resp = client.post(
+            "/api/post",
+            data={
+                "text": "Hello",
+                "platforms": "bluesky",
+                "images": (io.BytesIO(make_truncated_jpeg()), "cut.jpg"),
+            },
+            content_type="multipart/form-data",
+        )
+
+        assert resp.status_code == 400
+        assert resp.get_json()["error"] == "Invalid image file"
+        MockBluesky.return_value.post.assert_not_called()
+
+    @patch("web.routes.BlueskyPlatform", autospec=True)
+    def test_post_with_unrenderable_media_handle_is_rejected(self, MockBluesky, client):
+        handle = client.application.extensions["media_store"].add(make_truncated_jpeg())
+
+        resp = client.post(
+            "/api/post",
+            data={"text": "Hello", "platforms": "bluesky", "media": handle},
+            content_type="multipart/form-data",
+        )
+
+        assert resp.status_code == 400
+        assert resp.get_json()["error"] == "Invalid image file"
+        MockBluesky.return_value.post.assert_not_called()
+
+    @patch("web.routes.TwitterPlatform", autospec=True)
+    def test_post_with_media_handle(self, MockTwitter, client):
+        mock_instance = MockTwitter.return_value
+        mock_instance.post.return_value = {"success": True}
+
+        from PIL import Image
+        buf = io.BytesIO()
+        Image.new("RGB", (10, 10), color="red").save(buf, format="JPEG")
+        handle = client.application.extensions["media_store"].add(buf.getvalue())
+
+        with patch("web.routes.resize_for_platforms") as mock_resize:
+            resp = client.post(
+                "/api/post",
+                data={"text": "Hello", "platforms": "twitter", "media": handle},
+                content_type="multipart/form-data",
+            )
+            mock_resize.assert_not_called()
+
+        assert resp.get_json()["twitter"]["success"] is True
+        kwargs = mock_instance.post.call_args.kwargs
+        assert len(kwargs["images_by_part"][0]) == 1
+
+    def test_preview_returns_size_estimates_for_media(self, client):
+        from PIL import Image
+        buf = io.BytesIO()
+        Image.new("RGB", (10, 10), color="red").save(buf, format="JPEG")
+        handle = client.application.extensions["media_store"].add(
+            buf.getvalue(), describe_image(buf.getvalue()),
+        )
+
+        resp = client.post(
+            "/api/preview",
+            data=json.dumps({"text": "Hi", "platforms": ["bluesky"], "media": [handle, "gone"]}),
+            content_type="application/json",
+        )
+        images = resp.get_json()["bluesky"]["images"]
+        assert images[0]["action"] == "keep"
+        assert images[0]["bytes"] == len(buf.getvalue())
+        assert images[1] is None
+
+    def test_post_with_expired_media_handle(self, client):
+        resp = client.post(
+            "/api/post",
+            data={"text": "Hello", "platforms": "twitter", "media": "expired"},
+            content_type="multipart/form-data",
+        )
+        assert resp.status_code == 409
+        assert resp.get_json()["code"] == "media_expired"
+
     @patch("web.routes.TwitterPlatform", autospec=True)
     def test_post_records_twitter_rate_limit_snapshot(self, MockTwitter, client):
         mock_instance = MockTwitter.return_value
@@ -282,6 +447,148 @@ class TestPost:
         assert data["twitter"]["limit"] == 200
         assert data["twitter"]["remaining"] == 199
 
+    @patch("web.routes.TwitterPlatform", autospec=True)
+    def test_post_reuses_pooled_platform_client(self, MockTwitter, client):
+        MockTwitter.return_value.post.return_value = {"success": True}
+
+        for _ in range(2):
+            resp = client.post(
+                "/api/post",
+                data={"text": "Hello world", "platforms": "twitter"},
+            )
+            assert resp.get_json()["twitter"]["success"] is True
+
+        assert MockTwitter.call_count == 1
+        assert MockTwitter.return_value.post.call_count == 2
+
+    @patch("web.routes.TwitterPlatform")
+    def test_post_retires_client_the_platform_flags(self, MockTwitter, client):
+        first, second = MagicMock(), MagicMock()
+        first.post.return_value = {"success": False, "error": "401 Unauthorized", "retire_client": True}
+        second.post.return_value = {"success": True, "ids": ["1"]}
+        MockTwitter.side_effect = [first, second]
+
+        results = [
+            client.post("/api/post", data={"text": "Hello", "platforms": "twitter"}).get_json()
+            for _ in range(2)
+        ]
+
+        assert results[0]["twitter"] == {"success": False, "error": "401 Unauthorized"}
+        assert results[1]["twitter"]["success"] is True
+        first.close.assert_called_once()
+        second.close.assert_not_called()
+
+    @patch("web.routes.BlueskyPlatform", autospec=True)
+    @patch("web.routes.TwitterPlatform", autospec=True)
+    def test_post_platforms_run_concurrently(self, MockTwitter, MockBluesky, client):
+        def _slow_post(*args, **kwargs):
+            time.sleep(0.3)
+            return {"success": True}
+
+        MockTwitter.return_value.post.side_effect = _slow_post
+        MockBluesky.return_value.post.side_effect = _slow_post
+
+        started = time.monotonic()
+        resp = client.post(
+            "/api/post",
+            data={"text": "Hello world", "platforms": ["twitter", "bluesky"]},
+        )
+        elapsed = time.monotonic() - started
+
+        data = resp.get_json()
+        assert data["twitter"]["success"] is True
+        assert data["bluesky"]["success"] is True
+        assert elapsed < 0.55
+
+    @patch("web.routes.BlueskyPlatform", autospec=True)
+    @patch("web.routes.TwitterPlatform", autospec=True)
+    def test_post_slow_platform_hits_deadline(self, MockTwitter, MockBluesky, client):
+        client.application.config["POST_DEADLINE_SECONDS"] = 0.2
+        release = threading.Event()
+
+        def _stuck_post(*args, **kwargs):
+            release.wait(5)
+            return {"success": True}
+
+        MockTwitter.return_value.post.side_effect = _stuck_post
+        MockBluesky.return_value.post.return_value = {"success": True}
+
+        try:
+            resp = client.post(
+                "/api/post",
+                data={"text": "Hello world", "platforms": ["twitter", "bluesky"]},
+            )
+        finally:
+            release.set()
+
+        data = resp.get_json()
+        assert data["bluesky"]["success"] is True
+        assert data["twitter"]["success"] is False
+        assert "Timed out" in data["twitter"]["error"]
+
+    @patch("web.routes.BlueskyPlatform", autospec=True)
+    @patch("web.routes.TwitterPlatform", autospec=True)
+    def test_timed_out_posts_do_not_starve_later_posts(self, MockTwitter, MockBluesky, client):
+        client.application.config["POST_DEADLINE_SECONDS"] = 0.05
+        release = threading.Event()
+        MockTwitter.return_value.post.side_effect = lambda *args, **kwargs: release.wait(5)
+        MockBluesky.return_value.post.return_value = {"success": True}
+
+        try:
+            for _ in range(8):
+                resp = client.post("/api/post", data={"text": "Hello world", "platforms": ["twitter"]})
+                assert "Timed out" in resp.get_json()["twitter"]["error"]
+            resp = client.post("/api/post", data={"text": "Hello world", "platforms": ["bluesky"]})
+        finally:
+            release.set()
+
+        assert resp.get_json()["bluesky"]["success"] is True
+
+    @patch("web.routes.TwitterPlatform", autospec=True)
+    def test_post_deadline_bounds_media_worker(self, MockTwitter, client):
+        client.application.config["POST_DEADLINE_SECONDS"] = 0.2
+        media_pool = MagicMock()
+        media_pool.resize_for_platforms.side_effect = FutureTimeoutError
+        client.application.extensions["media_pool"] = media_pool
+        from PIL import Image
+        img = io.BytesIO()
+        Image.new("RGB", (10, 10), color="red").save(img, format="JPEG")
+        img.seek(0)
+
+        resp = client.post(
+            "/api/post",
+            data={"text": "Hello", "platforms": "twitter", "images": (img, "one.jpg")},
+            content_type="multipart/form-data",
+        )
+
+        assert 0 < media_pool.resize_for_platforms.call_args.kwargs["timeout"] <= 0.2
+        assert "Nothing was posted" in resp.get_json()["twitter"]["error"]
+        MockTwitter.return_value.post.assert_not_called()
+
+    @patch("web.routes.TwitterPlatform", autospec=True)
+    def test_post_deadline_includes_image_preparation(self, MockTwitter, client):
+        client.application.config["POST_DEADLINE_SECONDS"] = 0.2
+        from PIL import Image
+        img = io.BytesIO()
+        Image.new("RGB", (10, 10), color="red").save(img, format="JPEG")
+        img.seek(0)
+
+        def _slow_resize(data, platforms, **kwargs):
+            time.sleep(0.3)
+            return {key: bytes(data) for key in platforms}
+
+        with patch("web.routes.resize_for_platforms", side_effect=_slow_resize):
+            resp = client.post(
+                "/api/post",
+                data={"text": "Hello", "platforms": "twitter", "images": (img, "one.jpg")},
+                content_type="multipart/form-data",
+            )
+
+        data = resp.get_json()
+        assert data["twitter"]["success"] is False
+        assert "Nothing was posted" in data["twitter"]["error"]
+        MockTwitter.return_value.post.assert_not_called()
+
 
 class TestLinkedInOAuth:
     @patch("web.routes.LinkedInPlatform", autospec=True)
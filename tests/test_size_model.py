@@ -0,0 +1,24 @@
+"""Tests for the learned bytes-per-pixel model."""
+
+import pytest
+
+from core.size_model import DensityModel
+
+
+class TestDensityModel:
+    def test_prior_used_until_observed(self):
+        model = DensityModel(priors={("PNG", "JPEG"): 0.35})
+        assert model.predict(("PNG", "JPEG"), 1.0) == pytest.approx(0.35)
+        assert model.predict(("JPEG", "JPEG"), 2.0) == pytest.approx(2.0)
+
+    def test_observations_pull_factor_toward_actual(self):
+        model = DensityModel(priors={}, smoothing=0.5)
+        for _ in range(20):
+            model.observe(("JPEG", "JPEG"), 2.0, 1.0)
+        assert model.factor(("JPEG", "JPEG")) == pytest.approx(0.5, rel=1e-3)
+
+    def test_ignores_degenerate_observations(self):
+        model = DensityModel(priors={})
+        model.observe(("JPEG", "JPEG"), 0.0, 1.0)
+        model.observe(("JPEG", "JPEG"), 1.0, 0.0)
+        assert model.factor(("JPEG", "JPEG")) == 1.0
@@ -1,7 +1,10 @@
 """Tests for the thread splitter."""
 
+import grapheme
 import pytest
-from core.splitter import split_for_platform, PlatformConfig, TWITTER, BLUESKY, LINKEDIN
+from core.splitter import (
+    Draft, IncrementalSplit, split_draft, split_for_platform, PlatformConfig, TWITTER, BLUESKY, LINKEDIN,
+)
 
 
 class TestPlatformConfigs:
@@ -114,3 +117,91 @@ class TestSplitForPlatform:
             for p in parts
         )
         assert "(v1.1.2)" in joined
+
+    def test_indicator_reserve_tracks_two_digit_part_counts(self):
+        parts = split_for_platform("word " * 700, TWITTER)
+        assert len(parts) == 13
+        assert all(len(p) <= 280 for p in parts)
+        assert all(p.endswith(f" ({i}/13)") for i, p in enumerate(parts, 1))
+        # Parts are packed densely even with the wider "(k/13)" suffix.
+        assert all(len(p) >= 270 for p in parts[:-1])
+
+    def test_oversized_segment_is_trimmed_in_its_own_part(self):
+        config = PlatformConfig("test", 20, False, "word_dense")
+        parts = split_for_platform("ab " + "x" * 30 + " cd ef", config)
+        assert parts == ["ab (1/3)", "xxxxxxxxxxxxxx (2/3)", " cd ef (3/3)"]
+
+    def test_part_ending_in_prepend_is_measured_with_its_indicator(self):
+        # U+0600 is a Prepend character: it joins the indicator's leading
+        # space into one grapheme, so the posted part is shorter than the sum.
+        config = PlatformConfig("test", 20, True, "word_dense")
+        parts, lengths = split_draft(Draft("x" * 14 + "\u0600 " + "y " * 12), config)
+        assert parts[0] == "x" * 14 + "\u0600 (1/3)"
+        assert lengths == [grapheme.length(p) for p in parts] == [20, 20, 16]
+
+        parts, lengths = split_draft(Draft("x" * 30 + "\u0600 y"), config)
+        assert parts == ["x" * 14 + " (1/2)", " y (2/2)"]
+        assert lengths == [grapheme.length(p) for p in parts] == [20, 8]
+
+    def test_long_draft_parts_reassemble_to_original(self):
+        words = ["alpha", "beta.", "gamma", "delta!", "epsilon\n", "zeta?"]
+        text = " ".join(words[i % len(words)] for i in range(20_000))
+        parts = split_for_platform(text, TWITTER)
+        assert all(len(p) <= 280 for p in parts)
+        bodies = [p.rsplit(" (", 1)[0] for p in parts]
+        # Only whitespace at part ends is dropped.
+        assert " ".join(bodies).split() == text.split()
+
+
+class TestDraft:
+    def test_insertions_reuse_parent_tokenization(self):
+        draft = Draft("Bold *move*. Next: a*b c* \n\n*end*")
+        derived = draft.with_insertions(LINKEDIN.insertions)
+        assert derived.text == "Bold *\u200bmove*\u200b. Next: a*\u200bb c*\u200b \n\n*\u200bend*\u200b"
+        fresh = Draft(derived.text)
+        assert derived.sentence_bounds == fresh.sentence_bounds
+        assert derived.word_bounds == fresh.word_bounds
+        assert draft.with_insertions(LINKEDIN.insertions) is derived
+
+    def test_no_insertions_returns_same_draft(self):
+        draft = Draft("nothing to mark")
+        assert draft.with_insertions(LINKEDIN.insertions) is draft
+
+
+class TestIncrementalSplit:
+    SENTENCE = "Typing one more sentence into a long draft \U0001F44D\U0001F3FD. "
+
+    @pytest.mark.parametrize("config", [TWITTER, BLUESKY, LINKEDIN])
+    def test_edits_match_full_split(self, config):
+        split = IncrementalSplit(config, self.SENTENCE * 40)
+        edits = [
+            (len(split.text), len(split.text), "x"),        # typing at the end
+            (500, 500, "inserted words "),                  # in the middle
+            (100, 180, ""),                                 # deleting a selection
+            (0, 0, self.SENTENCE * 60),                     # paste that adds indicator digits
+            (10, len(split.text) - 10, "short"),            # back to a single part
+            (5, 5, self.SENTENCE * 8),
+        ]
+        for start, end, replacement in edits:
+            text = split.text[:start] + replacement + split.text[end:]
+            assert split.apply_edit(start, end, replacement) == split_draft(Draft(text), config)
+            assert split.text == text
+
+    def test_typing_at_the_end_keeps_leading_parts(self):
+        split = IncrementalSplit(TWITTER, self.SENTENCE * 60)
+        parts = split.parts
+        split.apply_edit(len(split.text), len(split.text), " more")
+        assert len(split.parts) == len(parts)
+        assert all(new is old for new, old in zip(split.parts[:-1], parts[:-1]))
+        assert split.parts[-1].endswith(f"more ({len(parts)}/{len(parts)})")
+
+    def test_update_finds_the_edit(self):
+        split = IncrementalSplit(BLUESKY, self.SENTENCE * 30)
+        text = split.text.replace("long draft", "longer draft", 3)
+        assert split.update(text) == split_draft(Draft(text), BLUESKY)
+        assert split.update(text) == split_draft(Draft(text), BLUESKY)
+
+    def test_rejects_edit_outside_text(self):
+        split = IncrementalSplit(TWITTER, "short")
+        with pytest.raises(ValueError):
+            split.apply_edit(3, 9, "")
@@ -0,0 +1,28 @@
+"""Tests for the text benchmark's corpus and measurements."""
+
+import grapheme
+
+from benchmarks.text_bench import (
+    _grapheme_per_segment,
+    _measured_per_segment,
+    build_corpus,
+)
+
+
+class TestCorpus:
+    def test_corpus_is_reproducible(self):
+        first = build_corpus(seed=7, chars=2_000)
+        assert first == build_corpus(seed=7, chars=2_000)
+        assert build_corpus(seed=8, chars=2_000) != first
+        assert all(len(text) >= 2_000 for text in first.values())
+
+    def test_corpora_cover_their_scripts(self):
+        corpus = build_corpus(chars=5_000)
+        assert corpus["english"].isascii()
+        assert grapheme.length(corpus["emoji"]) < len(corpus["emoji"])
+        assert grapheme.length(corpus["cjk"]) == len(corpus["cjk"])
+
+    def test_measurements_agree(self):
+        for text in build_corpus(chars=5_000).values():
+            assert _measured_per_segment(text) == _grapheme_per_segment(text)
+
@@ -1,6 +1,11 @@
 """Tests for platform text normalization."""
 
-from core.text_normalizer import normalize_common_text, normalize_linkedin_text
+from core.text_normalizer import (
+    apply_insertions,
+    insertion_points,
+    normalize_common_text,
+    normalize_linkedin_text,
+)
 
 
 class TestTextNormalizer:
@@ -14,3 +19,9 @@ class TestTextNormalizer:
         normalized = normalize_linkedin_text("i*agent and *bold*")
         assert "i*\u200bagent" in normalized
         assert "*\u200bbold*\u200b" in normalized
+
+    def test_insertions_follow_each_marker_in_order(self):
+        text = "a*b#c*"
+        points = insertion_points(text, (("*", "1"), ("#", "22")))
+        assert points == [(2, "1"), (4, "22"), (6, "1")]
+        assert apply_insertions(text, points) == "a*1b#22c*1"
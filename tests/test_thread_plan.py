@@ -1,7 +1,13 @@
 """Tests for thread planning and image reference mapping."""
 
-from core.splitter import TWITTER
-from core.thread_plan import build_thread_plan
+import grapheme
+
+from core import splitter
+from core.splitter import BLUESKY, LINKEDIN, TWITTER
+from core.text_normalizer import normalize_common_text, normalize_linkedin_text
+from core.thread_plan import (
+    IncrementalPlanner, PlanSessions, build_thread_plan, plan_thread, plan_threads,
+)
 
 
 class TestThreadPlan:
@@ -53,3 +59,89 @@ class TestThreadPlan:
         assert mode == "manual"
         assert parts == ["First section", "Second section"]
         assert refs == [[], []]
+
+    def test_plan_reports_part_lengths(self):
+        text = ("👍🏽 " * 100) + "end. " + ("é " * 80)
+        plan = plan_thread(text=text, config=BLUESKY)
+        assert len(plan.parts) > 1
+        assert plan.lengths == [grapheme.length(part) for part in plan.parts]
+        assert all(length <= 300 for length in plan.lengths)
+
+
+class TestPlanThreads:
+    CONFIGS = {"twitter": TWITTER, "bluesky": BLUESKY, "linkedin": LINKEDIN}
+
+    def test_matches_planning_each_platform_separately(self):
+        text = ("Ship it — *now*. " * 40) + "i*agent [img1] done!\n---\nSecond [img2] part."
+        plans = plan_threads(normalize_common_text(text), self.CONFIGS, image_count=2)
+        for key, config in self.CONFIGS.items():
+            normalized = normalize_linkedin_text(text) if key == "linkedin" else normalize_common_text(text)
+            assert plans[key] == plan_thread(normalized, config, 2, config.images_per_post)
+        assert "*\u200bnow*\u200b" in plans["linkedin"].parts[0]
+        assert "\u200b" not in plans["twitter"].parts[0]
+
+    def test_tokenizes_once_for_all_platforms(self, monkeypatch):
+        calls = []
+        sentence_bounds = splitter._sentence_bounds
+
+        def _counting(text):
+            calls.append(text)
+            return sentence_bounds(text)
+
+        monkeypatch.setattr(splitter, "_sentence_bounds", _counting)
+        long_linkedin = splitter.PlatformConfig("LinkedIn", 300, False, "sentence_hybrid", 1, LINKEDIN.insertions)
+        text = "A *starred* sentence here. " * 30
+        plans = plan_threads(text, {"bluesky": BLUESKY, "linkedin": long_linkedin})
+        assert len(calls) == 1
+        assert len(plans["linkedin"].parts) > 1
+        assert all("*\u200b" in part for part in plans["linkedin"].parts)
+
+    def test_caps_images_per_platform(self):
+        plans = plan_threads("Short post.", self.CONFIGS, image_count=3)
+        assert plans["twitter"].image_refs == [[0, 1, 2]]
+        assert plans["linkedin"].image_refs == [[0]]
+
+
+class TestIncrementalPlanner:
+    CONFIGS = {"twitter": TWITTER, "bluesky": BLUESKY, "linkedin": LINKEDIN}
+
+    def test_matches_plan_threads_while_editing(self):
+        planner = IncrementalPlanner()
+        text = "A *bold* claim [img1] about threads. " * 50
+        assert planner.plan(text, self.CONFIGS, image_count=2) == plan_threads(text, self.CONFIGS, 2)
+        for start, end, replacement in [
+            (len(text), len(text), "More."),
+            (40, 40, "\n---\n"),   # manual mode
+            (40, 45, ""),           # and back
+            (0, 200, "Short."),
+        ]:
+            text = text[:start] + replacement + text[end:]
+            plans = planner.apply_edit(start, end, replacement, self.CONFIGS, image_count=2)
+            assert planner.text == text
+            assert plans == plan_threads(text, self.CONFIGS, 2)
+
+    def test_platforms_can_change_between_plans(self):
+        planner = IncrementalPlanner()
+        planner.plan("One sentence. " * 40, {"twitter": TWITTER})
+        text = "One sentence. " * 41
+        assert planner.plan(text, self.CONFIGS) == plan_threads(text, self.CONFIGS)
+
+
+class TestPlanSessions:
+    def test_reuses_planner_per_session(self):
+        sessions = PlanSessions()
+        assert sessions.get("a") is sessions.get("a")
+        assert sessions.get("a") is not sessions.get("b")
+
+    def test_drops_least_recently_used_and_idle_sessions(self):
+        now = [0.0]
+        sessions = PlanSessions(max_sessions=2, idle_seconds=60, clock=lambda: now[0])
+        first = sessions.get("a")
+        sessions.get("b")
+        sessions.get("a")
+        sessions.get("c")
+        assert len(sessions) == 2
+        assert sessions.get("a") is first
+        now[0] = 100.0
+        assert sessions.get("a") is not first
+        assert len(sessions) == 1
@@ -1,7 +1,10 @@
 """Tests for the Twitter platform module."""
 
+import threading
+import time
 from unittest.mock import MagicMock, patch
 import pytest
+from platforms.media_ids import MediaIdCache
 from platforms.twitter import TwitterPlatform
 
 
@@ -131,3 +134,113 @@ class TestTwitterPlatform:
         calls = mock_client.create_tweet.call_args_list
         assert calls[0].kwargs.get("media_ids") == [101]
         assert calls[1].kwargs.get("media_ids") == [202]
+
+    @patch("platforms.twitter.tweepy")
+    def test_post_pipelined_uploads_overlap_and_keep_order(self, mock_tweepy):
+        mock_client = MagicMock()
+        mock_client.create_tweet.side_effect = [
+            MagicMock(data={"id": "1"}),
+            MagicMock(data={"id": "2"}),
+        ]
+        mock_tweepy.Client.return_value = mock_client
+
+        platform = TwitterPlatform(
+            api_key="k", api_secret="s",
+            access_token="t", access_token_secret="ts",
+            upload_workers=4,
+        )
+        in_flight = []
+        peak = []
+        lock = threading.Lock()
+
+        def _upload(data):
+            with lock:
+                in_flight.append(data)
+                peak.append(len(in_flight))
+            time.sleep(0.05)
+            with lock:
+                in_flight.remove(data)
+            return {b"a": 1, b"b": 2, b"c": 3}[data]
+
+        with patch.object(platform, "_upload_image", side_effect=_upload):
+            result = platform.post(
+                ["Part 1", "Part 2"],
+                images_by_part=[[b"a", b"b"], [b"c"]],
+                mode="manual",
+            )
+
+        assert result["success"] is True
+        assert max(peak) > 1
+        calls = mock_client.create_tweet.call_args_list
+        assert calls[0].kwargs.get("media_ids") == [1, 2]
+        assert calls[1].kwargs.get("media_ids") == [3]
+        assert calls[1].kwargs.get("in_reply_to_tweet_id") == "1"
+
+
+class TestTwitterMediaUpload:
+    @patch("platforms.twitter.tweepy")
+    def test_upload_sends_bytes_from_memory(self, mock_tweepy):
+        mock_api = mock_tweepy.API.return_value
+        mock_api.simple_upload.return_value = MagicMock(media_id=42)
+        platform = TwitterPlatform(
+            api_key="k", api_secret="s",
+            access_token="t", access_token_secret="ts"
+        )
+        png = b"\x89PNG\r\n\x1a\n" + b"0" * 32
+
+        assert platform._upload_image(png) == 42
+        call = mock_api.simple_upload.call_args
+        assert call.args[0] == "image.png"
+        assert call.kwargs["file"].getvalue() == png
+
+    @patch("platforms.twitter.tweepy")
+    def test_repeated_media_reuses_cached_id(self, mock_tweepy):
+        mock_api = mock_tweepy.API.return_value
+        mock_api.simple_upload.return_value = MagicMock(media_id=42, expires_after_secs=86400)
+        cache = MediaIdCache()
+        png = b"\x89PNG\r\n\x1a\n" + b"0" * 32
+
+        for _ in range(2):
+            platform = TwitterPlatform(
+                api_key="k", api_secret="s",
+                access_token="t", access_token_secret="ts",
+                media_id_cache=cache,
+            )
+            assert platform._upload_image(png) == 42
+
+        mock_api.simple_upload.assert_called_once()
+
+    @patch("platforms.twitter.tweepy")
+    def test_cached_id_honours_expires_after_secs(self, mock_tweepy):
+        mock_api = mock_tweepy.API.return_value
+        # Too close to expiry to be worth reusing.
+        mock_api.simple_upload.return_value = MagicMock(media_id=42, expires_after_secs=60)
+        cache = MediaIdCache()
+        platform = TwitterPlatform(
+            api_key="k", api_secret="s",
+            access_token="t", access_token_secret="ts",
+            media_id_cache=cache,
+        )
+
+        platform._upload_image(b"\x89PNG\r\n\x1a\n")
+        platform._upload_image(b"\x89PNG\r\n\x1a\n")
+
+        assert mock_api.simple_upload.call_count == 2
+
+    @patch("platforms.twitter.tweepy")
+    def test_failed_post_forgets_cached_ids(self, mock_tweepy):
+        mock_client = mock_tweepy.Client.return_value
+        mock_client.create_tweet.side_effect = Exception("media id invalid")
+        cache = MediaIdCache()
+        platform = TwitterPlatform(
+            api_key="k", api_secret="s",
+            access_token="t", access_token_secret="ts",
+            media_id_cache=cache,
+        )
+        key = MediaIdCache.key_for("twitter", "t", b"img")
+        cache.put(key, 42, ttl_seconds=3600)
+
+        result = platform.post(["Hello."], image_bytes_list=[b"img"])
+
+        assert result["success"] is False
+        assert cache.get(key) is None
@@ -1,5 +1,6 @@
 """Flask app factory for Cross-Poster."""
 
+import os
 import sys
 from pathlib import Path
 
@@ -14,6 +15,57 @@ if str(_project_root) not in sys.path:
 def create_app():
     app = Flask(__name__)
     app.secret_key = "cross-poster-local-only"
+    # Overall budget for /api/post; platforms still running past it are reported as timed out.
+    app.config["POST_DEADLINE_SECONDS"] = float(os.environ.get("POST_DEADLINE_SECONDS", "60"))
+    # Hard cap on request bodies (all attached images together); larger uploads get a 413.
+    app.config["MAX_CONTENT_LENGTH"] = int(float(os.environ.get("MAX_UPLOAD_MB", "100")) * 1024 * 1024)
+    # Pixel ceiling for uploaded images; None uses core.media.MAX_IMAGE_PIXELS.
+    max_pixels = os.environ.get("MEDIA_MAX_PIXELS", "").strip()
+    app.config["MEDIA_MAX_PIXELS"] = int(max_pixels) if max_pixels else None
+
+    from core.media import resize_for_platforms
+    from core.media_cache import VariantCache
+    from core.media_pool import MediaWorkerPool
+    from core.media_store import MediaStore
+    from core.text_normalizer import normalize_common_text
+    from core.thread_plan import PlanSessions
+    from platforms.media_ids import MediaIdCache
+    from platforms.pool import ClientPool
+
+    # Platform clients (and their keep-alive HTTP sessions) are reused across requests.
+    app.extensions["client_pool"] = ClientPool(
+        idle_seconds=float(os.environ.get("CLIENT_POOL_IDLE_SECONDS", "900")),
+    )
+
+    # Media IDs / blob refs from earlier uploads, reused while each platform keeps them valid.
+    app.extensions["media_ids"] = MediaIdCache()
+
+    # Resized image variants keyed by source hash; set MEDIA_CACHE_DIR to keep them across restarts.
+    media_cache_dir = os.environ.get("MEDIA_CACHE_DIR", "").strip()
+    app.extensions["media_cache"] = VariantCache(
+        memory_bytes=int(float(os.environ.get("MEDIA_CACHE_MEMORY_MB", "64")) * 1024 * 1024),
+        disk_dir=Path(media_cache_dir) if media_cache_dir else None,
+        disk_bytes=int(float(os.environ.get("MEDIA_CACHE_DISK_MB", "512")) * 1024 * 1024),
+    )
+
+    # Optional worker processes for image resizing; 0 keeps it in-process.
+    media_workers = int(os.environ.get("MEDIA_WORKERS", "0") or 0)
+    app.extensions["media_pool"] = MediaWorkerPool(media_workers) if media_workers > 0 else None
+    resize = (
+        app.extensions["media_pool"].resize_for_platforms
+        if app.extensions["media_pool"] else resize_for_platforms
+    )
+
+    # Images attached in the composer are pre-rendered under a handle before posting.
+    app.extensions["media_store"] = MediaStore(
+        cache=app.extensions["media_cache"],
+        max_pixels=app.config["MEDIA_MAX_PIXELS"],
+        ttl_seconds=float(os.environ.get("MEDIA_HANDLE_TTL_SECONDS", "3600")),
+        resize=resize,
+    )
+
+    # Per-tab planners so live previews re-split only what an edit changed.
+    app.extensions["plan_sessions"] = PlanSessions(normalize=normalize_common_text)
 
     from web.routes import bp
     app.register_blueprint(bp)
@@ -2,21 +2,26 @@
 
 import os
 from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError, wait
+from dataclasses import asdict
+from functools import partial
 from pathlib import Path
 from threading import Lock
-from time import time
+from time import monotonic, time
+from typing import Optional
 
-import grapheme
 import requests as http_requests
-from flask import Blueprint, render_template, request, jsonify, redirect
+from flask import Blueprint, current_app, render_template, request, jsonify, redirect
 
 from core.splitter import TWITTER, BLUESKY, LINKEDIN
-from core.thread_plan import build_thread_plan
-from core.media import validate_image, resize_for_platform
-from core.text_normalizer import normalize_common_text, normalize_linkedin_text
+from core.thread_plan import ThreadPlan, plan_threads
+from core.media import describe_image, estimate_variants, resize_for_platforms, upload_buffer
+from core.text_normalizer import normalize_common_text
 from platforms.twitter import TwitterPlatform
 from platforms.bluesky import BlueskyPlatform
 from platforms.linkedin import LinkedInPlatform
+from platforms.media_ids import MediaIdCache
+from platforms.pool import ClientPool
 
 _web_dir = Path(__file__).parent
 
@@ -34,6 +39,24 @@ PLATFORM_CONFIGS = {
     "linkedin": LINKEDIN,
 }
 
+# Environment variables each platform builds its client from; the client pool
+# keys instances by these so rotated credentials get a fresh client.
+PLATFORM_CREDENTIAL_ENV = {
+    "twitter": (
+        "TWITTER_API_KEY",
+        "TWITTER_API_SECRET",
+        "TWITTER_ACCESS_TOKEN",
+        "TWITTER_ACCESS_TOKEN_SECRET",
+    ),
+    "bluesky": ("BLUESKY_USERNAME", "BLUESKY_PASSWORD"),
+    "linkedin": (
+        "LINKEDIN_CLIENT_ID",
+        "LINKEDIN_CLIENT_SECRET",
+        "LINKEDIN_ACCESS_TOKEN",
+        "LINKEDIN_REFRESH_TOKEN",
+    ),
+}
+
 PLATFORM_DISPLAY = {
     "twitter": "Twitter",
     "bluesky": "BlueSky",
@@ -48,6 +71,9 @@ _enhance_rate_lock = Lock()
 _platform_rate_limits = {}
 _platform_rate_limits_lock = Lock()
 
+POST_DEADLINE_SECONDS = 60.0  # overall budget for one /api/post request
+MEDIA_UPLOAD_WORKERS = 4  # concurrent media uploads per threaded post
+
 
 def _enhance_text_with_ai(text: str) -> str:
     """Enhance text with OpenAI while preserving intent and platform fit."""
@@ -132,7 +158,45 @@ def preview():
     data = request.get_json()
     text = data.get("text", "")
     platforms = data.get("platforms", [])
-    image_count = int(data.get("imageCount") or 0)
+    media_handles = data.get("media") or []
+    image_count = max(int(data.get("imageCount") or 0), len(media_handles))
+
+    # Header-only size predictions for attachments uploaded via /api/media.
+    media_store = current_app.extensions["media_store"]
+    descriptors = []
+    for handle in media_handles:
+        item = media_store.get(handle) if handle else None
+        descriptors.append(item.descriptor if item else None)
+    target_keys = [key for key in dict.fromkeys(platforms) if key in PLATFORM_CONFIGS]
+    estimates = [
+        estimate_variants(descriptor, target_keys) if descriptor else None
+        for descriptor in descriptors
+    ]
+
+    # Tokenized and measured once for every selected platform. A composer
+    # session sends its id, and after its first preview only the edit
+    # ({start, end, text, base}: replace text[start:end] of a draft `base`
+    # characters long), so each preview re-splits only what changed.
+    configs = {key: PLATFORM_CONFIGS[key] for key in target_keys}
+    session_id = data.get("sessionId")
+    edit = data.get("edit")
+    if isinstance(session_id, str) and session_id:
+        planner = current_app.extensions["plan_sessions"].get(session_id)
+        if isinstance(edit, dict):
+            try:
+                if int(edit["base"]) != len(planner.text):
+                    raise ValueError("edit does not apply to the session's draft")
+                plans = planner.apply_edit(
+                    int(edit["start"]), int(edit["end"]), str(edit.get("text", "")),
+                    configs, image_count=image_count,
+                )
+            except (KeyError, TypeError, ValueError):
+                # The session expired or missed an edit; the client resends the full text.
+                return jsonify({"error": "Preview session is out of date; send the full text."}), 409
+        else:
+            plans = planner.plan(text, configs, image_count=image_count)
+    else:
+        plans = plan_threads(normalize_common_text(text), configs, image_count=image_count)
 
     result = {}
     for key in platforms:
@@ -140,37 +204,134 @@ def preview():
         if not config:
             continue
 
-        normalized_text = normalize_linkedin_text(text) if key == "linkedin" else normalize_common_text(text)
-
-        image_cap = 4 if key in ("twitter", "bluesky") else 1
-        parts, image_refs_by_part, mode = build_thread_plan(
-            text=normalized_text,
-            config=config,
-            image_count=image_count,
-            per_post_image_cap=image_cap,
-        )
-
-        full_text = "".join(parts)
-        count = grapheme.length(full_text) if config.use_graphemes else len(full_text)
+        plan = plans[key]
+        count = sum(plan.lengths)
         limit = config.char_limit
 
         result[key] = {
-            "parts": parts,
-            "image_refs": image_refs_by_part,
-            "mode": mode,
+            "parts": plan.parts,
+            "image_refs": plan.image_refs,
+            "mode": plan.mode,
             "count": count,
             "limit": limit,
             "over": limit is not None and count > limit,
         }
+        if media_handles:
+            result[key]["images"] = [
+                asdict(per_platform[key]) if per_platform else None
+                for per_platform in estimates
+            ]
 
     return jsonify(result)
 
 
+def _platform_factory(key: str, media_ids: Optional[MediaIdCache] = None):
+    """Return the platform class for `key` (looked up per call so tests can patch it)."""
+    return {
+        "twitter": partial(TwitterPlatform, upload_workers=MEDIA_UPLOAD_WORKERS, media_id_cache=media_ids),
+        "bluesky": partial(BlueskyPlatform, upload_workers=MEDIA_UPLOAD_WORKERS, media_id_cache=media_ids),
+        "linkedin": partial(LinkedInPlatform, media_id_cache=media_ids),
+    }[key]
+
+
+def _platform_credentials(key: str) -> tuple:
+    return tuple(os.environ.get(name, "") for name in PLATFORM_CREDENTIAL_ENV[key])
+
+
+def _post_to_platform(
+    key: str,
+    plan: ThreadPlan,
+    resized_images: list[bytes],
+    pool: ClientPool,
+    media_ids: Optional[MediaIdCache] = None,
+) -> dict:
+    """Upload and post a planned thread for a single platform.
+
+    Runs on the post executor, so it never raises: failures are reported in
+    the returned result dict.
+    """
+    config = PLATFORM_CONFIGS[key]
+    try:
+        max_images = config.images_per_post
+        images_by_part = [
+            [resized_images[idx] for idx in refs[:max_images] if 0 <= idx < len(resized_images)]
+            for refs in plan.image_refs
+        ]
+
+        with pool.lease(key, _platform_factory(key, media_ids), _platform_credentials(key)) as platform:
+            if key == "linkedin" and not platform.access_token:
+                result = {
+                    "success": False,
+                    "error": "No access token. Authorize LinkedIn first.",
+                }
+            else:
+                try:
+                    result = platform.post(plan.parts, images_by_part=images_by_part, mode=plan.mode)
+                except Exception as e:
+                    result = {"success": False, "error": str(e), "retire_client": True}
+                # Platforms flag failures that leave the client in a bad state;
+                # don't hand that client to the next request.
+                if result.pop("retire_client", False):
+                    pool.retire(platform)
+    except Exception as e:
+        result = {"success": False, "error": str(e)}
+
+    rate_limit = result.get("rate_limit")
+    if rate_limit:
+        with _platform_rate_limits_lock:
+            _platform_rate_limits[key] = rate_limit
+
+    return result
+
+
+@bp.app_errorhandler(413)
+def upload_too_large(error):
+    limit_mb = (current_app.config.get("MAX_CONTENT_LENGTH") or 0) / (1024 * 1024)
+    return jsonify({"error": f"Upload too large (limit {limit_mb:g} MB)"}), 413
+
+
+@bp.route("/api/media", methods=["POST"])
+def upload_media():
+    """Accept an image as soon as it is attached and start pre-rendering it.
+
+    Returns a handle that /api/post accepts in place of the file itself.
+    """
+    image_file = request.files.get("image")
+    if not image_file or not image_file.filename:
+        return jsonify({"error": "No image provided"}), 400
+
+    image_bytes = upload_buffer(image_file.stream)
+    try:
+        descriptor = describe_image(image_bytes, max_pixels=current_app.config.get("MEDIA_MAX_PIXELS"))
+    except ValueError:
+        return jsonify({"error": "Invalid image file"}), 400
+
+    handle = current_app.extensions["media_store"].add(image_bytes, descriptor)
+    return jsonify({
+        "handle": handle,
+        "format": descriptor.format,
+        "mimeType": descriptor.mime_type,
+        "width": descriptor.width,
+        "height": descriptor.height,
+        "size": descriptor.byte_size,
+    })
+
+
+def _prepare_timeout_results(platforms: list[str], deadline: float) -> dict:
+    """Per-platform errors for a post whose deadline ran out before anything was sent."""
+    error = f"Timed out after {deadline:g}s preparing images. Nothing was posted; please retry."
+    return {key: {"success": False, "error": error} for key in dict.fromkeys(platforms)}
+
+
 @bp.route("/api/post", methods=["POST"])
 def post():
-    """Post to all enabled platforms. Accepts multipart/form-data."""
+    """Post to all enabled platforms. Accepts multipart/form-data.
+
+    Images come either as `media` handles from /api/media or as `images` files.
+    """
     text = request.form.get("text", "").strip()
     platforms = request.form.getlist("platforms")
+    media_handles = [handle for handle in request.form.getlist("media") if handle]
     image_files = request.files.getlist("images")
     if not image_files:
         # Backward compatibility for older clients using a single "image" field.
@@ -183,65 +344,104 @@ def post():
     if not platforms:
         return jsonify({"error": "No platforms selected"}), 400
 
-    image_bytes_list = []
+    # The deadline covers preparing media and plans as well as posting.
+    deadline = float(current_app.config.get("POST_DEADLINE_SECONDS", POST_DEADLINE_SECONDS))
+    expires_at = monotonic() + deadline
+
+    max_pixels = current_app.config.get("MEDIA_MAX_PIXELS")
+    uploads = []
     for image_file in image_files:
         if not image_file or not image_file.filename:
             continue
-        image_bytes = image_file.read()
-        if not validate_image(image_bytes):
+        image_bytes = upload_buffer(image_file.stream)
+        try:
+            descriptor = describe_image(image_bytes, max_pixels=max_pixels)
+        except ValueError:
             return jsonify({"error": "Invalid image file"}), 400
-        image_bytes_list.append(image_bytes)
+        uploads.append((image_bytes, descriptor))
 
-    results = {}
-    for key in platforms:
-        config = PLATFORM_CONFIGS.get(key)
-        if not config:
-            results[key] = {"success": False, "error": "Unknown platform"}
-            continue
-
-        normalized_text = normalize_linkedin_text(text) if key == "linkedin" else normalize_common_text(text)
-
-        max_images = 4 if key in ("twitter", "bluesky") else 1
-        parts, image_refs_by_part, mode = build_thread_plan(
-            text=normalized_text,
-            config=config,
-            image_count=len(image_bytes_list),
-            per_post_image_cap=max_images,
-        )
-
-        resized_images = [resize_for_platform(img, key) for img in image_bytes_list]
-        images_by_part = [
-            [resized_images[idx] for idx in refs[:max_images] if 0 <= idx < len(resized_images)]
-            for refs in image_refs_by_part
-        ]
+    pool = current_app.extensions["client_pool"]
 
+    # Pre-rendered uploads are usually finished by now; otherwise wait for them.
+    media_store = current_app.extensions["media_store"]
+    variants = []
+    for handle in media_handles:
         try:
-            if key == "twitter":
-                platform = TwitterPlatform()
-                result = platform.post(parts, images_by_part=images_by_part, mode=mode)
-            elif key == "bluesky":
-                platform = BlueskyPlatform()
-                result = platform.post(parts, images_by_part=images_by_part, mode=mode)
-            elif key == "linkedin":
-                platform = LinkedInPlatform()
-                if not platform.access_token:
-                    result = {
-                        "success": False,
-                        "error": "No access token. Authorize LinkedIn first.",
-                    }
-                else:
-                    result = platform.post(parts, images_by_part=images_by_part, mode=mode)
-            else:
-                result = {"success": False, "error": "Unknown platform"}
-        except Exception as e:
-            result = {"success": False, "error": str(e)}
+            handle_variants = media_store.variants(handle, timeout=max(0.0, expires_at - monotonic()))
+        except FutureTimeoutError:
+            return jsonify(_prepare_timeout_results(platforms, deadline))
+        except ValueError:
+            # The header was valid at upload but the pixel data isn't.
+            return jsonify({"error": "Invalid image file"}), 400
+        if handle_variants is None:
+            return jsonify({
+                "error": "Attached image expired. Please attach it again.",
+                "code": "media_expired",
+            }), 409
+        variants.append(handle_variants)
+
+    # Decode each image once and derive every selected platform's variant from it.
+    target_keys = [key for key in dict.fromkeys(platforms) if key in PLATFORM_CONFIGS]
+    media_cache = current_app.extensions["media_cache"]
+    media_pool = current_app.extensions.get("media_pool")
+    try:
+        for img, descriptor in uploads:
+            resize = resize_for_platforms
+            if media_pool:
+                # A stuck worker must not hold the request past its deadline.
+                resize = partial(media_pool.resize_for_platforms, timeout=max(0.0, expires_at - monotonic()))
+            variants.append(
+                resize(img, target_keys, max_pixels=max_pixels, cache=media_cache, descriptor=descriptor)
+            )
+    except FutureTimeoutError:
+        return jsonify(_prepare_timeout_results(platforms, deadline))
+    except ValueError:
+        # The header parsed, but decoding the pixel data failed.
+        return jsonify({"error": "Invalid image file"}), 400
+
+    plans = plan_threads(
+        normalize_common_text(text),
+        {key: PLATFORM_CONFIGS[key] for key in target_keys},
+        image_count=len(variants),
+    )
 
-        rate_limit = result.get("rate_limit")
-        if rate_limit:
-            with _platform_rate_limits_lock:
-                _platform_rate_limits[key] = rate_limit
+    if monotonic() >= expires_at:
+        return jsonify(_prepare_timeout_results(platforms, deadline))
 
-        results[key] = result
+    # One thread per platform, owned by this request: a platform that
+    # outlives the deadline keeps only its own thread busy, never the
+    # threads later posts need.
+    executor = ThreadPoolExecutor(max_workers=len(PLATFORM_CONFIGS), thread_name_prefix="post")
+    futures = {}
+    results = {}
+    try:
+        for key in platforms:
+            if key in futures or key in results:
+                continue
+            if key not in PLATFORM_CONFIGS:
+                results[key] = {"success": False, "error": "Unknown platform"}
+                continue
+            futures[key] = executor.submit(
+                _post_to_platform, key, plans[key], [v[key] for v in variants], pool,
+                current_app.extensions.get("media_ids"),
+            )
+
+        # Platforms run concurrently; the response waits at most `deadline` for
+        # the slowest one instead of the sum of all platform latencies.
+        wait(futures.values(), timeout=max(0.0, expires_at - monotonic()))
+    finally:
+        executor.shutdown(wait=False)
+    for key, future in futures.items():
+        if future.done():
+            results[key] = future.result()
+        else:
+            results[key] = {
+                "success": False,
+                "error": (
+                    f"Timed out after {deadline:g}s waiting for {PLATFORM_DISPLAY[key]}. "
+                    "The post may still complete; check the platform before retrying."
+                ),
+            }
 
     return jsonify(results)
 
@@ -336,6 +536,8 @@ def linkedin_callback():
     platform.access_token = tokens["access_token"]
     platform.refresh_token = tokens.get("refresh_token", "")
     platform._save_tokens()
+    # Pooled LinkedIn clients still hold the old token.
+    current_app.extensions["client_pool"].discard("linkedin")
 
     return render_template(
         "index.html",
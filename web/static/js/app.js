@@ -29,8 +29,17 @@ import { EMOJI_CATEGORIES, EMOJI_KEYWORDS } from "./emoji-data.js";
   let activeTab = "twitter";
   let previewData = {};
   let debounceTimer = null;
+  // Lets the server re-split only what changed since this tab's last preview.
+  const previewSessionId = window.crypto && crypto.randomUUID
+    ? crypto.randomUUID()
+    : `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
   let selectedFiles = [];
   let imagePreviewUrls = [];
+  let mediaHandles = []; // one promise per selected file, resolving to an /api/media handle or null
+  let resolvedHandles = []; // each file's handle once its upload finished, else null
+  let previewSeq = 0;
+  let previewSentText = null; // the draft this tab's server session holds, or null to send it whole
+  let previewQueue = Promise.resolve(); // previews go out one at a time so edits arrive in order
   let saveDraftTimer = null;
   let previousTextBeforeEnhance = "";
   let isEnhancing = false;
@@ -468,24 +477,72 @@ import { EMOJI_CATEGORIES, EMOJI_KEYWORDS } from "./emoji-data.js";
       return;
     }
 
+    // Never wait for uploads: send the handles that are ready now, and
+    // uploads that finish later request the preview again for their estimates.
+    const seq = ++previewSeq;
     previewContent.classList.add("is-refreshing");
-    fetch("/api/preview", {
-      method: "POST",
-      headers: { "Content-Type": "application/json" },
-      body: JSON.stringify({ text, platforms, imageCount: selectedFiles.length }),
-    })
-      .then((r) => r.json())
-      .then((data) => {
-        previewData = data;
-        updateCounters();
-        renderPreview();
+    previewQueue = previewQueue
+      .then(() => {
+        if (seq !== previewSeq) return null; // a newer preview is queued behind this one
+        return fetchPreview(text, platforms).then((data) => {
+          if (seq !== previewSeq) return; // a newer preview is on its way
+          previewData = data;
+          updateCounters();
+          renderPreview();
+        });
       })
       .catch(() => {})
       .finally(() => {
-        previewContent.classList.remove("is-refreshing");
+        if (seq === previewSeq) previewContent.classList.remove("is-refreshing");
       });
   }
 
+  // Sends only the edit since the last preview once the session holds a
+  // draft, and the whole text if the server has lost track of it.
+  function fetchPreview(text, platforms) {
+    const body = {
+      platforms,
+      imageCount: selectedFiles.length,
+      media: resolvedHandles.slice(),
+      sessionId: previewSessionId,
+    };
+    const base = previewSentText;
+    if (base === null) body.text = text;
+    else body.edit = textEdit(base, text);
+    previewSentText = null; // unknown until the server answers
+
+    return fetch("/api/preview", {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify(body),
+    }).then((r) => {
+      if (r.status === 409 && base !== null) return fetchPreview(text, platforms);
+      if (r.ok) previewSentText = text;
+      return r.json();
+    });
+  }
+
+  // The edit turning `before` into `after`, as {start, end, text, base}
+  // in code points (the server's string offsets).
+  function textEdit(before, after) {
+    const a = Array.from(before);
+    const b = Array.from(after);
+    let start = 0;
+    while (start < a.length && start < b.length && a[start] === b[start]) start++;
+    let tail = 0;
+    while (
+      tail < a.length - start
+      && tail < b.length - start
+      && a[a.length - 1 - tail] === b[b.length - 1 - tail]
+    ) tail++;
+    return {
+      start,
+      end: a.length - tail,
+      text: b.slice(start, b.length - tail).join(""),
+      base: a.length,
+    };
+  }
+
   function updateCounters() {
     const enabled = getEnabledPlatforms();
     const parts = [];
@@ -527,6 +584,11 @@ import { EMOJI_CATEGORIES, EMOJI_KEYWORDS } from "./emoji-data.js";
     if (d.mode === "manual") {
       html += '<div class="preview-info">Manual mode active (`---` separators + `[imgN]` tags)</div>';
     }
+    (d.images || []).forEach((estimate, idx) => {
+      if (!estimate || estimate.action !== "resize") return;
+      const mb = (estimate.bytes / (1024 * 1024)).toFixed(1);
+      html += `<div class="preview-info">Image ${idx + 1} will be recompressed to ~${mb} MB ${estimate.format} at ${Math.round(estimate.scale * 100)}% size</div>`;
+    });
 
     if (activeTab === "twitter") {
       html += renderTwitterCards(parts, d);
@@ -686,8 +748,31 @@ import { EMOJI_CATEGORIES, EMOJI_KEYWORDS } from "./emoji-data.js";
   }
 
   // --- Image Attachment ---
+  function startUploads() {
+    const handles = selectedFiles.map(uploadMedia);
+    mediaHandles = handles;
+    resolvedHandles = selectedFiles.map(() => null);
+    handles.forEach((promise, i) => promise.then((handle) => {
+      if (handles !== mediaHandles || !handle) return; // superseded or failed
+      resolvedHandles[i] = handle;
+      requestPreview();
+    }));
+  }
+
+  function uploadMedia(file) {
+    // Upload as soon as the image is attached so resizing is done before posting.
+    const formData = new FormData();
+    formData.append("image", file);
+    return fetch("/api/media", { method: "POST", body: formData })
+      .then((r) => (r.ok ? r.json() : null))
+      .then((data) => (data && data.handle) || null)
+      .catch(() => null);
+  }
+
   function clearSelectedImage() {
     selectedFiles = [];
+    mediaHandles = [];
+    resolvedHandles = [];
     imagePreviewUrls.forEach((url) => URL.revokeObjectURL(url));
     imagePreviewUrls = [];
     imageInput.value = "";
@@ -729,6 +814,7 @@ import { EMOJI_CATEGORIES, EMOJI_KEYWORDS } from "./emoji-data.js";
     }
 
     selectedFiles = files;
+    startUploads();
     imagePreviewUrls.forEach((url) => URL.revokeObjectURL(url));
     imagePreviewUrls = selectedFiles.map((f) => URL.createObjectURL(f));
     imageNameEl.textContent = selectedFiles.length === 1
@@ -794,15 +880,32 @@ import { EMOJI_CATEGORIES, EMOJI_KEYWORDS } from "./emoji-data.js";
     postBtn.disabled = true;
     statusEl.innerHTML = '<div class="posting">Publishing across selected platforms...</div>';
 
-    const formData = new FormData();
-    formData.append("text", text);
-    platforms.forEach((p) => formData.append("platforms", p));
-    selectedFiles.forEach((file) => formData.append("images", file));
-
-    fetch("/api/post", {
-      method: "POST",
-      body: formData,
-    })
+    const buildFormData = (handles) => {
+      const formData = new FormData();
+      formData.append("text", text);
+      platforms.forEach((p) => formData.append("platforms", p));
+      if (handles) {
+        handles.forEach((handle) => formData.append("media", handle));
+      } else {
+        selectedFiles.forEach((file) => formData.append("images", file));
+      }
+      return formData;
+    };
+    const send = (formData) => fetch("/api/post", { method: "POST", body: formData });
+
+    Promise.all(mediaHandles)
+      .then((handles) => {
+        // Fall back to sending the files if any background upload failed.
+        const usable = handles.length > 0 && handles.every(Boolean) ? handles : null;
+        return send(buildFormData(usable)).then((r) => {
+          if (usable && r.status === 409) {
+            // Handles expired server-side; resend the original files instead.
+            startUploads();
+            return send(buildFormData(null));
+          }
+          return r;
+        });
+      })
       .then((r) => r.json())
       .then((results) => {
         let html = "";